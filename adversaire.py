@@ -0,0 +1,109 @@
+# coding: utf-8
+"""
+Module contenant l'adversaire du joueur dans une partie à deux grilles.
+
+Le joueur tire sur la grille de l'ordinateur pendant que l'ordinateur tire, avec une stratégie de "simulation", sur
+une seconde grille portant la flotte du joueur. L'ordinateur ne joue qu'après le joueur et son prochain tir ne dépend
+que de ses propres tirs : il est donc calculé dans un fil d'exécution dès que le tir précédent est connu, pendant que
+le joueur réfléchit et tape sa case. Sa réponse est ainsi immédiate, même avec une stratégie coûteuse comme le solveur,
+et la boucle des entrées n'est jamais bloquée par le calcul.
+"""
+import concurrent.futures
+import random
+
+from case import Etat, Grille
+
+STRATEGIE_DEFAUT = "densite"
+
+
+class Adversaire:
+    """
+    Classe représentant l'ordinateur qui tire sur la flotte du joueur.
+    """
+
+    def __init__(self, nom_strategie=STRATEGIE_DEFAUT, generateur=random):
+        """
+        constructeur de la classe "Adversaire"
+
+        :param nom_strategie: nom de la stratégie de tir (clé de "simulation.STRATEGIES")
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        """
+        from simulation import STRATEGIES  # Importé ici pour ne charger les stratégies que si on joue contre elles
+
+        self.classe_strategie = STRATEGIES[nom_strategie]
+        self.generateur = generateur
+        self.grille = Grille([])  # Grille portant la flotte du joueur, créée pour chaque partie par "commencer"
+        self.strategie = None
+        self.nombre_de_coups = 0
+        self._executeur = concurrent.futures.ThreadPoolExecutor(max_workers=1)  # Un seul fil : les calculs d'une
+        # stratégie ne sont jamais simultanés
+        self._prochain_tir = None  # "Future" du prochain tir, calculé en arrière-plan
+
+    def commencer(self, taille, bateaux):
+        """
+        Commence une partie : place la flotte du joueur au hasard et lance le calcul du premier tir.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param bateaux: bateaux du joueur, de nouveaux bateaux du même type sont créés pour la grille de l'adversaire
+        :return: réussite de l'opération
+        """
+        if self.grille.taille() != taille:
+            self.grille.set_taille(taille)
+        self.grille.set_bateaux([type(bateau)() for bateau in bateaux])
+        if not self.grille.placer_bateaux(self.generateur):
+            return False
+        self.strategie = self.classe_strategie(taille, [bateau.TAILLE for bateau in bateaux], self.generateur)
+        self.nombre_de_coups = 0
+        self.preparer()
+        return True
+
+    def preparer(self):
+        """
+        Lance le calcul du prochain tir en arrière-plan. Un calcul précédent encore en cours est simplement ignoré.
+
+        :return: pas de retour
+        """
+        self._prochain_tir = self._executeur.submit(self.strategie.choisir_tir)
+
+    def tir_pret(self):
+        """
+        :return: booléen indiquant si le prochain tir est déjà calculé
+        """
+        return self._prochain_tir is not None and self._prochain_tir.done()
+
+    def jouer(self):
+        """
+        Tire sur la flotte du joueur, puis lance le calcul du tir suivant.
+
+        Le tir a en général été calculé pendant que le joueur jouait ; sinon, on attend la fin du calcul.
+        :return: tuple (index de la case visée, état de la case après le tir, cases modifiées)
+        """
+        indice = self._prochain_tir.result()
+        taille = self.grille.taille()
+        etat, cases = self.grille.tirer_indice(indice)
+        if etat in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
+            self.nombre_de_coups += 1
+            self.strategie.observer(indice, etat, [case.index[1] * taille + case.index[0] for case in cases])
+        if not self.grille.flotte_coulee():
+            self.preparer()
+        return indice, etat, cases
+
+    def a_gagne(self):
+        """
+        :return: booléen indiquant si l'adversaire a coulé toute la flotte du joueur
+        """
+        return self.strategie is not None and self.grille.flotte_coulee()
+
+    def fermer(self):
+        """
+        Arrête les calculs en arrière-plan sans attendre : le prochain tir est annulé, le fil d'exécution de calcul
+        s'arrête après le calcul en cours et le groupe de processus des tirages de Monte-Carlo est arrêté.
+
+        :return: pas de retour
+        """
+        from montecarlo import fermer_pool  # Déjà importé par "simulation"
+
+        if self._prochain_tir is not None:
+            self._prochain_tir.cancel()
+        self._executeur.shutdown(wait=False)
+        fermer_pool()
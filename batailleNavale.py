@@ -1,9 +1,21 @@
 # coding: utf-8
 """
 Module de lancement de la bataille navale.
+
+Exemples : python batailleNavale.py (affichage avec la tortue)
+           python batailleNavale.py --mode console --ansi (affichage dans la console seulement, sans Tk)
+           python batailleNavale.py --flotte flotte.json (flotte personnalisée)
+           python batailleNavale.py --adversaire solveur (partie contre l'ordinateur, qui tire sur votre flotte)
+           python batailleNavale.py --journal parties.bnj (parties enregistrées, voir "journal")
+
+Une flotte est décrite par une liste de tuples (type, taille, nombre). Dans un fichier, c'est une liste JSON d'objets
+ayant les clés "type", "taille" (facultative pour les types prédéfinis) et "nombre" (1 par défaut), par exemple :
+    [{"type": "frégate", "taille": 6}, {"type": "torpilleur", "nombre": 3}]
 """
+import argparse
+import json
+
 from case import Grille
-from interfacegraphique import Afficheur
 import bateau
 
 NOMBRE_TORPILLEURS = 1
@@ -12,6 +24,13 @@ NOMBRE_CONTRE_TORPILLEURS = 1
 NOMBRE_CROISEURS = 1
 NOMBRE_PORTES_AVIONS = 1
 
+FLOTTE_DEFAUT = [(classe.TYPE, classe.TAILLE, nombre) for classe, nombre in (
+    (bateau.Torpilleur, NOMBRE_TORPILLEURS),
+    (bateau.SousMarin, NOMBRE_SOUS_MARINS),
+    (bateau.ContreTorpilleur, NOMBRE_CONTRE_TORPILLEURS),
+    (bateau.Croiseur, NOMBRE_CROISEURS),
+    (bateau.PorteAvions, NOMBRE_PORTES_AVIONS))]
+
 
 def creer_bateau(classe, nombre):
     """
@@ -27,24 +46,147 @@ def creer_bateau(classe, nombre):
     return bateaux
 
 
-def creer_bateaux():
+def creer_bateaux(flotte=None):
     """
     Crée une liste contenant le nombre désiré de chaque type de bateau.
 
-    :return: pas de retour
+    :param flotte: liste de tuples (type, taille, nombre), "FLOTTE_DEFAUT" si elle n'est pas donnée
+    :return: bateaux créés
     """
+    if flotte is None:
+        flotte = FLOTTE_DEFAUT
     bateaux = []
-    bateaux.extend(creer_bateau(bateau.Torpilleur, NOMBRE_TORPILLEURS))
-    bateaux.extend(creer_bateau(bateau.SousMarin, NOMBRE_SOUS_MARINS))
-    bateaux.extend(creer_bateau(bateau.ContreTorpilleur, NOMBRE_CONTRE_TORPILLEURS))
-    bateaux.extend(creer_bateau(bateau.Croiseur, NOMBRE_CROISEURS))
-    bateaux.extend(creer_bateau(bateau.PorteAvions, NOMBRE_PORTES_AVIONS))
+    for type_bateau, taille, nombre in flotte:
+        bateaux.extend(creer_bateau(bateau.classe_bateau(type_bateau, taille), nombre))
     return bateaux
 
 
+def tailles_flotte(flotte):
+    """
+    :param flotte: liste de tuples (type, taille, nombre)
+    :return: liste des tailles de tous les bateaux de la flotte
+    """
+    return [taille for type_bateau, taille, nombre in flotte for i in range(nombre)]
+
+
+def lire_flotte(donnees):
+    """
+    Convertit la description JSON d'une flotte (voir la docstring du module).
+
+    :param donnees: liste de dictionnaires décodée du JSON
+    :return: liste de tuples (type, taille, nombre)
+    """
+    if not isinstance(donnees, list):
+        raise ValueError("Une flotte doit être une liste de bateaux")
+    flotte = []
+    for description in donnees:
+        if not isinstance(description, dict) or not isinstance(description.get("type"), str):
+            raise ValueError("Bateau invalide : {0}".format(description))
+        type_bateau = description["type"]
+        taille = description.get("taille")
+        if taille is None:
+            if type_bateau not in bateau.TYPES_BATEAUX:
+                raise ValueError("La taille du type \"{0}\" doit être donnée".format(type_bateau))
+            taille = bateau.TYPES_BATEAUX[type_bateau].TAILLE
+        nombre = description.get("nombre", 1)
+        if not isinstance(taille, int) or not isinstance(nombre, int) or taille < 1 or nombre < 0:
+            raise ValueError("Taille ou nombre invalide : {0}".format(description))
+        bateau.classe_bateau(type_bateau, taille)  # Vérifie que le type n'existe pas déjà avec une autre taille
+        flotte.append((type_bateau, taille, nombre))
+    return flotte
+
+
+def charger_flotte(chemin):
+    """
+    Charge une flotte depuis un fichier JSON.
+
+    :param chemin: chemin du fichier
+    :return: liste de tuples (type, taille, nombre)
+    """
+    with open(chemin, encoding="utf-8") as fichier:
+        return lire_flotte(json.load(fichier))
+
+
+def flotte_depuis_tailles(tailles):
+    """
+    Crée une flotte à partir des tailles de ses bateaux, par ex. entrées dans le menu des paramètres.
+
+    Chaque bateau prend le type prédéfini de sa taille s'il en existe un, sinon un type "bateau de N cases".
+    :param tailles: liste des tailles des bateaux
+    :return: liste de tuples (type, taille, nombre)
+    """
+    types_predefinis = {}
+    for type_bateau, taille, nombre in FLOTTE_DEFAUT:
+        types_predefinis.setdefault(taille, type_bateau)
+    flotte = []
+    for taille in sorted(set(tailles)):
+        type_bateau = types_predefinis.get(taille, "bateau de {0} cases".format(taille))
+        flotte.append((type_bateau, taille, tailles.count(taille)))
+    return flotte
+
+
 if __name__ == "__main__":
-    bateaux = creer_bateaux()
-    grille = Grille(bateaux)
-    interface = Afficheur(grille)
-    interface.afficher_menu()
-    interface.boucle_des_evenements()
+    from adversaire import Adversaire, STRATEGIE_DEFAUT
+    from difficulte import TableDifficulte
+    from interfacegraphique import Afficheur, Mode  # Importé ici pour que les simulations n'aient pas besoin de
+    # l'affichage
+
+    parser = argparse.ArgumentParser(description="Bataille navale.")
+    parser.add_argument("--mode", choices=("tortue", "console"), default="tortue",
+                        help="affichage avec la tortue ou dans la console seulement (sans affichage graphique)")
+    parser.add_argument("--ansi", action="store_true",
+                        help="ne réécrire que les cases modifiées dans la console (terminal compatible ANSI)")
+    parser.add_argument("--flotte", default=None,
+                        help="fichier JSON décrivant la flotte (voir la docstring du module)")
+    parser.add_argument("--adversaire", nargs="?", const=STRATEGIE_DEFAUT, default=None, metavar="STRATEGIE",
+                        help="jouer contre l'ordinateur, qui tire sur votre flotte avec cette stratégie (voir "
+                             "\"simulation.STRATEGIES\", \"{0}\" par défaut)".format(STRATEGIE_DEFAUT))
+    parser.add_argument("--journal", default=None,
+                        help="fichier à la fin duquel enregistrer vos parties, à relire avec \"journal.py\"")
+    parser.add_argument("--stats", action="store_true",
+                        help="mesurer les tirs, le placement et le dessin (commande \"stats\" pendant la partie)")
+    parser.add_argument("--stats-fichier", default=None,
+                        help="fichier JSON dans lequel écrire les mesures à la fin du programme (active \"--stats\")")
+    arguments = parser.parse_args()
+
+    if arguments.stats or arguments.stats_fichier:
+        import instrumentation
+
+        instrumentation.activer()
+        if arguments.stats_fichier:
+            instrumentation.ecrire_a_la_sortie(arguments.stats_fichier)
+
+    flotte = FLOTTE_DEFAUT
+    if arguments.flotte:
+        try:
+            flotte = charger_flotte(arguments.flotte)
+        except (OSError, ValueError) as erreur:
+            parser.error("flotte invalide : {0}".format(erreur))
+    adversaire = None
+    if arguments.adversaire:
+        try:
+            adversaire = Adversaire(arguments.adversaire)
+        except KeyError:
+            parser.error("stratégie inconnue : {0}".format(arguments.adversaire))
+    fichier_journal = None
+    journal = None
+    if arguments.journal:
+        from journal import EcrivainJournal
+
+        try:
+            fichier_journal = open(arguments.journal, "ab")
+        except OSError as erreur:
+            parser.error("journal impossible à ouvrir : {0}".format(erreur))
+        journal = EcrivainJournal(fichier_journal)
+    grille = Grille(creer_bateaux(flotte))
+    interface = Afficheur(grille, Mode.TORTUE if arguments.mode == "tortue" else Mode.CONSOLE, arguments.ansi,
+                          adversaire, TableDifficulte(), journal)
+    try:
+        interface.afficher_menu()
+        interface.boucle_des_evenements()
+    finally:  # Y compris quand le joueur quitte ou interrompt le jeu
+        if adversaire is not None:
+            adversaire.fermer()
+        if journal is not None:
+            journal.terminer_partie()  # La partie en cours est enregistrée jusqu'au dernier tir
+            fichier_journal.close()
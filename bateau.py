@@ -12,10 +12,9 @@ class AbstractBateau:
 
     Le mot "Abstract" dans son nom indique qu'elle n'est pas conçue pour être utilisée de manière directe.
     """
-    TAILLE = None  # l'attribut "largeur_pixels" est défini en dehors du constructeur,
+    TAILLE = None  # l'attribut "TAILLE" est défini en dehors du constructeur,
     # car chaque bateau d'un même type a la même taille
     TYPE = None  # le type est lui aussi commun à tous les bateaux d'une même classe
-    NOMBRE_RESTANT = None  # nombre de bateaux non coulés par type
 
     def __init__(self, cases=None):
         """
@@ -28,6 +27,8 @@ class AbstractBateau:
         :param cases: tuple contenant les cases occupées par le _bateau
         """
         self._cases = []
+        self._touches = 0  # nombre de cases du bateau touchées
+        self.flotte = None  # registre de la flotte de la grille du bateau (voir "flotte.Flotte")
         if cases is not None:
             cases_libres = True
             for case in cases:
@@ -49,8 +50,9 @@ class AbstractBateau:
             for case in self._cases:
                 case.set_bateau(None)
             self._cases = []
-        elif len(cases) == self.TAILLE and Case.sont_alignees(cases) and Case.sont_adjacentes(cases):
-            # Le "self.__class__.largeur_pixels" permet d'accéder à la taille du bateau,
+            self._touches = 0
+        elif len(cases) == self.TAILLE and Case.sont_consecutives(cases):
+            # Le "self.TAILLE" permet d'accéder à la taille du bateau,
             # y compris avec les classes héritant de "AbstractBateau".
             # Cette condition vérifie qu'il y a le bon nombre de cases, qu'elle sont alignées et
             # qu'il n'y a pas d'espace les séparant.
@@ -63,25 +65,45 @@ class AbstractBateau:
                 case.set_bateau(None)  # enlève le bateau des anciennes cases
 
             self._cases = cases
+            self._touches = 0
             for case in self._cases:
                 case.set_bateau(self)  # ajoute le bateau aux nouvelles cases
         else:
             return False  # renvoie "False", car l'opération a échoué
         # On regarde si l'état du bateau a changé
-        self.__class__.NOMBRE_RESTANT += etait_coule - self.est_coule()
-        # Pour plus d'informations regarder méthode "recevoir_tir"
+        if self.flotte is not None and etait_coule != self.est_coule():
+            self.flotte.changer_etat(self, etait_coule - self.est_coule())
+            # Note : on a le droit de soustraire des booléens, "True" vaut 1 et "False" 0
+            # Donc si le bateau était coulé (1) et que maintenant il ne l'est plus (0), on a 1-0 = 1,
+            # donc on ajoute 1 au nombre de bateaux restants
         return True  # renvoie "True", car les cases ont bien été remplacées
 
+    def restaurer_cases(self, cases):
+        """
+        Rattache le bateau à ses cases sans aucune vérification, pour recréer une grille sauvegardée.
+
+        Les cases doivent déjà contenir le bateau et leur état. Le bateau ne doit pas encore faire partie d'une flotte.
+        :param cases: cases occupées par le bateau
+        :return: pas de retour
+        """
+        self._cases = cases
+        self._touches = sum(1 for case in cases if case.etat == Etat.TOUCHE or case.etat == Etat.COULE)
+
+    def cases(self):
+        """
+        Accesseur de l'attribut protégé "_cases"
+
+        :return: tuple des cases occupées par le bateau
+        """
+        return tuple(self._cases)
+
     def est_coule(self):
         """
         Méthode définissant si un bateau est coulé.
 
         :return: booléen égal à "True" si le bateau est coulé, et "False" sinon
         """
-        for case in self._cases:
-            if case.etat not in (Etat.TOUCHE, Etat.COULE):
-                return False
-        return True
+        return self._touches == len(self._cases)
 
     def recevoir_tir(self, case):
         """
@@ -91,24 +113,18 @@ class AbstractBateau:
                     "False" si l'opération a échoué
                  2. Cases modifiées
         """
-        etait_coule = self.est_coule()
-        if case in self._cases:  # si la case est une case du bateau
+        if case.bateau() is self:  # si la case est une case du bateau
             if case.etat == Etat.BATEAU_INTACT:  # si la case n'a pas déjà été touchée
-                cases_modifiees = [case]
                 case.etat = Etat.TOUCHE  # le bateau est touché en cette case
+                self._touches += 1
                 if self.est_coule():
-                    self.NOMBRE_RESTANT -= 1
-                    cases_modifiees = self._cases
                     for chaque_case in self._cases:  # On utilise le nom "chaque_case", car "case" est déjà
                         # le nom d'un paramètre
                         chaque_case.etat = Etat.COULE  # si le bateau est coulé, on change l'état de chaque case
-
-                        # On regarde si l'état du bateau a changé
-                        self.__class__.NOMBRE_RESTANT += etait_coule - self.est_coule()
-                        # Note : on a le droit de soustraire des booléens, "True" vaut 1 et "False" 0
-                        # Donc si le bateau n'était pas coulé (0) et que maintenant il l'est (1), on a 0-1 = -1,
-                        # donc on ajoute -1 (on enlève 1) au nombre de bateaux restants
-                return case.etat, cases_modifiees
+                    if self.flotte is not None:
+                        self.flotte.changer_etat(self, -1)  # un bateau de moins à flot
+                    return Etat.COULE, self._cases
+                return Etat.TOUCHE, [case]
             return None, None  # La case a déjà reçu un tir
         return False, None  # Il y a eu une erreur
 
@@ -120,7 +136,6 @@ class Torpilleur(AbstractBateau):
     TAILLE = 2  # la taille et le type sont redéfinis pour chaque classe héritant de "AbstractBateau"
     TYPE = "torpilleur"  # sert à afficher le type du bateau indépendamment du nom de la classe
     # (contrairement à __class__.__name__.lower())
-    NOMBRE_RESTANT = 0
 
     def __init__(self, cases=None):
         AbstractBateau.__init__(self, cases)  # appelle le constructeur de la classe "AbstractBateau"
@@ -132,7 +147,6 @@ class SousMarin(AbstractBateau):
     """
     TAILLE = 3  # la taille et le type sont redéfinis pour chaque classe héritant de "AbstractBateau"
     TYPE = "sous-marin"
-    NOMBRE_RESTANT = 0
 
     def __init__(self, cases=None):
         AbstractBateau.__init__(self, cases)  # appelle le constructeur de la classe "AbstractBateau"
@@ -144,7 +158,6 @@ class ContreTorpilleur(AbstractBateau):
     """
     TAILLE = 3  # la taille et le type sont redéfinis pour chaque classe héritant de "AbstractBateau"
     TYPE = "contre-torpilleur"
-    NOMBRE_RESTANT = 0
 
     def __init__(self, cases=None):
         AbstractBateau.__init__(self, cases)  # appelle le constructeur de la classe "AbstractBateau"
@@ -156,7 +169,6 @@ class Croiseur(AbstractBateau):
     """
     TAILLE = 4  # la taille et le type sont redéfinis pour chaque classe héritant de "AbstractBateau"
     TYPE = "croiseur"
-    NOMBRE_RESTANT = 0
 
     def __init__(self, cases=None):
         AbstractBateau.__init__(self, cases)  # appelle le constructeur de la classe "AbstractBateau"
@@ -168,7 +180,49 @@ class PorteAvions(AbstractBateau):
     """
     TAILLE = 5  # la taille et le type sont redéfinis pour chaque classe héritant de "AbstractBateau"
     TYPE = "porte-avions"
-    NOMBRE_RESTANT = 0
 
     def __init__(self, cases=None):
         AbstractBateau.__init__(self, cases)  # appelle le constructeur de la classe "AbstractBateau"
+
+
+TYPES_BATEAUX = {classe.TYPE: classe for classe in (Torpilleur, SousMarin, ContreTorpilleur, Croiseur, PorteAvions)}
+
+
+def classe_bateau(type_bateau, taille):
+    """
+    Renvoie la classe des bateaux d'un type, en la créant si le type n'existe pas encore.
+
+    Les classes créées sont ajoutées à "TYPES_BATEAUX", ce qui permet de définir une flotte par des données (voir
+    "batailleNavale.creer_bateaux") tout en gardant une classe par type, comme pour les bateaux prédéfinis.
+    :param type_bateau: type du bateau (ex : "croiseur", "frégate")
+    :param taille: nombre de cases du bateau
+    :return: classe héritant de "AbstractBateau"
+    """
+    if taille < 1:
+        raise ValueError("Un bateau doit avoir au moins une case : {0}".format(type_bateau))
+    classe = TYPES_BATEAUX.get(type_bateau)
+    if classe is None:
+        classe = type(str("Bateau_" + type_bateau), (AbstractBateau,), {"TAILLE": taille, "TYPE": type_bateau})
+        TYPES_BATEAUX[type_bateau] = classe
+    elif classe.TAILLE != taille:
+        raise ValueError("Le type \"{0}\" existe déjà avec une taille de {1} cases".format(type_bateau, classe.TAILLE))
+    return classe
+
+
+def bateau_depuis_type(type_bateau, taille=None):
+    """
+    Crée un bateau à partir de son type, par exemple pour reconstruire une flotte enregistrée.
+
+    :param type_bateau: type du bateau (attribut "TYPE" de sa classe, ex : "croiseur")
+    :param taille: nombre de cases du bateau, permet de créer un type qui n'existe pas encore (voir "classe_bateau")
+    :return: nouveau bateau sans cases, ou "None" si le type est inconnu ou n'a pas cette taille
+    """
+    classe = TYPES_BATEAUX.get(type_bateau)
+    if taille is not None:
+        try:
+            classe = classe_bateau(type_bateau, taille)
+        except ValueError:
+            return None
+    if classe is None:
+        return None
+    return classe()
@@ -0,0 +1,388 @@
+# coding: utf-8
+"""
+Module mesurant les performances du moteur de jeu et de l'affichage.
+
+Avec "--suite", on mesure les chemins critiques du jeu : placement des bateaux pour plusieurs tailles de grille et
+densités de flotte, tirs avec des coordonnées de la bataille navale ou des index, conversion des coordonnées, dessin
+de la grille dans la console, partie complète sans affichage et, si un affichage graphique est disponible (par ex.
+sous "xvfb-run"), dessin de la grille avec la tortue. Les résultats peuvent être écrits dans un fichier JSON et
+comparés à ceux d'un fichier de référence : une mesure plus lente que la référence au-delà de la tolérance est une
+régression, et le programme se termine alors avec le code 1. La référence "benchmark_reference.json" est à
+réenregistrer après chaque optimisation et sur chaque nouvelle machine de comparaison, avec
+"python benchmark.py --suite --sans-tortue --json benchmark_reference.json".
+
+Sans "--suite", pour chaque taille de grille, on mesure la création des éléments du canevas, un dessin complet de la
+grille après modification de toutes les cases et le dessin d'une seule case après un tir. Un affichage graphique est
+nécessaire. Avec "--demarrage", on mesure le temps de démarrage du jeu dans chaque mode d'affichage, dans un nouveau
+processus.
+
+Exemples : python benchmark.py -t 10 26 100
+           python benchmark.py --demarrage
+           python benchmark.py --suite --json resultats.json --reference benchmark_reference.json
+"""
+from __future__ import print_function
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from case import Etat, Grille
+from grillebinaire import GrilleBinaire
+from strategie import StrategieAleatoire
+import batailleNavale
+
+TOURS_SUITE = 5  # Chaque mesure de la suite est répétée, on garde la plus rapide, la moins perturbée
+TOLERANCE_DEFAUT = 1.0  # Ralentissement relatif au-delà duquel une mesure est une régression : d'une exécution à
+# l'autre, une même mesure peut varier du simple au double sur une machine partagée, alors que les régressions visées
+# (algorithme quadratique, parcours répétés de la flotte) multiplient les durées bien davantage
+VERSION_RESULTATS = 1
+
+
+def mesurer(fonction, repetitions=1, preparer=None):
+    """
+    Mesure la durée moyenne d'une fonction.
+
+    :param fonction: fonction sans paramètre à mesurer
+    :param repetitions: nombre d'appels de la fonction
+    :param preparer: fonction sans paramètre appelée avant chaque appel, dont la durée n'est pas comptée
+    :return: durée moyenne d'un appel en secondes
+    """
+    duree = 0
+    ramasse_miettes = gc.isenabled()
+    gc.disable()  # Comme "timeit", pour que le ramasse-miettes ne perturbe pas les mesures
+    try:
+        for i in range(repetitions):
+            if preparer is not None:
+                preparer()
+            debut = time.perf_counter()
+            fonction()
+            duree += time.perf_counter() - debut
+    finally:
+        if ramasse_miettes:
+            gc.enable()
+    return duree / repetitions
+
+
+def meilleure_mesure(fonction, repetitions=1, preparer=None, tours=TOURS_SUITE):
+    """
+    Répète une mesure et garde la plus rapide.
+
+    :param fonction: fonction sans paramètre à mesurer
+    :param repetitions: nombre d'appels de la fonction à chaque tour
+    :param preparer: voir "mesurer"
+    :param tours: nombre de répétitions de la mesure
+    :return: plus petite durée moyenne d'un appel en secondes
+    """
+    return min(mesurer(fonction, repetitions, preparer) for i in range(tours))
+
+
+def mesurer_rendu_grille(taille, repetitions=10, generateur=random):
+    """
+    Mesure le dessin d'une grille avec "RenduGrille".
+
+    :param taille: nombre de cases d'un côté de la grille
+    :param repetitions: nombre de répétitions des mesures de dessin complet et de dessin d'une case
+    :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+    :return: dictionnaire des durées mesurées en secondes
+    """
+    import turtle  # Importé ici pour que "benchmark.py -h" fonctionne sans affichage
+    from interfacegraphique import GeometrieGrille
+    from tortue import RenduGrille
+
+    ecran = turtle.Screen()
+    ecran.tracer(0, 0)
+    grille = Grille(batailleNavale.creer_bateaux(), taille)
+    grille.placer_bateaux(generateur)
+    geometrie = GeometrieGrille.pour_taille(taille)
+    rendu = RenduGrille(ecran)
+    cases = [case for ligne in grille.cases for case in ligne]
+
+    def changer_toutes_les_cases():
+        for case in cases:
+            case.etat = generateur.choice((Etat.VIDE, Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE))
+
+    def redessiner():
+        changer_toutes_les_cases()
+        rendu.dessiner_grille(grille.cases, geometrie)
+
+    def tirer():
+        case = generateur.choice(cases)
+        case.etat = Etat.DANS_L_EAU if case.etat != Etat.DANS_L_EAU else Etat.TOUCHE
+        rendu.dessiner_case(case)
+        ecran.update()
+
+    resultats = {"creation": mesurer(lambda: rendu.dessiner_grille(grille.cases, geometrie)),
+                 "dessin complet": mesurer(redessiner, repetitions),
+                 "tir": mesurer(tirer, repetitions * 10)}
+    rendu.cacher()
+    return resultats
+
+
+PROGRAMME_DEMARRAGE = """
+import sys, time
+debut = time.time()
+import batailleNavale
+from case import Grille
+from interfacegraphique import Afficheur, Mode
+Afficheur(Grille(batailleNavale.creer_bateaux()), Mode.{0})
+print(time.time() - debut, "tkinter" in sys.modules)
+"""  # Programme exécuté dans un nouveau processus pour mesurer le démarrage
+
+
+def mesurer_demarrage(mode, repetitions=5):
+    """
+    Mesure le démarrage du jeu (imports et création de l'"Afficheur") dans un nouveau processus.
+
+    :param mode: nom du mode d'affichage ("CONSOLE" ou "TORTUE", voir "interfacegraphique.Mode")
+    :param repetitions: nombre de démarrages mesurés
+    :return: tuple (durée moyenne du démarrage en secondes, durée moyenne du processus entier en secondes, booléen
+             indiquant si Tk a été importé), ou "None" si le démarrage a échoué (par exemple sans affichage graphique)
+    """
+    dossier = os.path.dirname(os.path.abspath(__file__))
+    duree_demarrage = 0
+    duree_processus = 0
+    tk_importe = False
+    for i in range(repetitions):
+        debut = time.time()
+        processus = subprocess.Popen([sys.executable, "-c", PROGRAMME_DEMARRAGE.format(mode)], cwd=dossier,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        sortie, _ = processus.communicate()
+        duree_processus += time.time() - debut
+        if processus.returncode != 0:
+            return None
+        duree, tk = sortie.split()
+        duree_demarrage += float(duree)
+        tk_importe = tk == "True"
+    return duree_demarrage / repetitions, duree_processus / repetitions, tk_importe
+
+
+def flotte_dense(taille, densite):
+    """
+    Crée une flotte occupant environ une proportion donnée des cases, en répétant la flotte du jeu.
+
+    :param taille: nombre de cases d'un côté de la grille
+    :param densite: proportion des cases à occuper, entre 0 et 1
+    :return: liste de bateaux
+    """
+    nombre_cases = sum(bateau.TAILLE for bateau in batailleNavale.creer_bateaux())
+    bateaux = []
+    for i in range(max(1, int(densite * taille ** 2 / nombre_cases))):
+        bateaux.extend(batailleNavale.creer_bateaux())
+    return bateaux
+
+
+def suite(tours=TOURS_SUITE, graine=0, tortue=True):
+    """
+    Mesure les chemins critiques du moteur de jeu et de l'affichage.
+
+    :param tours: nombre de répétitions de chaque mesure, dont on garde la plus rapide
+    :param graine: graine des générateurs aléatoires
+    :param tortue: booléen indiquant s'il faut mesurer le dessin avec la tortue quand un affichage est disponible
+    :return: dictionnaire associant à chaque nom de mesure sa durée en secondes
+    """
+    from interfacegraphique import Afficheur, Mode
+    from console import RenduConsole
+    from simulation import jouer_partie
+
+    resultats = {}
+
+    for classe, moteur in ((Grille, "grille"), (GrilleBinaire, "binaire")):
+        for taille, densite, repetitions in ((10, 0, 50), (26, 0, 50), (100, 0, 10), (10, 0.5, 20), (26, 0.5, 5)):
+            nom_densite = "flotte" if densite == 0 else "densite {0:.0%}".format(densite)
+            grille = classe(flotte_dense(taille, densite) if densite else batailleNavale.creer_bateaux(), taille)
+            generateur = random.Random(graine)
+            # Chaque tour place les mêmes flottes, pour que les tours soient comparables entre eux
+            resultats["placer_bateaux/{0}/{1}/{2}".format(moteur, taille, nom_densite)] = meilleure_mesure(
+                lambda: grille.placer_bateaux(generateur), repetitions, lambda: generateur.seed(graine), tours)
+
+        generateur = random.Random(graine)
+
+        grille = classe(batailleNavale.creer_bateaux(), 10)
+        grille.placer_bateaux(generateur)
+        positions = grille.positions_bateaux()
+        chaines = [Grille.index_vers_coord_bataille((x, y)) for y in range(10) for x in range(10)]
+        index = [(x, y) for y in range(10) for x in range(10)]
+        preparer = lambda: grille.placer_bateaux_positions(positions)
+        resultats["tirer/{0}/chaine (100 cases)".format(moteur)] = meilleure_mesure(
+            lambda: [grille.tirer(chaine) for chaine in chaines], 20, preparer, tours)
+        resultats["tirer/{0}/index (100 cases)".format(moteur)] = meilleure_mesure(
+            lambda: [grille.tirer(coordonnees) for coordonnees in index], 20, preparer, tours)
+        resultats["tirer/{0}/tirer_indice (100 cases)".format(moteur)] = meilleure_mesure(
+            lambda: [grille.tirer_indice(indice) for indice in range(100)], 20, preparer, tours)
+        if classe is GrilleBinaire:  # Tir sans vues sur les cases, réservé aux simulations
+            resultats["tirer/binaire/tirer_masque (100 cases)"] = meilleure_mesure(
+                lambda: [grille.tirer_masque(indice) for indice in range(100)], 20, preparer, tours)
+
+        tailles_bateaux = [bateau.TAILLE for bateau in grille.bateaux]
+        strategies = []
+        resultats["partie sans affichage/{0}/10".format(moteur)] = meilleure_mesure(
+            lambda: jouer_partie(grille, strategies.pop()), 50,
+            lambda: (grille.placer_bateaux(generateur),
+                     strategies.append(StrategieAleatoire(10, tailles_bateaux, generateur))), tours)
+
+    generateur = random.Random(graine)
+    grille = Grille(batailleNavale.creer_bateaux(), 26)
+    chaines = [Grille.index_vers_coord_bataille((x, y)) for y in range(26) for x in range(26)]
+    resultats["coord_bataille_vers_index (676 coordonnées)"] = meilleure_mesure(
+        lambda: [grille.coord_bataille_vers_index(chaine) for chaine in chaines], 20, tours=tours)
+
+    # En mode ANSI, seule une grille tenant dans un terminal de 24 lignes est modifiée sur place
+    for taille, ansi in ((10, False), (26, False), (100, False), (10, True)):
+        grille = Grille(batailleNavale.creer_bateaux(), taille)
+        grille.placer_bateaux(generateur)
+        for case in generateur.sample([case for ligne in grille.cases for case in ligne], taille ** 2 // 2):
+            case.etat = generateur.choice((Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE))
+        afficheur = Afficheur(grille, Mode.CONSOLE, table_difficulte=None)  # Sans calibration en arrière-plan, qui
+        # fausserait les mesures
+        afficheur.rendu_console = RenduConsole(sortie=io.StringIO(), ansi=ansi)
+        afficheur.rendu_console.dessiner_grille(grille)
+        case = grille.cases[taille // 2][taille // 2]
+
+        def changer_case():
+            afficheur.rendu_console.sortie().seek(0)
+            case.etat = Etat.TOUCHE if case.etat != Etat.TOUCHE else Etat.DANS_L_EAU
+
+        resultats["dessiner_grille_console/{0}/{1}".format("ansi" if ansi else "complet", taille)] = \
+            meilleure_mesure(lambda: afficheur.dessiner_grille_console([case]), 20, changer_case, tours)
+
+    if tortue and affichage_disponible():
+        for taille in (10, 26, 100):
+            for nom, duree in mesurer_rendu_grille(taille, 10, random.Random(taille)).items():
+                resultats["tortue/{0}/{1}".format(nom, taille)] = duree
+    return resultats
+
+
+def affichage_disponible():
+    """
+    Détermine si une fenêtre peut être ouverte, par ex. sous "xvfb-run".
+
+    :return: booléen valant "True" si un affichage graphique est disponible
+    """
+    if platform.system() == "Linux" and not os.environ.get("DISPLAY"):
+        return False
+    import turtle
+    try:
+        turtle.Screen()
+    except turtle.TK.TclError:
+        return False
+    return True
+
+
+def ecrire_resultats(chemin, resultats):
+    """
+    Écrit des résultats de la suite dans un fichier JSON.
+
+    :param chemin: chemin du fichier
+    :param resultats: dictionnaire renvoyé par "suite"
+    :return: pas de retour
+    """
+    with open(chemin, "w") as fichier:
+        json.dump({"version": VERSION_RESULTATS, "python": platform.python_version(), "machine": platform.machine(),
+                   "date": time.strftime("%Y-%m-%d %H:%M:%S"), "resultats": resultats},
+                  fichier, indent=2, sort_keys=True)
+        fichier.write("\n")
+
+
+def lire_resultats(chemin):
+    """
+    Lit des résultats écrits par "ecrire_resultats".
+
+    :param chemin: chemin du fichier
+    :return: dictionnaire associant à chaque nom de mesure sa durée en secondes
+    """
+    with open(chemin) as fichier:
+        contenu = json.load(fichier)
+    if contenu.get("version") != VERSION_RESULTATS:
+        raise ValueError("Version de résultats inconnue dans {0}".format(chemin))
+    return contenu["resultats"]
+
+
+def comparer(resultats, reference, tolerance=TOLERANCE_DEFAUT):
+    """
+    Compare des résultats à ceux d'une référence.
+
+    :param resultats: dictionnaire des durées mesurées
+    :param reference: dictionnaire des durées de référence
+    :param tolerance: ralentissement relatif toléré, par ex. 0.25 pour 25 %
+    :return: liste de tuples (nom, durée de référence, durée mesurée, rapport) des mesures communes, triée par nom,
+             et liste des noms des régressions
+    """
+    lignes = []
+    regressions = []
+    for nom in sorted(set(resultats) & set(reference)):
+        rapport = resultats[nom] / reference[nom] if reference[nom] > 0 else float("inf")
+        lignes.append((nom, reference[nom], resultats[nom], rapport))
+        if rapport > 1 + tolerance:
+            regressions.append(nom)
+    return lignes, regressions
+
+
+def main():
+    """
+    Point d'entrée du benchmark en ligne de commande.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Mesure des performances du moteur de jeu et de l'affichage.")
+    parser.add_argument("-t", "--tailles", type=int, nargs="+", default=[10, 26, 100], help="tailles de grille")
+    parser.add_argument("-r", "--repetitions", type=int, default=10, help="nombre de répétitions des mesures")
+    parser.add_argument("--demarrage", action="store_true", help="mesurer le démarrage dans chaque mode d'affichage")
+    parser.add_argument("--suite", action="store_true", help="mesurer les chemins critiques du moteur et de l'affichage")
+    parser.add_argument("--tours", type=int, default=TOURS_SUITE, help="nombre de répétitions de chaque mesure de "
+                                                                        "la suite")
+    parser.add_argument("--json", default=None, help="fichier JSON dans lequel écrire les résultats de la suite")
+    parser.add_argument("--reference", default=None, help="fichier JSON de résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_DEFAUT, help="ralentissement relatif toléré "
+                                                                                   "avant de signaler une régression "
+                                                                                   "(1 pour deux fois plus lent)")
+    parser.add_argument("--sans-tortue", action="store_true", help="ne pas mesurer le dessin avec la tortue")
+    arguments = parser.parse_args()
+
+    if arguments.suite:
+        resultats = suite(arguments.tours, tortue=not arguments.sans_tortue)
+        if arguments.json:
+            ecrire_resultats(arguments.json, resultats)
+        if not arguments.reference:
+            for nom, duree in sorted(resultats.items()):
+                print("{0:<55} {1:10.1f} µs".format(nom, duree * 1e6))
+            return
+        lignes, regressions = comparer(resultats, lire_resultats(arguments.reference), arguments.tolerance)
+        for nom, reference, duree, rapport in lignes:
+            print("{0:<55} {1:10.1f} µs {2:10.1f} µs  x{3:.2f}{4}".format(
+                nom, reference * 1e6, duree * 1e6, rapport, "  RÉGRESSION" if nom in regressions else ""))
+        if regressions:
+            print("{0} régression(s) par rapport à {1}".format(len(regressions), arguments.reference))
+            sys.exit(1)
+        return
+
+    if arguments.demarrage:
+        for mode in ("CONSOLE", "TORTUE"):
+            resultat = mesurer_demarrage(mode, arguments.repetitions)
+            if resultat is None:
+                print("{0} : échec du démarrage (pas d'affichage graphique ?)".format(mode.lower()))
+            else:
+                print("{0} : démarrage {1:.1f} ms, processus entier {2:.1f} ms, Tk importé : {3}".format(
+                    mode.lower(), resultat[0] * 1000, resultat[1] * 1000, "oui" if resultat[2] else "non"))
+        return
+
+    import turtle
+    try:
+        turtle.Screen()
+    except turtle.TK.TclError as erreur:  # Pas d'affichage graphique
+        print("Impossible d'ouvrir une fenêtre : {0}".format(erreur), file=sys.stderr)
+        sys.exit(1)
+    for taille in arguments.tailles:
+        resultats = mesurer_rendu_grille(taille, arguments.repetitions, random.Random(taille))
+        print("{0}x{0} : ".format(taille) + ", ".join(
+            "{0} {1:.2f} ms".format(nom, duree * 1000) for nom, duree in sorted(resultats.items())))
+
+
+if __name__ == "__main__":
+    main()
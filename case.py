@@ -2,10 +2,17 @@
 """
 Module contenant les classes relatives aux cases et à la grille de jeu.
 """
+from array import array
+import collections
 from enum import IntEnum, unique
-import string
 import random
-import time
+import re
+import string
+import struct
+import sys
+
+from flotte import Flotte
+from placement import placer_flotte, indices_masque, est_placement_valide
 
 
 def trier_bateaux_par_taille(bateaux, decroissant=False):
@@ -18,6 +25,106 @@ def trier_bateaux_par_taille(bateaux, decroissant=False):
     return sorted(bateaux, key=lambda x: x.TAILLE, reverse=decroissant)
 
 
+_LETTRES_COLONNES = []  # Cache des lettres de chaque colonne, agrandi à la demande
+_TABLE_NETTOYAGE = {ord(" "): None, ord("."): None, ord(","): None}  # Caractères ignorés dans les coordonnées
+_EXPRESSION_COORDONNEES = re.compile(r"([a-z]+)([0-9]+)$")
+
+
+def lettres_colonne(index_colonne):
+    """
+    Renvoie les lettres désignant une colonne, à la manière d'un tableur : A, B, ..., Z, AA, AB, ...
+
+    :param index_colonne: index de la colonne, en commençant à 0
+    :return: chaîne de caractères en majuscules
+    """
+    while len(_LETTRES_COLONNES) <= index_colonne:
+        nombre = len(_LETTRES_COLONNES) + 1
+        lettres = ""
+        while nombre > 0:
+            nombre, reste = divmod(nombre - 1, 26)
+            lettres = string.ascii_uppercase[reste] + lettres
+        _LETTRES_COLONNES.append(lettres)
+    return _LETTRES_COLONNES[index_colonne]
+
+
+class CodecCoordonnees:
+    """
+    Classe convertissant les coordonnées de la bataille navale d'une grille de taille donnée.
+
+    Toutes les conversions sont des recherches dans des tables calculées à la création. Sur les grilles d'au plus
+    "TAILLE_TABLE_COMPLETE" cases de côté, chaque coordonnée écrite sous forme normale ("b12") est directement une clé
+    de la table ; sinon on sépare les lettres du nombre et on cherche chacun dans sa table.
+    Les codecs sont partagés entre les grilles de même taille, ils s'obtiennent avec "CodecCoordonnees.pour_taille".
+    """
+    TAILLE_TABLE_COMPLETE = 100
+    _CODECS = {}  # Codecs déjà créés, indexés par taille
+
+    def __init__(self, taille):
+        """
+        constructeur de la classe "CodecCoordonnees"
+
+        :param taille: nombre de cases d'un côté de la grille
+        """
+        self.taille = taille
+        self.colonnes = [lettres_colonne(i) for i in range(taille)]
+        self.lignes = [str(i + 1) for i in range(taille)]
+        self._index_colonnes = {lettres.lower(): i for i, lettres in enumerate(self.colonnes)}
+        self._index_lignes = {nombre: i for i, nombre in enumerate(self.lignes)}
+        self._table_complete = {}
+        if taille <= self.TAILLE_TABLE_COMPLETE:
+            for lettres, x in self._index_colonnes.items():
+                for nombre, y in self._index_lignes.items():
+                    self._table_complete[lettres + nombre] = (x, y)
+
+    @classmethod
+    def pour_taille(cls, taille):
+        """
+        Renvoie le codec d'une taille de grille, en le créant s'il n'existe pas encore.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :return: objet "CodecCoordonnees"
+        """
+        if taille not in cls._CODECS:
+            cls._CODECS[taille] = cls(taille)
+        return cls._CODECS[taille]
+
+    def decoder(self, coordonnees):
+        """
+        Convertit les coordonnées de la bataille navale (ex : "A5" ou ("A", 5)) en index de case (ex : (0, 4)).
+
+        Les espaces, points et virgules sont ignorés et les majuscules sont acceptées.
+        :param coordonnees: coordonnées de la bataille navale
+        :return: index (x, y) de la case ou "False" si les coordonnées ne sont pas valides
+        """
+        if type(coordonnees) is not str:  # Liste ou tuple
+            coordonnees = "".join(str(element) for element in coordonnees)
+        chaine = coordonnees.translate(_TABLE_NETTOYAGE).lower()
+        index = self._table_complete.get(chaine)
+        if index is not None:
+            return index
+        correspondance = _EXPRESSION_COORDONNEES.match(chaine)
+        if correspondance is None:
+            return False
+        x = self._index_colonnes.get(correspondance.group(1))
+        y = self._index_lignes.get(correspondance.group(2))
+        if y is None:  # Le nombre n'est pas sous forme normale, par ex. "05"
+            y = int(correspondance.group(2)) - 1
+            if y not in range(self.taille):
+                return False
+        if x is None:
+            return False
+        return x, y
+
+    def encoder(self, index):
+        """
+        Convertit un index de case en coordonnées de la bataille navale.
+
+        :param index: tuple ou liste (x, y) représentant l'index de la case
+        :return: chaîne de caractères des coordonnées (ex : "B8")
+        """
+        return self.colonnes[index[Coord.x]] + self.lignes[index[Coord.y]]
+
+
 @unique  # Assure que chaque valeur de l'énumération est unique
 class Etat(IntEnum):
     """
@@ -48,25 +155,35 @@ class Case:
     """
     Classe permettant de créer des objets de type case, composants élémentaires de la grille de jeu.
 
-    La position de chaque case est la position de son coin inférieur gauche.
+    Une case ne connaît que son index (ligne, colonne) sur la grille. Sa position en pixels est calculée par
+    l'affichage au moment du dessin (voir "interfacegraphique.GeometrieGrille").
     """
-    largeur_pixels = 40  # taille en pixels, le nom est en majuscules par convention, car c'est une constante
+    __slots__ = ("ligne", "colonne", "etat", "_bateau")
     CARACTERES_ETAT = ["_", "_", "o", "x", "#"]
 
-    def __init__(self, position, etat=Etat.VIDE, bateau=None):
+    def __init__(self, ligne, colonne, etat=Etat.VIDE, bateau=None):
         """
         constructeur de la classe "Case"
 
         ATTENTION : comme suggéré par le caractère "_" dans le nom de l'attribut "_bateau",
         il ne faut pas modifier cet attribut directement, mais faire appel à la méthode "set_bateau(self, bateau)"
-        :param position: position cartésienne du coin inférieur gauche de la case sur la grille
+        :param ligne: index de la ligne de la case sur la grille
+        :param colonne: index de la colonne de la case sur la grille
         :param etat: État de la case, lire la docstring de la classe "Etat" pour plus d'informations.
         :param bateau: Bateau présent sur cette case. Si la case est vide, ce paramètre vaut "None"
         """
-        self.position = list(position)
+        self.ligne = ligne
+        self.colonne = colonne
         self.etat = etat
         self._bateau = bateau
 
+    @property
+    def index(self):
+        """
+        :return: index (x, y) de la case sur la grille, c'est-à-dire (colonne, ligne)
+        """
+        return self.colonne, self.ligne
+
     @staticmethod
     def sont_alignees(cases):
         """
@@ -74,27 +191,32 @@ class Case:
         :param cases: liste d'objets de type "Case" dont on veut tester l'alignement
         :return: booléen indiquant si les cases sont alignées
         """
-        if cases is not None and len(cases) > 0:
-            if cases[0].position[Coord.x] == cases[-1].position[Coord.x]:
-                # si la première case a la même coordonnée x que la dernière
-                coord = Coord.x  # on défini une variable indiquant qu'il faut regarder l'alignement sur x
-            elif cases[0].position[Coord.y] == cases[-1].position[Coord.y]:
-                # si la première case a la même coordonnée y que la dernière
-                coord = Coord.y  # on défini une variable indiquant qu'il faut regarder l'alignement sur y
-            else:
-                return False
+        if not cases:
+            return False
+        ligne = cases[0].ligne
+        colonne = cases[0].colonne
+        return (all(case.ligne == ligne for case in cases)
+                or all(case.colonne == colonne for case in cases))
+
+    @staticmethod
+    def sont_consecutives(cases):
+        """
+        Détermine si des cases forment un segment de ligne ou de colonne sans espace, dans n'importe quel ordre.
 
-            premiere_case = cases[0]
-            for i in range(1, len(
-                    cases) - 1):  # on ne teste pas la première et la dernière, car cela a déjà été fait avant
-                if abs(cases[i].position[coord] - premiere_case.position[coord]) > 0.0001:
-                    # si la case n'est pas alignée avec la première case
-                    return False
-            return True
-        return False
+        C'est la condition de validité des cases d'un bateau, vérifiée en un seul passage sur les cases.
+        :param cases: liste d'objets de type "Case"
+        :return: booléen indiquant si les cases sont alignées et se suivent
+        """
+        if not Case.sont_alignees(cases):
+            return False
+        if all(case.ligne == cases[0].ligne for case in cases):
+            valeurs = set(case.colonne for case in cases)
+        else:
+            valeurs = set(case.ligne for case in cases)
+        return len(valeurs) == len(cases) and max(valeurs) - min(valeurs) == len(cases) - 1
 
-    @classmethod
-    def sont_adjacentes(cls, cases):
+    @staticmethod
+    def sont_adjacentes(cases):
         """
         Vérifie si un plusieurs cases sont adjacentes
 
@@ -114,38 +236,13 @@ class Case:
         :param cases: cases à vérifier
         :return: "True" si toutes les cases ont au moins un voisin, "False" sinon
         """
-        for case1 in cases:
-            autres_cases = list(cases)  # Crée une copie de la liste "cases"
-            autres_cases.remove(case1)  # Enlève la case "case1"
-            case1_a_un_voisin = False
-            for case2 in autres_cases:
-                if cls.sont_alignees((case1, case2)):
-                    separation_horizontale = abs(case1.position[Coord.x] - case2.position[Coord.x])
-                    separation_verticale = abs(case1.position[Coord.y] - case2.position[Coord.y])
-                    if separation_horizontale < cls.largeur_pixels or separation_verticale < cls.largeur_pixels:
-                        case1_a_un_voisin = True
-            if not case1_a_un_voisin:
+        index = set((case.ligne, case.colonne) for case in cases)
+        for ligne, colonne in index:
+            if ((ligne - 1, colonne) not in index and (ligne + 1, colonne) not in index
+                    and (ligne, colonne - 1) not in index and (ligne, colonne + 1) not in index):
                 return False
         return True
 
-    def carre(self):
-        """
-        :return: carré occupé par la case
-        """
-        x = self.position[Coord.x]
-        y = self.position[Coord.y]
-        cote = self.largeur_pixels
-        return [x, y], [x + cote, y], [x + cote, y + cote], [x, y + cote]
-
-    def milieu(self):
-        """
-        :return: position du milieu de la case
-        """
-        x = self.position[Coord.x]
-        y = self.position[Coord.y]
-        demi_longueur = self.largeur_pixels / 2.0
-        return x + demi_longueur, y + demi_longueur
-
     def caractere_etat(self):
         """
         :return: caractère symbolisant l'état de la case
@@ -197,34 +294,31 @@ class Grille:
 
     Elle contient un tableau en deux dimensions stockant des cases. La première case est dans le coin supérieur gauche.
     Les cases sont accédées de la manière suivante: self.cases[ligne][colonne]
+
+    L'état d'une grille peut être sauvegardé en octets ("en_octets") : "BNG1", la taille de la grille et le nombre de
+    bateaux ("<IH"), le type de chaque bateau (longueur sur un octet puis type en UTF-8), l'état de chaque case sur un
+    octet, puis le numéro du bateau de chaque case dans "bateaux" ("<h", -1 pour une case vide). Les cases sont
+    rangées par index "ligne * taille + colonne".
     """
-    LARGEUR_PIXELS_IDEALE = 400.0
-    TAILLE_MAX = 26  # Si la taille excède 26, les coordonnées nécessitent plusieurs lettres
+    TAILLE_MAX = 702  # Au-delà, les colonnes nécessitent plus de deux lettres ("ZZ" est la 702e)
+    MAGIE_INSTANTANE = b"BNG1"
+    EN_TETE_INSTANTANE = struct.Struct("<IH")  # taille de la grille, nombre de bateaux
 
     def __init__(self, bateaux, taille=10):
         self.bateaux = bateaux
+        self.flotte = Flotte(bateaux)  # Registre tenant à jour le nombre de bateaux à flot
         self.cases = []
+        self.codec = None  # Codec des coordonnées, dépend de la taille
         self._taille = 0  # On crée la variable "self.taille"
         self.set_taille(taille)  # On change la valeur de "self.taille"
 
     def creer_cases(self):
         """
-        Crée les cases de la grille en ajustant leur taille pour avoir une largeur de grille approximativement fixe,
-        tout en ayant un nombre entier pour la largeur de chaque case.
+        Crée les cases de la grille.
 
         :return: pas de retour
         """
-        self.cases = []
-        Case.largeur_pixels = round(
-            self.LARGEUR_PIXELS_IDEALE / self._taille)  # ajuste la largeur des cases en fonction de la taille de la grille
-        decalage_x = -self._taille * Case.largeur_pixels / 2.0 + 80  # décalage permettant de centrer la grille
-        decalage_y = self._taille * Case.largeur_pixels / 2.0 - 40  # on décale moins, car sinon la grille est trop haute
-        for i in range(self._taille):
-            ligne = []
-            for j in range(self._taille):
-                position = (j * Case.largeur_pixels + decalage_x, -i * Case.largeur_pixels + decalage_y)
-                ligne.append(Case(position))
-            self.cases.append(ligne)
+        self.cases = [[Case(i, j) for j in range(self._taille)] for i in range(self._taille)]
 
     def taille(self):
         """
@@ -244,28 +338,20 @@ class Grille:
             self._taille = taille
         else:
             self._taille = self.TAILLE_MAX
-        self._taille = taille
+        self.codec = CodecCoordonnees.pour_taille(self._taille)
         self.creer_cases()
 
-    def largeur_pixels(self):
-        """
-        Renvoie la largeur exacte de la grille en pixels.
-
-        :return: largeur de la grille en pixels
+    def set_bateaux(self, bateaux):
         """
-        return self._taille * Case.largeur_pixels
+        Change la flotte de la grille. Les anciens bateaux sont enlevés et toutes les cases sont remises à zéro.
 
-    def position_coins(self):
-        """
-        Retourne les coordonnées des coins de la grille.
-
-        :return: liste contenant les quatre coins de la grille.
+        :param bateaux: liste des nouveaux bateaux, sans cases
+        :return: pas de retour
         """
-        coin_superieur_gauche = self.cases[0][0].carre()[3]
-        coin_inferieur_gauche = self.cases[self._taille - 1][0].carre()[0]
-        coin_inferieur_droit = self.cases[self._taille - 1][self._taille - 1].carre()[1]
-        coin_superieur_droit = self.cases[0][self._taille - 1].carre()[2]
-        return coin_superieur_gauche, coin_inferieur_gauche, coin_inferieur_droit, coin_superieur_droit
+        self.reinitialiser()
+        self.bateaux = bateaux
+        self.flotte = Flotte(bateaux)
+        self.reinitialiser()
 
     def nombre_de_cases_occupees(self):
         """
@@ -284,24 +370,33 @@ class Grille:
 
         :return: bateaux restants
         """
-        bateaux_restants = []
-        for bateau in self.bateaux:
-            if not bateau.est_coule():
-                bateaux_restants.append(bateau)
-        return bateaux_restants
+        return [bateau for bateau in self.bateaux if not bateau.est_coule()]
+
+    def nombre_bateaux_restants(self):
+        """
+        :return: nombre de bateaux non coulés
+        """
+        return self.flotte.nombre_a_flot
+
+    def flotte_coulee(self):
+        """
+        Détermine si tous les bateaux de la grille ont été coulés.
+
+        :return: booléen valant "True" si plus aucun bateau n'est à flot
+        """
+        return self.flotte.est_coulee()
+
+    def types_bateaux(self):
+        """
+        :return: liste des types de bateaux de la grille, dans l'ordre de "bateaux"
+        """
+        return self.flotte.types
 
     def nombrebateauxdeboutpartype(self, typebateaux):
         """renvoie le nombre de bateaux pas coulés d'un certain type
         :param typebateaux: type des bateaux
         :return: nombre de bateaux pas coulés ayant le type demandé"""
-        nombrebateauxdeboutpartype = 0  # variable comptant le nombre de bateaux debout du type voulu
-        touslesbateauxrestants = self.bateaux_restants()
-        for i in range(len(touslesbateauxrestants)):
-
-            bateaurestant = touslesbateauxrestants[i]  # On regarde chaque bateau restant
-            if bateaurestant.TYPE == typebateaux:
-                nombrebateauxdeboutpartype += 1
-        return nombrebateauxdeboutpartype
+        return self.flotte.nombre_restant(typebateaux)
 
     def enlever_bateaux(self):
         """
@@ -325,78 +420,205 @@ class Grille:
             for case in ligne:
                 case.etat = Etat.VIDE  # Remet l'état de chaque case à zéro
 
-    def placer_bateaux(self):
+    def placer_bateaux(self, generateur=random):
         """
         Fonction permettant de placer des bateaux de manière aléatoire sur la grille
 
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
         :return: réussite de l'opération
         """
         self.reinitialiser()
-        bateaux_a_placer = trier_bateaux_par_taille(self.bateaux,
-                                                    True)  # On trie les bateaux dans l'ordre décroissant pour
-        # placer les plus grands en premier
-        for bateau in bateaux_a_placer:
-            temps_depart = time.time()  # On regarde quand on a commencé à placer le bateau
-            recommencer = True
-            while recommencer and time.time() - temps_depart < 1:
-                # Cette boucle se répète tant qu'on a pas réussi à placer le bateau
-                cases_bateau = []
-                index_premiere_case = (random.randint(0, self._taille - 1), random.randint(0, self._taille - 1))
-                sens_vertical = random.choice(
-                    (0, 0, -1, 1))  # Variable déterminant dans quel sens on cherche les cases horizontalement
-                if sens_vertical == 0:  # Si on cherche les cases verticalement
-                    sens_horizontal = random.choice((-1, 1))  # on détermine si on cherche vers la gauche ou la droite
-                else:
-                    sens_horizontal = 0  # La valeur 0 empêche de chercher horizontalement
-                index_derniere_case = (index_premiere_case[Coord.y] + sens_vertical * bateau.TAILLE,
-                                       index_premiere_case[Coord.x] + sens_horizontal * bateau.TAILLE)
-                if (index_derniere_case[Coord.y] in range(self._taille) and
-                        index_derniere_case[Coord.x] in range(self._taille)):  # Si la dernière case est dans la grille
-                    for i in range(bateau.TAILLE):
-                        index_y = index_premiere_case[Coord.y] + i * sens_vertical
-                        index_x = index_premiere_case[Coord.x] + i * sens_horizontal
-                        case = self.cases[index_y][index_x]
-                        if case.bateau() is None:  # Si la case est vide
-                            cases_bateau.append(case)
-                        else:
-                            break  # Si au moins une case n'est pas vide, on sort de la boucle for et on recommence au
-                            # début de la boucle while
-                    if len(cases_bateau) == bateau.TAILLE:  # Si toutes les cases parcourues étaient vides
-                        bateau.set_cases(cases_bateau)
-                        recommencer = False
-            if time.time() - temps_depart >= 1:
+        masques = placer_flotte(self._taille, [bateau.TAILLE for bateau in self.bateaux], generateur=generateur)
+        if masques is None:  # La flotte ne rentre pas dans la grille
+            return False
+        for bateau, masque in zip(self.bateaux, masques):
+            cases_bateau = []
+            for indice in indices_masque(masque):
+                index_ligne, index_colonne = divmod(indice, self._taille)
+                cases_bateau.append(self.cases[index_ligne][index_colonne])
+            bateau.set_cases(cases_bateau)
+        return True
+
+    def positions_valides(self, positions):
+        """
+        Détermine si des positions de bateaux sont légales sur la grille, sans rien modifier.
+
+        :param positions: liste contenant, pour chaque bateau de "bateaux" et dans le même ordre, les index des cases
+                          qu'il doit occuper ("ligne * taille + colonne")
+        :return: booléen valant "True" si chaque bateau a une position légale et qu'aucune case n'est partagée
+        """
+        if len(positions) != len(self.bateaux):
+            return False
+        occupees = set()
+        for bateau, indices in zip(self.bateaux, positions):
+            if not est_placement_valide(self._taille, bateau.TAILLE, indices):
                 return False
+            occupees.update(indices)
+        return len(occupees) == self.nombre_de_cases_occupees()
+
+    def positions_bateaux(self):
+        """
+        Renvoie les cases occupées par chaque bateau.
+
+        :return: liste de tuples contenant les index des cases de chaque bateau ("ligne * taille + colonne"), dans
+                 l'ordre de "bateaux"
+        """
+        return [tuple(sorted(case.ligne * self._taille + case.colonne for case in bateau.cases()))
+                for bateau in self.bateaux]
+
+    def placer_bateaux_positions(self, positions):
+        """
+        Place les bateaux à des positions données, par exemple pour rejouer une partie enregistrée.
+
+        La grille est remise à zéro avant le placement.
+        :param positions: positions des bateaux, voir "positions_valides"
+        :return: réussite de l'opération
+        """
+        if not self.positions_valides(positions):
+            return False
+        self.reinitialiser()
+        for bateau, indices in zip(self.bateaux, positions):
+            bateau.set_cases([self.cases[indice // self._taille][indice % self._taille] for indice in indices])
         return True
 
+    def etats_octets(self):
+        """
+        :return: "bytes" contenant l'état de chaque case, rangées par index "ligne * taille + colonne"
+        """
+        return bytes(bytearray(case.etat for ligne in self.cases for case in ligne))
+
+    def numeros_octets(self):
+        """
+        :return: "bytes" contenant le numéro dans "bateaux" du bateau de chaque case ("<h", -1 pour une case vide),
+                 rangées par index "ligne * taille + colonne"
+        """
+        numeros = {id(bateau): numero for numero, bateau in enumerate(self.bateaux)}
+        tableau = array("h", (numeros[id(case.bateau())] if case.bateau() is not None else -1
+                              for ligne in self.cases for case in ligne))
+        if sys.byteorder == "big":  # Les octets sont toujours en petit-boutiste
+            tableau.byteswap()
+        return tableau.tobytes()
+
+    def en_octets(self):
+        """
+        Sauvegarde l'état de la grille : taille, flotte, état et bateau de chaque case.
+
+        :return: "bytes" au format décrit dans la docstring de la classe
+        """
+        morceaux = [self.MAGIE_INSTANTANE, self.EN_TETE_INSTANTANE.pack(self._taille, len(self.bateaux))]
+        for bateau in self.bateaux:
+            type_bateau = bateau.TYPE.encode("utf-8")
+            morceaux.append(struct.pack("<B", len(type_bateau)) + type_bateau)
+        morceaux.append(self.etats_octets())
+        morceaux.append(self.numeros_octets())
+        return b"".join(morceaux)
+
+    @classmethod
+    def depuis_octets(cls, octets):
+        """
+        Recrée une grille sauvegardée avec "en_octets", avec n'importe quel moteur.
+
+        :param octets: "bytes" au format décrit dans la docstring de la classe
+        :return: nouvelle grille, avec de nouveaux bateaux
+        """
+        from bateau import bateau_depuis_type  # Importé ici, "bateau" importe ce module
+
+        if octets[:len(cls.MAGIE_INSTANTANE)] != cls.MAGIE_INSTANTANE:
+            raise ValueError("Ces octets ne sont pas une sauvegarde de grille")
+        position = len(cls.MAGIE_INSTANTANE)
+        taille, nombre_bateaux = cls.EN_TETE_INSTANTANE.unpack_from(octets, position)
+        position += cls.EN_TETE_INSTANTANE.size
+        types = []
+        for i in range(nombre_bateaux):
+            longueur = octets[position]
+            types.append(octets[position + 1:position + 1 + longueur].decode("utf-8"))
+            position += 1 + longueur
+        nombre_cases = taille ** 2
+        if len(octets) != position + 3 * nombre_cases:
+            raise ValueError("Sauvegarde de grille tronquée")
+        tableau = array("h")
+        tableau.frombytes(octets[position + nombre_cases:])
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        nombres_cases = collections.Counter(tableau)
+        bateaux = []
+        for numero, type_bateau in enumerate(types):
+            # La taille d'un bateau placé est son nombre de cases, ce qui permet de recréer les types définis par une
+            # flotte personnalisée (voir "bateau.classe_bateau")
+            bateau = bateau_depuis_type(type_bateau, nombres_cases.get(numero))
+            if bateau is None:
+                raise ValueError("Type de bateau inconnu dans la sauvegarde : {0}".format(type_bateau))
+            bateaux.append(bateau)
+        return cls.depuis_etats(bateaux, taille, octets[position:position + nombre_cases],
+                                octets[position + nombre_cases:])
+
+    @classmethod
+    def _creer_vide(cls, bateaux, taille):
+        """
+        Crée une grille sans appeler le constructeur, donc sans créer de cases, pour la remplir directement.
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        :return: grille dont seuls "bateaux", "_taille" et "codec" sont définis
+        """
+        grille = cls.__new__(cls)
+        grille.bateaux = bateaux
+        grille._taille = taille
+        grille.codec = CodecCoordonnees.pour_taille(taille)
+        return grille
+
+    @classmethod
+    def depuis_etats(cls, bateaux, taille, etats, numeros):
+        """
+        Crée une grille à partir de l'état et du bateau de chaque case, sans passer par "creer_cases" ni par les
+        vérifications de "set_cases" : les données sont supposées venir d'une grille valide.
+
+        :param bateaux: liste des bateaux de la grille, sans cases
+        :param taille: nombre de cases d'un côté de la grille
+        :param etats: "bytes" contenant l'état de chaque case, voir "etats_octets"
+        :param numeros: "bytes" contenant le numéro du bateau de chaque case, voir "numeros_octets"
+        :return: nouvelle grille
+        """
+        grille = cls._creer_vide(bateaux, taille)
+        tableau = array("h")
+        tableau.frombytes(numeros)
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        cases_bateaux = [[] for _ in bateaux]
+        grille.cases = []
+        for i in range(taille):
+            ligne = []
+            for j in range(taille):
+                indice = i * taille + j
+                numero = tableau[indice]
+                bateau = bateaux[numero] if numero >= 0 else None
+                case = Case(i, j, Etat(etats[indice]), bateau)
+                if bateau is not None:
+                    cases_bateaux[numero].append(case)
+                ligne.append(case)
+            grille.cases.append(ligne)
+        for bateau, cases in zip(bateaux, cases_bateaux):
+            bateau.restaurer_cases(cases)
+        grille.flotte = Flotte(bateaux)
+        return grille
+
+    def cloner(self):
+        """
+        Copie la grille, avec de nouveaux bateaux du même type, sans passer par "creer_cases" ni par "set_cases".
+
+        :return: nouvelle grille indépendante de celle-ci
+        """
+        return self.depuis_etats([type(bateau)() for bateau in self.bateaux], self._taille, self.etats_octets(),
+                                 self.numeros_octets())
+
     def coord_bataille_vers_index(self, coordonnees):
         """
-        Convertit les coordonnées de la bataille navale (ex : "A5" ou ("A", 5)) en coordonnées de la grille (ex: (1, 5)).
+        Convertit les coordonnées de la bataille navale (ex : "A5" ou ("A", 5)) en coordonnées de la grille (ex: (0, 4)).
 
         :param coordonnees: coordonnées de la bataille navale
         :return: coordonnées équivalentes sur la grille ou "False" si l'opération a échoué
         """
-        copie_coordonnees = "".join(
-            coordonnees)  # On assure que "copieCoordonnes" est une chaîne de caractères et non une liste ou un tuple
-        copie_coordonnees = copie_coordonnees.replace(" ", "")  # On enlève les espaces.
-        copie_coordonnees = copie_coordonnees.replace(".", "")  # On enlève les points
-        copie_coordonnees = copie_coordonnees.replace(",", "")  # On enlève les virgules
-        copie_coordonnees = copie_coordonnees.lower()  # On met tout en minuscules.
-        x = ""
-        lettres = ""
-        while copie_coordonnees and copie_coordonnees[0].isalpha():
-            lettres += copie_coordonnees[
-                0]  # On copie toutes les lettres du début dans "x" et on les enlève de "copie_coordonnees".
-            copie_coordonnees = copie_coordonnees[1:len(copie_coordonnees)]
-        for c in lettres:
-            x += str(string.ascii_letters.index(c))  # On transforme les lettres en nombres
-        try:
-            x = int(x)
-            y = int(copie_coordonnees) - 1
-        except ValueError:  # Si on arrive pas à convertir x ou y en nombres
-            return False
-        if x in range(self._taille) and y in range(self._taille):
-            return x, y
-        return False
+        return self.codec.decoder(coordonnees)
 
     @staticmethod
     def index_vers_coord_bataille(index):
@@ -406,9 +628,7 @@ class Grille:
         :param index: tuple ou liste représentant l'index de la case sur la grille
         :return: chaîne de caractères des coordonnées équivalentes dans la bataille navale (ex : "B8")
         """
-        lettre = string.ascii_uppercase[index[Coord.x]]  # On convertit la coordonnée x en lettre majuscule
-        nombre = index[Coord.y] + 1
-        return lettre + str(nombre)
+        return lettres_colonne(index[Coord.x]) + str(index[Coord.y] + 1)
 
     def sont_coordonnees_index(self, coordonnees):
         """
@@ -417,17 +637,31 @@ class Grille:
         :param coordonnees: coordonnées à tester
         :return: Booléen valant "True" si "coordonnées" représente un index, "False" sinon.
         """
-        if type(coordonnees) is tuple or type(coordonnees) is list:  # Si les coordonnées sont une liste ou un tuple
-            if len(coordonnees) == 2:
-                for coordonnee in coordonnees:
-                    if (type(coordonnee) is not int and type(
-                            coordonnees) is not float  # Si le type des coordonnées n'est pas un nombre
-                            or coordonnee not in range(
-                                self._taille)):  # ou si les coordonnées n'ont pas la bonne valeur
-                        return False
-                    return True
+        if (type(coordonnees) is tuple or type(coordonnees) is list) and len(coordonnees) == 2:  # Si les coordonnées
+            # sont une liste ou un tuple de deux éléments
+            x, y = coordonnees
+            # Les deux coordonnées doivent être des entiers compris entre 0 et la taille de la grille (exclue)
+            return type(x) is int and type(y) is int and 0 <= x < self._taille and 0 <= y < self._taille
         return False  # Si une des conditions plus haut n'est pas satisfaite, on renvoie "False"
 
+    def indice_coordonnees(self, coordonnees):
+        """
+        Convertit des coordonnées, sous l'une des formes acceptées par "tirer", en index de case.
+
+        :param coordonnees: index de la case ou coordonnées de la bataille navale, par ex : "A6"
+        :return: index de la case ("ligne * taille + colonne"), ou "None" si les coordonnées ne sont pas valides
+        """
+        # On vérifie que les coordonnées sont valides et on les convertit en index
+        if type(coordonnees) is str:  # Si les coordonnées sont présentées en coordonnées de la bataille navale
+            coordonnees_index = self.coord_bataille_vers_index(coordonnees)
+        elif self.sont_coordonnees_index(coordonnees):
+            coordonnees_index = coordonnees
+        else:
+            return None
+        if not coordonnees_index:
+            return None
+        return coordonnees_index[1] * self._taille + coordonnees_index[0]
+
     def tirer(self, coordonnees):
         """
         Méthode permettant de tirer aux coordonnées "coordonnees".
@@ -439,16 +673,175 @@ class Grille:
                     s'il y a eu une erreur
                  2. Cases modifiées s'il y en a, "None" sinon
         """
-        # On vérifie que les coordonnées sont valides et on les convertit en index
-        if type(coordonnees) is str:  # Si les coordonnées sont présentées en coordonnées de la bataille navale
-            coordonnees_index = self.coord_bataille_vers_index(coordonnees)
-        elif self.sont_coordonnees_index(coordonnees):
-            coordonnees_index = coordonnees
-        else:
-            return False, None
-        if not coordonnees_index:
+        indice = self.indice_coordonnees(coordonnees)
+        if indice is None:
             return False, None
+        return self.tirer_indice(indice)
+
+    def tirer_indice(self, indice):
+        """
+        Tire sur la case d'index "indice" sans aucune conversion de coordonnées.
+
+        :param indice: index de la case visée ("ligne * taille + colonne")
+        :return: voir "tirer"
+        """
+        return self.cases[indice // self._taille][indice % self._taille].recevoir_tir()
+
+
+class CaseVue(Case):
+    """
+    Vue légère sur une case d'une grille compacte (voir "AbstractGrilleCompacte").
+
+    Elle ne stocke que l'index de la case, son état et son bateau sont lus dans les masques de la grille au moment de
+    l'accès. Elle permet aux fonctions d'affichage de traiter une grille compacte comme une "Grille".
+    """
+    __slots__ = ("_grille", "indice")
+
+    def __init__(self, grille, indice):
+        """
+        constructeur de la classe "CaseVue"
+
+        :param grille: grille à laquelle appartient la case
+        :param indice: index de la case dans la grille ("ligne * taille + colonne")
+        """
+        self._grille = grille
+        self.indice = indice
+
+    @property
+    def ligne(self):
+        """
+        :return: index de la ligne de la case
+        """
+        return self.indice // self._grille.taille()
+
+    @property
+    def colonne(self):
+        """
+        :return: index de la colonne de la case
+        """
+        return self.indice % self._grille.taille()
+
+    @property
+    def etat(self):
+        """
+        :return: état de la case, lu dans la grille
+        """
+        return self._grille.etat_case(self.indice)
+
+    def bateau(self):
+        """
+        :return: bateau présent sur la case ou "None" si la case est vide
+        """
+        return self._grille.bateau_case(self.indice)
+
+    def recevoir_tir(self):
+        """
+        Méthode appelée lorsqu'un tir est dirigé vers cette case.
+
+        :return: voir "AbstractGrilleCompacte.tirer_indice"
+        """
+        return self._grille.tirer_indice(self.indice)
+
+
+class AbstractGrilleCompacte(Grille):
+    """
+    Classe servant de base aux grilles qui ne stockent pas d'objets "Case".
+
+    Leurs cases ne sont que des vues ("CaseVue") créées à la demande, elles exposent donc les mêmes méthodes que
+    "Grille". Les cases sont désignées par leur index "ligne * taille + colonne" et les classes filles doivent définir
+    "etat_case", "bateau_case" et "tirer_indice".
+    Le mot "Abstract" dans son nom indique qu'elle n'est pas conçue pour être utilisée de manière directe.
+    """
+
+    def creer_cases(self):
+        """
+        Remet la grille à zéro pour la nouvelle taille.
+
+        Les cases ne sont pas créées ici, elles le sont à la demande par l'attribut "cases".
+        :return: pas de retour
+        """
+        self._cases = None
+        self.reinitialiser()
+
+    @property
+    def cases(self):
+        """
+        Tableau en deux dimensions de vues sur les cases, créé au premier accès.
+
+        :return: liste de lignes de "CaseVue", accédées de la manière suivante : cases[ligne][colonne]
+        """
+        if self._cases is None:
+            self._cases = [[CaseVue(self, i * self._taille + j) for j in range(self._taille)]
+                           for i in range(self._taille)]
+        return self._cases
+
+    def _vue(self, indice):
+        """
+        Renvoie une vue sur une case, en réutilisant celle du tableau "cases" s'il a déjà été créé.
+
+        :param indice: index de la case
+        :return: vue sur la case
+        """
+        if self._cases is not None:
+            index_ligne, index_colonne = divmod(indice, self._taille)
+            return self._cases[index_ligne][index_colonne]
+        return CaseVue(self, indice)
 
-        case = self.cases[coordonnees_index[1]][coordonnees_index[0]]  # On accède la case visée, tout en faisant
-        # attention à mettre la coordonnée y en premier
-        return case.recevoir_tir()
+    def nombre_bateaux_restants(self):
+        """
+        :return: nombre de bateaux non coulés
+        """
+        return len(self.bateaux_restants())
+
+    def types_bateaux(self):
+        """
+        :return: liste des types de bateaux de la grille, dans l'ordre de "bateaux"
+        """
+        types = []
+        for bateau in self.bateaux:
+            if bateau.TYPE not in types:
+                types.append(bateau.TYPE)
+        return types
+
+    def nombrebateauxdeboutpartype(self, typebateaux):
+        """renvoie le nombre de bateaux pas coulés d'un certain type
+        :param typebateaux: type des bateaux
+        :return: nombre de bateaux pas coulés ayant le type demandé"""
+        return sum(1 for bateau in self.bateaux_restants() if bateau.TYPE == typebateaux)
+
+    def etat_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: état de la case
+        """
+        raise NotImplementedError
+
+    def bateau_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: bateau présent sur la case ou "None" si la case est vide
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def depuis_etats(cls, bateaux, taille, etats, numeros):
+        """
+        Crée une grille à partir de l'état et du bateau de chaque case, voir "Grille.depuis_etats".
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        :param etats: "bytes" contenant l'état de chaque case
+        :param numeros: "bytes" contenant le numéro du bateau de chaque case
+        :return: nouvelle grille
+        """
+        raise NotImplementedError
+
+    def tirer_indice(self, indice):
+        """
+        Tire sur la case d'index "indice" sans aucune conversion de coordonnées.
+
+        :param indice: index de la case visée
+        :return: 1. État de la case après le tir, "None" si la case a déjà reçu un tir
+                 2. Cases modifiées s'il y en a, "None" sinon
+        """
+        raise NotImplementedError
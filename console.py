@@ -0,0 +1,198 @@
+# coding: utf-8
+"""
+Module contenant l'affichage de la grille dans la console.
+
+Chaque image de la grille est construite dans une seule chaîne de caractères, écrite en une fois. En mode ANSI, la
+grille est fixée en haut du terminal, le reste du texte défilant en dessous, et seules les cases modifiées par le
+dernier tir sont réécrites à leur place à l'aide de séquences d'échappement ANSI.
+"""
+import atexit
+import shutil
+import sys
+
+from case import Case, Etat, lettres_colonne
+
+ECHAPPEMENT = "\x1b["
+EFFACER_ECRAN = ECHAPPEMENT + "2J" + ECHAPPEMENT + "H"  # Efface l'écran et place le curseur en haut à gauche
+SAUVER_CURSEUR = "\x1b7"
+RESTAURER_CURSEUR = "\x1b8"
+REINITIALISER_DEFILEMENT = ECHAPPEMENT + "r"  # Toute la hauteur du terminal défile de nouveau
+
+
+def deplacer_curseur(ligne, colonne):
+    """
+    :param ligne: ligne du terminal, en commençant à 1
+    :param colonne: colonne du terminal, en commençant à 1
+    :return: séquence ANSI plaçant le curseur à cette position
+    """
+    return "{0}{1};{2}H".format(ECHAPPEMENT, ligne, colonne)
+
+
+def zone_de_defilement(premiere_ligne, derniere_ligne):
+    """
+    :param premiere_ligne: première ligne de la zone, en commençant à 1
+    :param derniere_ligne: dernière ligne de la zone
+    :return: séquence ANSI limitant le défilement du terminal à ces lignes
+    """
+    return "{0}{1};{2}r".format(ECHAPPEMENT, premiere_ligne, derniere_ligne)
+
+
+class RenduConsole:
+    """
+    Classe dessinant la grille dans la console.
+
+    Exemple pour une grille de largeur 10 :
+          _A_B_C_D_E_F_G_H_I_J_
+         1|_|_|_|_|_|_|_|_|_|_|
+         2|_|_|_|_|_|_|_|_|_|_|
+         3|_|_|_|_|_|_|_|_|_|_|
+         4|_|_|_|_|_|_|_|_|_|_|
+         5|_|_|_|_|_|_|_|_|_|_|
+         6|_|_|_|_|_|_|_|_|_|_|
+         7|_|_|_|_|_|_|_|_|_|_|
+         8|_|_|_|_|_|_|_|_|_|_|
+         9|_|_|_|_|_|_|_|_|_|_|
+        10|_|_|_|_|_|_|_|_|_|_|
+    Au-delà de 26 colonnes, chaque case est aussi large que les lettres de la dernière colonne : _Z_AA_AB_
+    """
+    CARACTERE_BATEAU = "="  # Case d'un bateau intact, quand les bateaux sont montrés
+
+    def __init__(self, sortie=None, ansi=False):
+        """
+        constructeur de la classe "RenduConsole"
+
+        :param sortie: fichier dans lequel écrire, par défaut la sortie standard
+        :param ansi: booléen indiquant si le terminal comprend les séquences d'échappement ANSI
+        """
+        self._sortie = sortie
+        self.ansi = ansi
+        self._taille = None  # Taille de la grille affichée en haut du terminal en mode ANSI
+        self._caracteres = []  # Caractère affiché de chaque case, indexé par "ligne * taille + colonne"
+        if ansi:
+            atexit.register(self.terminer)  # Ne pas laisser le terminal avec une zone de défilement réduite
+
+    def sortie(self):
+        """
+        :return: fichier dans lequel écrire
+        """
+        if self._sortie is None:
+            return sys.stdout  # Lu à chaque fois, "sys.stdout" peut être remplacé
+        return self._sortie
+
+    def ecrire(self, texte):
+        """
+        Écrit du texte en une seule fois.
+
+        :param texte: texte à écrire
+        :return: pas de retour
+        """
+        sortie = self.sortie()
+        sortie.write(texte)
+        sortie.flush()
+
+    @staticmethod
+    def largeur_colonne(taille):
+        """
+        Renvoie le nombre de caractères d'une case, égal au nombre de lettres de la dernière colonne.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :return: largeur d'une case
+        """
+        return len(lettres_colonne(taille - 1))
+
+    @staticmethod
+    def largeur_marge(taille):
+        """
+        :param taille: nombre de cases d'un côté de la grille
+        :return: nombre de caractères des numéros de ligne
+        """
+        return len(str(taille))
+
+    def image(self, grille, montrer_bateaux=False):
+        """
+        Construit l'image de toute la grille.
+
+        :param grille: grille à dessiner
+        :param montrer_bateaux: si "True", les cases des bateaux qui n'ont pas reçu de tir sont dessinées avec
+                                "CARACTERE_BATEAU", par ex. pour la grille de la flotte du joueur
+        :return: chaîne de caractères contenant la grille, terminée par un retour à la ligne
+        """
+        taille = grille.taille()
+        largeur = self.largeur_colonne(taille)
+        marge = self.largeur_marge(taille)
+        motifs = [caractere * largeur for caractere in Case.CARACTERES_ETAT]  # Texte d'une case, par état
+        if montrer_bateaux:
+            motifs[Etat.BATEAU_INTACT] = self.CARACTERE_BATEAU * largeur
+        lignes = [" " * marge + "".join("_" + lettres_colonne(i).ljust(largeur, "_") for i in range(taille)) + "_"]
+        for index_ligne, ligne in enumerate(grille.cases):
+            lignes.append(str(index_ligne + 1).rjust(marge) + "|" + "|".join(motifs[case.etat] for case in ligne) + "|")
+        return "\n".join(lignes) + "\n"
+
+    def position_case(self, taille, index_ligne, index_colonne):
+        """
+        Position dans le terminal du premier caractère d'une case de la grille affichée en haut du terminal.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param index_ligne: index de la ligne de la case
+        :param index_colonne: index de la colonne de la case
+        :return: tuple (ligne, colonne) du terminal, en commençant à 1
+        """
+        return index_ligne + 2, self.largeur_marge(taille) + index_colonne * (self.largeur_colonne(taille) + 1) + 2
+
+    def dessiner_grille(self, grille):
+        """
+        Dessine toute la grille.
+
+        En mode ANSI, l'écran est effacé, la grille est placée en haut du terminal et le défilement est limité aux
+        lignes situées en dessous.
+        :param grille: grille à dessiner
+        :return: pas de retour
+        """
+        if not self.ansi:
+            self.ecrire(self.image(grille))
+            return
+        taille = grille.taille()
+        hauteur_terminal = shutil.get_terminal_size().lines
+        self._taille = taille
+        self._caracteres = [case.caractere_etat() for ligne in grille.cases for case in ligne]
+        texte = EFFACER_ECRAN + self.image(grille)
+        if taille + 1 < hauteur_terminal:  # La grille tient dans le terminal : le texte suivant défile en dessous
+            texte += zone_de_defilement(taille + 2, hauteur_terminal) + deplacer_curseur(taille + 2, 1)
+        else:
+            self._taille = None  # La grille défilera avec le reste, on ne peut pas la modifier sur place
+        self.ecrire(texte)
+
+    def dessiner_cases(self, grille, cases=None):
+        """
+        Actualise l'affichage de la grille après un tir.
+
+        En mode ANSI, seules les cases dont le caractère a changé sont réécrites à leur place, sans déplacer le curseur
+        de saisie. Sinon, toute la grille est écrite de nouveau.
+        :param grille: grille à dessiner
+        :param cases: cases modifiées par le dernier tir, "None" s'il n'y en a pas
+        :return: pas de retour
+        """
+        if not self.ansi or self._taille != grille.taille():
+            self.dessiner_grille(grille)
+            return
+        morceaux = []
+        largeur = self.largeur_colonne(self._taille)
+        for case in cases or ():
+            indice = case.ligne * self._taille + case.colonne
+            caractere = case.caractere_etat()
+            if caractere != self._caracteres[indice]:
+                self._caracteres[indice] = caractere
+                morceaux.append(deplacer_curseur(*self.position_case(self._taille, case.ligne, case.colonne))
+                                + caractere * largeur)
+        if morceaux:
+            self.ecrire(SAUVER_CURSEUR + "".join(morceaux) + RESTAURER_CURSEUR)
+
+    def terminer(self):
+        """
+        Rend tout le terminal au défilement normal.
+
+        :return: pas de retour
+        """
+        if self.ansi and self._taille is not None:
+            self.ecrire(REINITIALISER_DEFILEMENT + deplacer_curseur(shutil.get_terminal_size().lines, 1))
+            self._taille = None
@@ -0,0 +1,242 @@
+# coding: utf-8
+"""
+Module contenant les limites de coups calibrées par simulation pour chaque difficulté.
+
+Pour une taille de grille et une flotte, on simule des parties d'un joueur de référence (la stratégie de chasse et de
+poursuite, proche d'un joueur humain attentif) et on garde la distribution du nombre de tirs nécessaires pour gagner.
+La limite de coups d'une difficulté est le plus petit nombre de coups avec lequel le joueur de référence gagne au moins
+la proportion de parties visée ("TAUX_VICTOIRE"). La limite de temps en découle (voir
+"Afficheur.generer_temps_maximum").
+
+Les limites sont gardées dans un fichier JSON ("FICHIER_CACHE") et ne sont calculées qu'une fois par configuration.
+Une calibration dure environ une seconde pour une grille de 10 cases de côté et quelques secondes au plus pour les
+grandes grilles ; elle peut être lancée en arrière-plan ("TableDifficulte.calibrer_en_arriere_plan") pendant que le
+joueur règle les paramètres.
+
+Exemple : python difficulte.py -t 8 10 15 20
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import random
+import threading
+
+import batailleNavale
+
+TAUX_VICTOIRE = (0.95, 0.75, 0.5)  # Proportion de parties gagnées par le joueur de référence, par "Difficulte"
+PARTIES_CALIBRATION = 1000
+PARTIES_MIN = 100  # Nombre de parties simulées même si "TIRS_MAX" est atteint avant
+TIRS_MAX = 100000  # Nombre total de tirs simulés au-delà duquel la calibration s'arrête, pour les grandes grilles
+FICHIER_CACHE = os.path.join(os.path.expanduser("~"), ".bataille_navale", "difficulte.json")
+
+
+def cle_configuration(taille, tailles_bateaux):
+    """
+    :param taille: nombre de cases d'un côté de la grille
+    :param tailles_bateaux: tailles des bateaux de la flotte
+    :return: clé de la configuration dans la table, par ex. "10:2,3,3,4,5"
+    """
+    return "{0}:{1}".format(taille, ",".join(str(taille_bateau) for taille_bateau in sorted(tailles_bateaux)))
+
+
+def limite_pour_taux(histogramme, taux):
+    """
+    Calcule le plus petit nombre de coups permettant de gagner au moins une proportion donnée des parties.
+
+    :param histogramme: dictionnaire nombre de tirs -> nombre de parties
+    :param taux: proportion de parties gagnées visée, entre 0 et 1
+    :return: nombre de coups
+    """
+    nombre_parties = sum(histogramme.values())
+    cumul = 0
+    for tirs in sorted(histogramme):
+        cumul += histogramme[tirs]
+        if cumul >= taux * nombre_parties:
+            return tirs
+    return max(histogramme)
+
+
+def simuler_reference(taille, tailles_bateaux, parties=PARTIES_CALIBRATION, graine=None):
+    """
+    Simule les parties du joueur de référence.
+
+    La simulation s'arrête avant "parties" si "TIRS_MAX" tirs ont été simulés, après au moins "PARTIES_MIN" parties :
+    la calibration reste rapide sur les grandes grilles, où chaque partie est longue.
+    :param taille: nombre de cases d'un côté de la grille
+    :param tailles_bateaux: tailles des bateaux de la flotte
+    :param parties: nombre de parties à simuler
+    :param graine: graine du générateur aléatoire, par défaut la clé de la configuration (calibration reproductible)
+    :return: dictionnaire nombre de tirs -> nombre de parties
+    """
+    from grillebinaire import GrilleBinaire  # Importés ici, pour ne pas charger les simulations au démarrage du jeu
+    from simulation import jouer_partie
+    from strategie import StrategieChasseCible
+
+    generateur = random.Random(cle_configuration(taille, tailles_bateaux) if graine is None else graine)
+    grille = GrilleBinaire(batailleNavale.creer_bateaux(batailleNavale.flotte_depuis_tailles(tailles_bateaux)), taille)
+    histogramme = {}
+    nombre_tirs = 0
+    for i in range(parties):
+        if i >= PARTIES_MIN and nombre_tirs >= TIRS_MAX:
+            break
+        if not grille.placer_bateaux(generateur):
+            raise ValueError("Impossible de placer les bateaux sur une grille de taille {0}".format(taille))
+        tirs = jouer_partie(grille, StrategieChasseCible(taille, tailles_bateaux, generateur))
+        histogramme[tirs] = histogramme.get(tirs, 0) + 1
+        nombre_tirs += tirs
+    return histogramme
+
+
+class TableDifficulte:
+    """
+    Table des limites de coups par configuration et par difficulté, gardée dans un fichier.
+
+    Les méthodes peuvent être appelées depuis plusieurs fils d'exécution : la table est protégée par un verrou et
+    une configuration n'est jamais calibrée deux fois en même temps. Une calibration en arrière-plan qui échoue n'est
+    pas relancée avant la création d'une nouvelle table.
+    """
+
+    def __init__(self, chemin=FICHIER_CACHE):
+        """
+        constructeur de la classe "TableDifficulte"
+
+        :param chemin: chemin du fichier JSON de la table, "None" pour ne rien enregistrer
+        """
+        self.chemin = chemin
+        self._limites = None  # clé de configuration -> liste des limites de coups par difficulté, lue à la demande
+        self._en_cours = set()  # clés des configurations en cours de calibration en arrière-plan
+        self._echecs = set()  # clés des configurations dont la calibration en arrière-plan a échoué
+        self._verrou = threading.Lock()
+
+    def _charger(self):
+        """
+        Lit le fichier de la table s'il n'a pas encore été lu. Un fichier absent ou illisible donne une table vide.
+
+        :return: pas de retour
+        """
+        if self._limites is not None:
+            return
+        self._limites = {}
+        if self.chemin is None:
+            return
+        try:
+            with open(self.chemin) as fichier:
+                donnees = json.load(fichier)
+        except (OSError, ValueError):
+            return
+        for cle, limites in donnees.get("limites", {}).items():
+            if isinstance(limites, list) and len(limites) == len(TAUX_VICTOIRE):
+                self._limites[cle] = limites
+
+    def _enregistrer(self):
+        """
+        Écrit la table dans son fichier, en passant par un fichier temporaire pour ne jamais laisser de fichier
+        incomplet. Les erreurs d'écriture sont ignorées : la table reste utilisable en mémoire.
+
+        :return: pas de retour
+        """
+        if self.chemin is None:
+            return
+        try:
+            dossier = os.path.dirname(self.chemin)
+            if dossier and not os.path.isdir(dossier):
+                os.makedirs(dossier)
+            temporaire = self.chemin + ".tmp"
+            with open(temporaire, "w") as fichier:
+                json.dump({"taux_victoire": TAUX_VICTOIRE, "parties": PARTIES_CALIBRATION, "limites": self._limites},
+                          fichier, indent=2, sort_keys=True)
+                fichier.write("\n")
+            os.replace(temporaire, self.chemin)
+        except OSError:
+            pass
+
+    def limite_coups(self, taille, tailles_bateaux, difficulte):
+        """
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles_bateaux: tailles des bateaux de la flotte
+        :param difficulte: difficulté ("Difficulte" ou son numéro)
+        :return: nombre maximum de coups, "None" si la configuration n'a pas encore été calibrée
+        """
+        with self._verrou:
+            self._charger()
+            limites = self._limites.get(cle_configuration(taille, tailles_bateaux))
+        if limites is None:
+            return None
+        return limites[int(difficulte)]
+
+    def calibrer(self, taille, tailles_bateaux, parties=PARTIES_CALIBRATION):
+        """
+        Calcule les limites d'une configuration par simulation et les enregistre.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles_bateaux: tailles des bateaux de la flotte
+        :param parties: nombre de parties simulées
+        :return: liste des limites de coups par difficulté
+        """
+        histogramme = simuler_reference(taille, tailles_bateaux, parties)
+        limites = [limite_pour_taux(histogramme, taux) for taux in TAUX_VICTOIRE]
+        with self._verrou:
+            self._charger()
+            self._limites[cle_configuration(taille, tailles_bateaux)] = limites
+            self._enregistrer()
+        return limites
+
+    def calibrer_en_arriere_plan(self, taille, tailles_bateaux):
+        """
+        Lance la calibration d'une configuration dans un fil d'exécution, si elle n'est pas déjà connue ou en cours.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles_bateaux: tailles des bateaux de la flotte
+        :return: fil d'exécution lancé, "None" si aucune calibration n'était nécessaire ou possible
+        """
+        cle = cle_configuration(taille, tailles_bateaux)
+        with self._verrou:
+            self._charger()
+            if cle in self._limites or cle in self._en_cours or cle in self._echecs:
+                return None
+            self._en_cours.add(cle)
+
+        def calibrer():
+            try:
+                self.calibrer(taille, list(tailles_bateaux))
+            except Exception:  # Par ex. la flotte ne rentre pas dans la grille : le jeu garde la formule approchée,
+                # sans afficher d'erreur au milieu de la partie ni recommencer la calibration
+                with self._verrou:
+                    self._echecs.add(cle)
+            finally:
+                with self._verrou:
+                    self._en_cours.discard(cle)
+
+        fil = threading.Thread(target=calibrer, name="calibration " + cle)
+        fil.daemon = True  # Le jeu peut se fermer sans attendre la fin de la calibration
+        fil.start()
+        return fil
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : calibre des configurations et affiche leurs limites.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Calibration des limites de coups de chaque difficulté.")
+    parser.add_argument("-t", "--tailles", type=int, nargs="+", default=[10], help="tailles de grille")
+    parser.add_argument("--flotte", default=None, help="fichier JSON décrivant la flotte (voir \"batailleNavale\")")
+    parser.add_argument("-n", "--parties", type=int, default=PARTIES_CALIBRATION, help="nombre de parties simulées")
+    parser.add_argument("--fichier", default=FICHIER_CACHE, help="fichier de la table")
+    arguments = parser.parse_args()
+
+    flotte = batailleNavale.charger_flotte(arguments.flotte) if arguments.flotte else batailleNavale.FLOTTE_DEFAUT
+    tailles_bateaux = batailleNavale.tailles_flotte(flotte)
+    table = TableDifficulte(arguments.fichier)
+    for taille in arguments.tailles:
+        limites = table.calibrer(taille, tailles_bateaux, arguments.parties)
+        print("{0} : {1}".format(cle_configuration(taille, tailles_bateaux), ", ".join(
+            "{0} coups pour {1:.0f} % de victoires".format(limite, taux * 100)
+            for limite, taux in zip(limites, TAUX_VICTOIRE))))
+
+
+if __name__ == "__main__":
+    main()
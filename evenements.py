@@ -0,0 +1,146 @@
+# coding: utf-8
+"""
+Module contenant la boucle d'attente des entrées du joueur.
+
+Pendant qu'on attend une entrée, une boucle "asyncio" reste active : elle reçoit les lignes de la console, appelle
+régulièrement des fonctions de "tic" (par exemple pour garder la fenêtre de la tortue réactive et mettre à jour le
+compte à rebours) et peut recevoir des entrées d'autres sources, comme une intelligence artificielle ou le réseau.
+"""
+import asyncio
+import sys
+import threading
+
+
+class BoucleEntrees:
+    """
+    Classe attendant la première entrée fournie par l'une de ses sources.
+
+    Les sources sont :
+        - la console, lue par un fil d'exécution dédié, pour que la lecture bloquante de "stdin" ne bloque pas la
+          boucle ;
+        - les fonctions de tic, appelées toutes les "PERIODE_TIC" secondes, qui terminent l'attente en renvoyant
+          autre chose que "None" ;
+        - les sources supplémentaires, fonctions sans paramètre renvoyant une coroutine dont le résultat est l'entrée.
+    Les lignes de la console arrivées alors que personne ne les attendait sont gardées pour les attentes suivantes.
+    """
+    PERIODE_TIC = 0.1  # en secondes
+
+    def __init__(self, entree=None):
+        """
+        constructeur de la classe "BoucleEntrees"
+
+        :param entree: fichier à lire, par défaut l'entrée standard
+        """
+        self._entree = entree
+        self._boucle = asyncio.new_event_loop()
+        self._lignes = None  # File des lignes lues dans la console, créée dans la boucle au premier besoin
+        self._lecteur = None  # Fil d'exécution lisant la console
+        self._fin_de_fichier = False
+        self._tics = []
+        self._sources = []
+
+    def ajouter_tic(self, fonction):
+        """
+        Ajoute une fonction appelée à chaque tic pendant les attentes.
+
+        :param fonction: fonction sans paramètre, l'attente se termine si elle renvoie autre chose que "None"
+        :return: pas de retour
+        """
+        self._tics.append(fonction)
+
+    def enlever_tic(self, fonction):
+        """
+        Enlève une fonction de tic.
+
+        :param fonction: fonction ajoutée avec "ajouter_tic"
+        :return: pas de retour
+        """
+        self._tics.remove(fonction)
+
+    def ajouter_source(self, fabrique):
+        """
+        Ajoute une source d'entrées, attendue en même temps que la console.
+
+        :param fabrique: fonction sans paramètre renvoyant une coroutine, appelée au début de chaque attente, dont le
+                         résultat termine l'attente
+        :return: pas de retour
+        """
+        self._sources.append(fabrique)
+
+    def enlever_source(self, fabrique):
+        """
+        Enlève une source d'entrées.
+
+        :param fabrique: fonction ajoutée avec "ajouter_source"
+        :return: pas de retour
+        """
+        self._sources.remove(fabrique)
+
+    def _lire_console(self):
+        """
+        Lit la console ligne par ligne et transmet chaque ligne à la boucle. Exécutée dans un fil d'exécution dédié.
+
+        :return: pas de retour
+        """
+        entree = self._entree if self._entree is not None else sys.stdin
+        while True:
+            ligne = entree.readline()
+            self._boucle.call_soon_threadsafe(self._lignes.put_nowait, ligne)
+            if not ligne:  # Fin du fichier
+                return
+
+    async def _ligne_console(self):
+        """
+        :return: prochaine ligne de la console, sans le retour à la ligne, ou "" à la fin du fichier
+        """
+        if self._fin_de_fichier:
+            return ""
+        if self._lignes is None:
+            self._lignes = asyncio.Queue()
+            self._lecteur = threading.Thread(target=self._lire_console)
+            self._lecteur.daemon = True  # La lecture ne doit pas empêcher le programme de se terminer
+            self._lecteur.start()
+        ligne = await self._lignes.get()
+        if not ligne:
+            self._fin_de_fichier = True
+        return ligne.replace("\n", "")
+
+    async def _tic(self):
+        """
+        Appelle les fonctions de tic jusqu'à ce que l'une d'elles renvoie une valeur.
+
+        :return: valeur renvoyée par la fonction de tic
+        """
+        while True:
+            for fonction in list(self._tics):
+                resultat = fonction()
+                if resultat is not None:
+                    return resultat
+            await asyncio.sleep(self.PERIODE_TIC)
+
+    async def _premiere_entree(self):
+        """
+        Attend la première entrée de toutes les sources et annule les autres attentes.
+
+        :return: entrée reçue
+        """
+        taches = [asyncio.ensure_future(self._ligne_console()), asyncio.ensure_future(self._tic())]
+        taches.extend(asyncio.ensure_future(fabrique()) for fabrique in self._sources)
+        try:
+            terminees, _ = await asyncio.wait(taches, return_when=asyncio.FIRST_COMPLETED)
+            for tache in taches:  # Dans l'ordre des sources, la console a la priorité
+                if tache in terminees:
+                    return tache.result()
+        finally:
+            for tache in taches:
+                tache.cancel()  # Une ligne dont l'attente est annulée reste dans la file
+            await asyncio.gather(*taches, return_exceptions=True)
+
+    def attendre(self):
+        """
+        Attend la première entrée de l'une des sources.
+
+        :return: entrée reçue : ligne de la console sans le retour à la ligne, ou valeur renvoyée par une fonction de
+                 tic ou une source supplémentaire
+        """
+        return self._boucle.run_until_complete(self._premiere_entree())
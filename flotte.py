@@ -0,0 +1,60 @@
+# coding: utf-8
+"""
+Module contenant le registre de la flotte d'une grille.
+
+Le registre tient à jour le nombre de bateaux à flot, au total et par type. Les bateaux le préviennent eux-mêmes
+lorsqu'ils sont coulés ou remis à flot, ce qui rend toutes les questions du type "combien de bateaux restent-ils ?" ou
+"la partie est-elle gagnée ?" immédiates, sans parcourir les bateaux ni leurs cases.
+"""
+
+
+class Flotte:
+    """
+    Registre des bateaux d'une grille.
+
+    Chaque grille a son propre registre : les compteurs ne sont pas partagés entre grilles, contrairement à des
+    attributs de classe.
+    """
+
+    def __init__(self, bateaux):
+        """
+        constructeur de la classe "Flotte"
+
+        Les bateaux sont rattachés au registre, qui compte ceux qui sont déjà à flot.
+        :param bateaux: liste des bateaux de la grille
+        """
+        self.bateaux = bateaux
+        self.types = []  # types des bateaux, dans l'ordre de leur première apparition dans "bateaux"
+        self._nombre_restant = {}  # nombre de bateaux à flot par type
+        self.nombre_a_flot = 0
+        for bateau in bateaux:
+            if bateau.TYPE not in self._nombre_restant:
+                self.types.append(bateau.TYPE)
+                self._nombre_restant[bateau.TYPE] = 0
+            bateau.flotte = self
+            if not bateau.est_coule():
+                self.changer_etat(bateau, 1)
+
+    def changer_etat(self, bateau, variation):
+        """
+        Méthode appelée par un bateau lorsqu'il est coulé ou remis à flot.
+
+        :param bateau: bateau dont l'état a changé
+        :param variation: 1 si le bateau est de nouveau à flot, -1 s'il vient d'être coulé
+        :return: pas de retour
+        """
+        self._nombre_restant[bateau.TYPE] += variation
+        self.nombre_a_flot += variation
+
+    def nombre_restant(self, type_bateau):
+        """
+        :param type_bateau: type des bateaux
+        :return: nombre de bateaux de ce type encore à flot
+        """
+        return self._nombre_restant.get(type_bateau, 0)
+
+    def est_coulee(self):
+        """
+        :return: booléen valant "True" si plus aucun bateau n'est à flot
+        """
+        return self.nombre_a_flot == 0
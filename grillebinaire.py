@@ -0,0 +1,319 @@
+# coding: utf-8
+"""
+Module contenant une variante de la grille de jeu dont l'état est stocké dans des masques binaires.
+
+Chaque case de la grille correspond à un bit d'un entier, l'index du bit étant "ligne * taille + colonne".
+Les tirs, les vérifications de collision et le décompte des bateaux restants deviennent ainsi de simples opérations
+binaires sur des entiers, sans parcourir d'objets "Case".
+"""
+from array import array
+import random
+import sys
+
+from case import Etat, AbstractGrilleCompacte
+from placement import placer_flotte, indices_masque
+
+_TABLES_ETATS = {}  # Tables de "bytes.translate" de "masque_etats", indexées par l'ensemble des états recherchés
+DANS_L_EAU, TOUCHE, COULE = Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE  # Lus à chaque tir, bien plus rapidement que les
+# attributs de la classe "Etat"
+
+
+def masque_etats(etats, valeurs):
+    """
+    Construit le masque des cases dont l'état fait partie de "valeurs".
+
+    :param etats: "bytes" contenant l'état de chaque case, rangées par index
+    :param valeurs: ensemble des états recherchés
+    :return: masque des cases trouvées
+    """
+    if not etats:
+        return 0
+    cle = frozenset(valeurs)
+    if cle not in _TABLES_ETATS:
+        _TABLES_ETATS[cle] = bytes(bytearray(ord("1") if valeur in cle else ord("0") for valeur in range(256)))
+    return int(etats.translate(_TABLES_ETATS[cle])[::-1], 2)  # Le bit de poids faible correspond à la première case
+
+
+class GrilleBinaire(AbstractGrilleCompacte):
+    """
+    Grille de jeu dont l'état est représenté par des masques binaires.
+
+    Les masques sont les suivants :
+        "occupation" : cases occupées par un bateau
+        "tirs" : cases ayant reçu un tir
+        "touches" : cases où un bateau a été touché
+        "coules" : cases appartenant à un bateau coulé
+    Chaque bateau possède en plus son propre masque, stocké dans "_masques_bateaux" dans le même ordre que "bateaux".
+    """
+
+    def __init__(self, bateaux, taille=10):
+        """
+        constructeur de la classe "GrilleBinaire"
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        """
+        self.bateaux = bateaux
+        self._masques_bateaux = [0] * len(bateaux)
+        self.occupation = 0
+        self.tirs = 0
+        self.touches = 0
+        self.coules = 0
+        self._cases = None
+        self._vues_tirs = {}  # Tuple contenant la vue sur une case, indexé par l'index de la case, voir "tirer_indice"
+        self._taille = 0
+        self.set_taille(taille)
+
+    def etat_case(self, indice):
+        """
+        Calcule l'état d'une case à partir des masques.
+
+        :param indice: index de la case
+        :return: état de la case
+        """
+        bit = 1 << indice
+        if self.coules & bit:
+            return Etat.COULE
+        if self.touches & bit:
+            return Etat.TOUCHE
+        if self.tirs & bit:
+            return Etat.DANS_L_EAU
+        if self.occupation & bit:
+            return Etat.BATEAU_INTACT
+        return Etat.VIDE
+
+    def numero_bateau(self, indice):
+        """
+        Renvoie la position dans "bateaux" du bateau occupant une case.
+
+        :param indice: index de la case
+        :return: numéro du bateau ou "None" si la case est vide
+        """
+        bit = 1 << indice
+        if self.occupation & bit:
+            for numero, masque in enumerate(self._masques_bateaux):
+                if masque & bit:
+                    return numero
+        return None
+
+    def bateau_case(self, indice):
+        """
+        Renvoie le bateau occupant une case.
+
+        :param indice: index de la case
+        :return: bateau présent sur la case ou "None" si la case est vide
+        """
+        numero = self.numero_bateau(indice)
+        if numero is None:
+            return None
+        return self.bateaux[numero]
+
+    def enlever_bateaux(self):
+        """
+        Enlève tous les bateaux de la grille.
+
+        :return: pas de retour
+        """
+        self._masques_bateaux = [0] * len(self.bateaux)
+        self.occupation = 0
+
+    def reinitialiser(self):
+        """
+        Remet toutes les cases à leur état initial.
+
+        :return: pas de retour
+        """
+        self.enlever_bateaux()
+        self.tirs = 0
+        self.touches = 0
+        self.coules = 0
+
+    def placer_bateau(self, numero, masque):
+        """
+        Place un bateau sur les cases d'un masque si elles sont toutes libres.
+
+        :param numero: position du bateau dans "bateaux"
+        :param masque: masque des cases à occuper
+        :return: réussite de l'opération
+        """
+        if self.occupation & masque:  # Si au moins une case est déjà occupée
+            return False
+        self.occupation = (self.occupation & ~self._masques_bateaux[numero]) | masque
+        self._masques_bateaux[numero] = masque
+        return True
+
+    def placer_bateaux(self, generateur=random):
+        """
+        Fonction permettant de placer des bateaux de manière aléatoire sur la grille
+
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        :return: réussite de l'opération
+        """
+        self.reinitialiser()
+        masques = placer_flotte(self._taille, [bateau.TAILLE for bateau in self.bateaux], generateur=generateur)
+        if masques is None:  # La flotte ne rentre pas dans la grille
+            return False
+        for numero, masque in enumerate(masques):
+            self.placer_bateau(numero, masque)
+        return True
+
+    def positions_bateaux(self):
+        """
+        Renvoie les cases occupées par chaque bateau.
+
+        :return: liste de tuples contenant les index des cases de chaque bateau, dans l'ordre de "bateaux"
+        """
+        return [tuple(indices_masque(masque)) for masque in self._masques_bateaux]
+
+    def placer_bateaux_positions(self, positions):
+        """
+        Place les bateaux à des positions données, par exemple pour rejouer une partie enregistrée.
+
+        La grille est remise à zéro avant le placement.
+        :param positions: positions des bateaux, voir "Grille.positions_valides"
+        :return: réussite de l'opération
+        """
+        if not self.positions_valides(positions):
+            return False
+        self.reinitialiser()
+        for numero, indices in enumerate(positions):
+            masque = 0
+            for indice in indices:
+                masque |= 1 << indice
+            self.placer_bateau(numero, masque)
+        return True
+
+    def etats_octets(self):
+        """
+        :return: "bytes" contenant l'état de chaque case, rangées par index
+        """
+        etats = bytearray(self._taille ** 2)
+        # Les masques suivants sont de plus en plus précis, chacun écrase l'état donné par le précédent
+        for masque, etat in ((self.occupation, Etat.BATEAU_INTACT), (self.tirs, Etat.DANS_L_EAU),
+                             (self.touches, Etat.TOUCHE), (self.coules, Etat.COULE)):
+            for indice in indices_masque(masque):
+                etats[indice] = etat
+        return bytes(etats)
+
+    def numeros_octets(self):
+        """
+        :return: "bytes" contenant le numéro du bateau de chaque case, voir "Grille.numeros_octets"
+        """
+        tableau = array("h", [-1]) * (self._taille ** 2)
+        for numero, masque in enumerate(self._masques_bateaux):
+            for indice in indices_masque(masque):
+                tableau[indice] = numero
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        return tableau.tobytes()
+
+    @classmethod
+    def depuis_etats(cls, bateaux, taille, etats, numeros):
+        """
+        Crée une grille à partir de l'état et du bateau de chaque case, voir "Grille.depuis_etats".
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        :param etats: "bytes" contenant l'état de chaque case
+        :param numeros: "bytes" contenant le numéro du bateau de chaque case
+        :return: nouvelle grille
+        """
+        grille = cls._creer_vide(bateaux, taille)
+        grille._cases = None
+        grille._vues_tirs = {}
+        tableau = array("h")
+        tableau.frombytes(numeros)
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        grille.occupation = masque_etats(etats, {Etat.BATEAU_INTACT, Etat.TOUCHE, Etat.COULE})
+        grille._masques_bateaux = [0] * len(bateaux)
+        for indice in indices_masque(grille.occupation):
+            grille._masques_bateaux[tableau[indice]] |= 1 << indice
+        grille.tirs = masque_etats(etats, {Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE})
+        grille.touches = masque_etats(etats, {Etat.TOUCHE, Etat.COULE})
+        grille.coules = masque_etats(etats, {Etat.COULE})
+        return grille
+
+    def cloner(self):
+        """
+        Copie la grille en recopiant ses masques.
+
+        :return: nouvelle grille indépendante de celle-ci, avec de nouveaux bateaux du même type
+        """
+        grille = self._creer_vide([type(bateau)() for bateau in self.bateaux], self._taille)
+        grille._cases = None
+        grille._vues_tirs = {}
+        grille._masques_bateaux = list(self._masques_bateaux)
+        grille.occupation = self.occupation
+        grille.tirs = self.tirs
+        grille.touches = self.touches
+        grille.coules = self.coules
+        return grille
+
+    def bateaux_restants(self):
+        """
+        Renvoie les bateaux non coulés
+
+        :return: bateaux restants
+        """
+        return [bateau for bateau, masque in zip(self.bateaux, self._masques_bateaux)
+                if (self.coules & masque) != masque]
+
+    def flotte_coulee(self):
+        """
+        Détermine si tous les bateaux de la grille ont été coulés.
+
+        :return: booléen valant "True" si plus aucun bateau n'est à flot
+        """
+        return (self.touches & self.occupation) == self.occupation
+
+    def tirer_masque(self, indice):
+        """
+        Tire sur la case d'index "indice" et renvoie les cases modifiées sous forme de masque.
+
+        C'est la version la plus rapide du tir, car elle ne crée aucun objet, elle est destinée aux simulations.
+        :param indice: index de la case visée
+        :return: 1. État de la case après le tir, "None" si la case a déjà reçu un tir
+                 2. Masque des cases modifiées (0 si aucune case n'a été modifiée)
+        """
+        bit = 1 << indice
+        if self.tirs & bit:
+            return None, 0
+        self.tirs |= bit
+        if not self.occupation & bit:
+            return DANS_L_EAU, bit
+        self.touches |= bit
+        masque = 0
+        for masque in self._masques_bateaux:
+            if masque & bit:
+                break
+        if (self.touches & masque) != masque:
+            return TOUCHE, bit
+        self.coules |= masque  # Toutes les cases du bateau sont touchées, il est coulé
+        return COULE, masque
+
+    def tirer_indice(self, indice):
+        """
+        Tire sur la case d'index "indice" sans aucune conversion de coordonnées.
+
+        Un tir qui ne coule pas de bateau ne modifie que la case visée : le tuple contenant la vue sur cette case est
+        créé au premier tir sur la case, puis réutilisé aux parties suivantes. Les vues étant lues dans la grille au
+        moment de l'accès, elles restent valables. Seul un bateau coulé demande de créer des vues.
+        :param indice: index de la case visée
+        :return: 1. État de la case après le tir, "None" si la case a déjà reçu un tir
+                 2. Tuple des cases modifiées s'il y en a, "None" sinon
+        """
+        bit = 1 << indice
+        if self.tirs & bit:
+            return None, None
+        if not self.occupation & bit:  # Tir dans l'eau, le plus fréquent, traité sans appeler "tirer_masque"
+            self.tirs |= bit
+            etat = DANS_L_EAU
+        else:
+            etat, masque = self.tirer_masque(indice)
+            if etat is COULE:
+                return etat, tuple(self._vue(i) for i in indices_masque(masque))
+        cases = self._vues_tirs.get(indice)
+        if cases is None:
+            cases = self._vues_tirs[indice] = (self._vue(indice),)
+        return etat, cases
@@ -0,0 +1,325 @@
+# coding: utf-8
+"""
+Module contenant une grille de jeu creuse, destinée aux très grandes grilles.
+
+Seules les cases occupées par un bateau et celles qui ont reçu un tir sont stockées, dans des dictionnaires indexés par
+l'index de la case ("ligne * taille + colonne") ; toutes les autres cases sont implicitement vides. La mémoire utilisée
+dépend donc du nombre de bateaux et de tirs, et non de la surface de la grille.
+"""
+from array import array
+import random
+import sys
+
+from case import Etat, CaseVue, AbstractGrilleCompacte
+from placement import TAILLE_MASQUES_MAX, placer_flotte, placer_flotte_indices, indices_masque
+
+
+class LigneCreuse:
+    """
+    Ligne d'une grille creuse, dont les vues sur les cases sont créées au moment de l'accès.
+    """
+
+    def __init__(self, grille, index_ligne):
+        """
+        constructeur de la classe "LigneCreuse"
+
+        :param grille: grille à laquelle appartient la ligne
+        :param index_ligne: index de la ligne dans la grille
+        """
+        self._grille = grille
+        self._debut = index_ligne * grille.taille()
+
+    def __len__(self):
+        return self._grille.taille()
+
+    def __getitem__(self, index_colonne):
+        if index_colonne < 0:
+            index_colonne += len(self)
+        if not 0 <= index_colonne < len(self):
+            raise IndexError(index_colonne)
+        return CaseVue(self._grille, self._debut + index_colonne)
+
+    def __iter__(self):
+        for index_colonne in range(len(self)):
+            yield CaseVue(self._grille, self._debut + index_colonne)
+
+
+class CasesCreuses:
+    """
+    Tableau des cases d'une grille creuse, accédé comme "Grille.cases" : cases[ligne][colonne].
+    """
+
+    def __init__(self, grille):
+        """
+        constructeur de la classe "CasesCreuses"
+
+        :param grille: grille dont on veut accéder aux cases
+        """
+        self._grille = grille
+
+    def __len__(self):
+        return self._grille.taille()
+
+    def __getitem__(self, index_ligne):
+        if index_ligne < 0:
+            index_ligne += len(self)
+        if not 0 <= index_ligne < len(self):
+            raise IndexError(index_ligne)
+        return LigneCreuse(self._grille, index_ligne)
+
+    def __iter__(self):
+        for index_ligne in range(len(self)):
+            yield LigneCreuse(self._grille, index_ligne)
+
+
+class GrilleCreuse(AbstractGrilleCompacte):
+    """
+    Grille de jeu ne stockant que les bateaux et les cases ayant reçu un tir.
+
+    "_numeros_bateaux" associe à chaque case occupée le numéro de son bateau dans "bateaux" et "_tirs" associe à
+    chaque case visée son état après le tir.
+    """
+    TAILLE_MAX = 100000
+    TAILLE_PLACEMENT_EXACT = TAILLE_MASQUES_MAX  # Jusqu'à cette taille, on utilise le placement par contraintes de
+    # "placement"
+
+    def __init__(self, bateaux, taille=10):
+        """
+        constructeur de la classe "GrilleCreuse"
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        """
+        self.bateaux = bateaux
+        self._numeros_bateaux = {}
+        self._cases_bateaux = [[] for _ in bateaux]  # index des cases de chaque bateau
+        self._touches = [0] * len(bateaux)  # nombre de cases touchées de chaque bateau
+        self._nombre_coules = 0
+        self._tirs = {}
+        self._cases = None
+        self._taille = 0
+        self.set_taille(taille)
+
+    @property
+    def cases(self):
+        """
+        Tableau des cases de la grille, dont les vues sont créées au moment de l'accès et jamais gardées en mémoire.
+
+        :return: objet "CasesCreuses"
+        """
+        return CasesCreuses(self)
+
+    def _vue(self, indice):
+        """
+        :param indice: index de la case
+        :return: nouvelle vue sur la case
+        """
+        return CaseVue(self, indice)
+
+    def etat_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: état de la case
+        """
+        etat = self._tirs.get(indice)
+        if etat is not None:
+            return etat
+        if indice in self._numeros_bateaux:
+            return Etat.BATEAU_INTACT
+        return Etat.VIDE
+
+    def bateau_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: bateau présent sur la case ou "None" si la case est vide
+        """
+        numero = self._numeros_bateaux.get(indice)
+        if numero is None:
+            return None
+        return self.bateaux[numero]
+
+    def enlever_bateaux(self):
+        """
+        Enlève tous les bateaux de la grille.
+
+        :return: pas de retour
+        """
+        self._numeros_bateaux = {}
+        self._cases_bateaux = [[] for _ in self.bateaux]
+        self._touches = [0] * len(self.bateaux)
+        self._nombre_coules = 0
+
+    def reinitialiser(self):
+        """
+        Remet toutes les cases à leur état initial.
+
+        :return: pas de retour
+        """
+        self.enlever_bateaux()
+        self._tirs = {}
+
+    def _poser_bateau(self, numero, indices):
+        """
+        Pose un bateau sur des cases supposées libres.
+
+        :param numero: numéro du bateau dans "bateaux"
+        :param indices: index des cases du bateau
+        :return: pas de retour
+        """
+        self._cases_bateaux[numero] = list(indices)
+        for indice in indices:
+            self._numeros_bateaux[indice] = numero
+
+    def placer_bateaux(self, generateur=random):
+        """
+        Fonction permettant de placer des bateaux de manière aléatoire sur la grille
+
+        Sur une petite grille, on utilise le placement par contraintes. Sur une grande grille, les bateaux occupent
+        une infime partie des cases : "placement.placer_flotte_indices" les tire directement et évite de manipuler
+        des masques d'un million de bits.
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        :return: réussite de l'opération
+        """
+        self.reinitialiser()
+        tailles = [bateau.TAILLE for bateau in self.bateaux]
+        if self._taille <= self.TAILLE_PLACEMENT_EXACT:
+            masques = placer_flotte(self._taille, tailles, generateur=generateur)
+            placements = None if masques is None else [indices_masque(masque) for masque in masques]
+        else:
+            placements = placer_flotte_indices(self._taille, tailles, generateur)
+        if placements is None:  # La flotte ne rentre pas dans la grille
+            return False
+        for numero, indices in enumerate(placements):
+            self._poser_bateau(numero, indices)
+        return True
+
+    def positions_bateaux(self):
+        """
+        Renvoie les cases occupées par chaque bateau.
+
+        :return: liste de tuples contenant les index des cases de chaque bateau, dans l'ordre de "bateaux"
+        """
+        return [tuple(sorted(indices)) for indices in self._cases_bateaux]
+
+    def placer_bateaux_positions(self, positions):
+        """
+        Place les bateaux à des positions données, par exemple pour rejouer une partie enregistrée.
+
+        La grille est remise à zéro avant le placement.
+        :param positions: positions des bateaux, voir "Grille.positions_valides"
+        :return: réussite de l'opération
+        """
+        if not self.positions_valides(positions):
+            return False
+        self.reinitialiser()
+        for numero, indices in enumerate(positions):
+            self._poser_bateau(numero, indices)
+        return True
+
+    def etats_octets(self):
+        """
+        :return: "bytes" contenant l'état de chaque case, rangées par index
+        """
+        etats = bytearray(self._taille ** 2)
+        for indice in self._numeros_bateaux:
+            etats[indice] = Etat.BATEAU_INTACT
+        for indice, etat in self._tirs.items():
+            etats[indice] = etat
+        return bytes(etats)
+
+    def numeros_octets(self):
+        """
+        :return: "bytes" contenant le numéro du bateau de chaque case, voir "Grille.numeros_octets"
+        """
+        tableau = array("h", [-1]) * (self._taille ** 2)
+        for indice, numero in self._numeros_bateaux.items():
+            tableau[indice] = numero
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        return tableau.tobytes()
+
+    @classmethod
+    def depuis_etats(cls, bateaux, taille, etats, numeros):
+        """
+        Crée une grille à partir de l'état et du bateau de chaque case, voir "Grille.depuis_etats".
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        :param etats: "bytes" contenant l'état de chaque case
+        :param numeros: "bytes" contenant le numéro du bateau de chaque case
+        :return: nouvelle grille
+        """
+        grille = cls._creer_vide(bateaux, taille)
+        grille._cases = None
+        grille.reinitialiser()
+        tableau = array("h")
+        tableau.frombytes(numeros)
+        if sys.byteorder == "big":
+            tableau.byteswap()
+        for indice, etat in enumerate(etats):
+            if etat == Etat.VIDE:
+                continue
+            if etat != Etat.BATEAU_INTACT:
+                grille._tirs[indice] = Etat(etat)
+            if etat != Etat.DANS_L_EAU:
+                numero = tableau[indice]
+                grille._numeros_bateaux[indice] = numero
+                grille._cases_bateaux[numero].append(indice)
+                if etat != Etat.BATEAU_INTACT:
+                    grille._touches[numero] += 1
+        grille._nombre_coules = sum(1 for bateau, touches in zip(bateaux, grille._touches) if touches == bateau.TAILLE)
+        return grille
+
+    def cloner(self):
+        """
+        Copie la grille en recopiant ses dictionnaires, sans parcourir les cases vides.
+
+        :return: nouvelle grille indépendante de celle-ci, avec de nouveaux bateaux du même type
+        """
+        grille = self._creer_vide([type(bateau)() for bateau in self.bateaux], self._taille)
+        grille._cases = None
+        grille._numeros_bateaux = dict(self._numeros_bateaux)
+        grille._cases_bateaux = [list(indices) for indices in self._cases_bateaux]
+        grille._touches = list(self._touches)
+        grille._nombre_coules = self._nombre_coules
+        grille._tirs = dict(self._tirs)
+        return grille
+
+    def bateaux_restants(self):
+        """
+        Renvoie les bateaux non coulés
+
+        :return: bateaux restants
+        """
+        return [bateau for bateau, touches in zip(self.bateaux, self._touches) if touches < bateau.TAILLE]
+
+    def flotte_coulee(self):
+        """
+        Détermine si tous les bateaux de la grille ont été coulés.
+
+        :return: booléen valant "True" si plus aucun bateau n'est à flot
+        """
+        return self._nombre_coules == len(self.bateaux)
+
+    def tirer_indice(self, indice):
+        """
+        Tire sur la case d'index "indice" sans aucune conversion de coordonnées.
+
+        :param indice: index de la case visée
+        :return: 1. État de la case après le tir, "None" si la case a déjà reçu un tir
+                 2. Cases modifiées s'il y en a, "None" sinon
+        """
+        if indice in self._tirs:
+            return None, None
+        numero = self._numeros_bateaux.get(indice)
+        if numero is None:
+            self._tirs[indice] = Etat.DANS_L_EAU
+            return Etat.DANS_L_EAU, [CaseVue(self, indice)]
+        self._tirs[indice] = Etat.TOUCHE
+        self._touches[numero] += 1
+        if self._touches[numero] < len(self._cases_bateaux[numero]):
+            return Etat.TOUCHE, [CaseVue(self, indice)]
+        self._nombre_coules += 1
+        for case in self._cases_bateaux[numero]:
+            self._tirs[case] = Etat.COULE
+        return Etat.COULE, [CaseVue(self, case) for case in self._cases_bateaux[numero]]
@@ -0,0 +1,357 @@
+# coding: utf-8
+"""
+Module contenant des grilles de jeu stockées dans des tableaux NumPy.
+
+L'état des cases est un tableau d'entiers "uint8" contenant les valeurs de "Etat" et l'occupation un tableau "int16"
+contenant le numéro du bateau présent sur chaque case (-1 si la case est vide). Ce module nécessite NumPy, qui n'est
+pas nécessaire au reste du jeu.
+
+En plus des opérations de "Grille", les tirs peuvent être résolus par lots : un tableau entier de coordonnées est
+traité en une seule passe vectorisée, y compris sur une pile de plusieurs grilles à la fois ("PileDeGrilles").
+"""
+import random
+
+import numpy as np
+
+from case import Etat, AbstractGrilleCompacte
+from placement import placer_flotte, indices_masque
+
+DEJA_TIRE = 255  # Code renvoyé par les tirs par lots lorsque la case avait déjà reçu un tir
+
+
+def resoudre_tirs(etats, ids, touches, tailles, grilles, cellules):
+    """
+    Résout un lot de tirs sur une pile de grilles en une seule passe vectorisée.
+
+    Les tirs sont traités comme s'ils avaient lieu l'un après l'autre dans l'ordre du lot : un deuxième tir sur la
+    même case est signalé par "DEJA_TIRE" et seul le tir qui touche la dernière case d'un bateau renvoie "COULE".
+    :param etats: tableau (nombre de grilles, nombre de cases) des états des cases, modifié sur place
+    :param ids: tableau (nombre de grilles, nombre de cases) des numéros des bateaux, -1 pour une case vide
+    :param touches: tableau (nombre de grilles, nombre de bateaux) du nombre de cases touchées, modifié sur place
+    :param tailles: tableau (nombre de bateaux) de la taille de chaque bateau
+    :param grilles: tableau des numéros des grilles visées
+    :param cellules: tableau des index des cases visées ("ligne * taille + colonne"), de même forme que "grilles"
+    :return: tableau "uint8" de même forme que "cellules" contenant l'état de chaque case après son tir ou "DEJA_TIRE"
+    """
+    forme = np.shape(cellules)
+    grilles = np.asarray(grilles, dtype=np.int64).reshape(-1)
+    cles = grilles * etats.shape[1] + np.asarray(cellules, dtype=np.int64).reshape(-1)
+    resultats = np.full(cles.shape, DEJA_TIRE, dtype=np.uint8)
+    etats_plats = etats.reshape(-1)
+    ids_plats = ids.reshape(-1)
+    touches_plats = touches.reshape(-1)
+
+    # Seul le premier tir sur chaque case peut être valide, et seulement si la case n'avait jamais été visée
+    _, positions = np.unique(cles, return_index=True)
+    positions = positions[etats_plats[cles[positions]] <= Etat.BATEAU_INTACT]
+    cibles = cles[positions]
+    dans_l_eau = etats_plats[cibles] == Etat.VIDE
+
+    etats_plats[cibles[dans_l_eau]] = Etat.DANS_L_EAU
+    resultats[positions[dans_l_eau]] = Etat.DANS_L_EAU
+
+    touche = ~dans_l_eau
+    positions = positions[touche]
+    cibles = cibles[touche]
+    etats_plats[cibles] = Etat.TOUCHE
+    resultats[positions] = Etat.TOUCHE
+    numeros = ids_plats[cibles].astype(np.int64)
+    bateaux = grilles[positions] * touches.shape[1] + numeros  # numéro du bateau dans toute la pile
+    np.add.at(touches_plats, bateaux, 1)
+
+    coules = np.unique(bateaux[touches_plats[bateaux] >= tailles[numeros]])
+    if coules.size:
+        # Le dernier tir du lot sur un bateau coulé est celui qui l'a coulé
+        dernier_tir = np.full(touches_plats.shape, -1, dtype=np.int64)
+        np.maximum.at(dernier_tir, bateaux, positions)
+        resultats[dernier_tir[coules]] = Etat.COULE
+        grilles_coulees, numeros_coules = np.divmod(coules, touches.shape[1])
+        lignes, colonnes = np.nonzero(ids[grilles_coulees] == numeros_coules[:, np.newaxis])
+        etats[grilles_coulees[lignes], colonnes] = Etat.COULE
+    return resultats.reshape(forme)
+
+
+class GrilleNumpy(AbstractGrilleCompacte):
+    """
+    Grille de jeu dont l'état est stocké dans des tableaux NumPy.
+
+    "etats[ligne, colonne]" contient l'état de la case et "ids[ligne, colonne]" le numéro du bateau qui l'occupe dans
+    "bateaux", ou -1.
+    """
+
+    def __init__(self, bateaux, taille=10):
+        """
+        constructeur de la classe "GrilleNumpy"
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        """
+        self.bateaux = bateaux
+        self._tailles = np.array([bateau.TAILLE for bateau in bateaux], dtype=np.int16)
+        self.touches = np.zeros((1, len(bateaux)), dtype=np.int16)
+        self.etats = None
+        self.ids = None
+        self._cases = None
+        self._taille = 0
+        self.set_taille(taille)
+
+    def creer_cases(self):
+        """
+        Crée les tableaux de la grille pour la nouvelle taille.
+
+        :return: pas de retour
+        """
+        self.etats = np.zeros((self._taille, self._taille), dtype=np.uint8)
+        self.ids = np.full((self._taille, self._taille), -1, dtype=np.int16)
+        AbstractGrilleCompacte.creer_cases(self)
+
+    def etat_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: état de la case
+        """
+        return Etat(int(self.etats.flat[indice]))
+
+    def bateau_case(self, indice):
+        """
+        :param indice: index de la case
+        :return: bateau présent sur la case ou "None" si la case est vide
+        """
+        numero = int(self.ids.flat[indice])
+        if numero < 0:
+            return None
+        return self.bateaux[numero]
+
+    def enlever_bateaux(self):
+        """
+        Enlève tous les bateaux de la grille.
+
+        :return: pas de retour
+        """
+        self.ids.fill(-1)
+        self.etats[self.etats == Etat.BATEAU_INTACT] = Etat.VIDE
+        self.touches.fill(0)
+
+    def reinitialiser(self):
+        """
+        Remet toutes les cases à leur état initial.
+
+        :return: pas de retour
+        """
+        self.ids.fill(-1)
+        self.etats.fill(Etat.VIDE)
+        self.touches.fill(0)
+
+    def placer_bateaux(self, generateur=random):
+        """
+        Fonction permettant de placer des bateaux de manière aléatoire sur la grille
+
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        :return: réussite de l'opération
+        """
+        self.reinitialiser()
+        masques = placer_flotte(self._taille, [bateau.TAILLE for bateau in self.bateaux], generateur=generateur)
+        if masques is None:  # La flotte ne rentre pas dans la grille
+            return False
+        for numero, masque in enumerate(masques):
+            indices = indices_masque(masque)
+            self.ids.flat[indices] = numero
+            self.etats.flat[indices] = Etat.BATEAU_INTACT
+        return True
+
+    def positions_bateaux(self):
+        """
+        Renvoie les cases occupées par chaque bateau.
+
+        :return: liste de tuples contenant les index des cases de chaque bateau, dans l'ordre de "bateaux"
+        """
+        return [tuple(int(i) for i in np.flatnonzero(self.ids == numero)) for numero in range(len(self.bateaux))]
+
+    def placer_bateaux_positions(self, positions):
+        """
+        Place les bateaux à des positions données, par exemple pour rejouer une partie enregistrée.
+
+        La grille est remise à zéro avant le placement.
+        :param positions: positions des bateaux, voir "Grille.positions_valides"
+        :return: réussite de l'opération
+        """
+        if not self.positions_valides(positions):
+            return False
+        self.reinitialiser()
+        for numero, indices in enumerate(positions):
+            indices = list(indices)
+            self.ids.flat[indices] = numero
+            self.etats.flat[indices] = Etat.BATEAU_INTACT
+        return True
+
+    def etats_octets(self):
+        """
+        :return: "bytes" contenant l'état de chaque case, rangées par index
+        """
+        return self.etats.tobytes()
+
+    def numeros_octets(self):
+        """
+        :return: "bytes" contenant le numéro du bateau de chaque case, voir "Grille.numeros_octets"
+        """
+        return self.ids.astype("<i2").tobytes()
+
+    @classmethod
+    def depuis_etats(cls, bateaux, taille, etats, numeros):
+        """
+        Crée une grille à partir de l'état et du bateau de chaque case, voir "Grille.depuis_etats".
+
+        :param bateaux: liste des bateaux de la grille
+        :param taille: nombre de cases d'un côté de la grille
+        :param etats: "bytes" contenant l'état de chaque case
+        :param numeros: "bytes" contenant le numéro du bateau de chaque case
+        :return: nouvelle grille
+        """
+        grille = cls._creer_vide(bateaux, taille)
+        grille._cases = None
+        grille._tailles = np.array([bateau.TAILLE for bateau in bateaux], dtype=np.int16)
+        grille.etats = np.frombuffer(etats, dtype=np.uint8).reshape((taille, taille)).copy()
+        grille.ids = np.frombuffer(numeros, dtype="<i2").astype(np.int16).reshape((taille, taille))
+        touchees = (grille.etats == Etat.TOUCHE) | (grille.etats == Etat.COULE)
+        grille.touches = np.bincount(grille.ids[touchees], minlength=len(bateaux)).astype(np.int16).reshape((1, -1))
+        return grille
+
+    def cloner(self):
+        """
+        Copie la grille en recopiant ses tableaux.
+
+        :return: nouvelle grille indépendante de celle-ci, avec de nouveaux bateaux du même type
+        """
+        grille = self._creer_vide([type(bateau)() for bateau in self.bateaux], self._taille)
+        grille._cases = None
+        grille._tailles = self._tailles
+        grille.etats = self.etats.copy()
+        grille.ids = self.ids.copy()
+        grille.touches = self.touches.copy()
+        return grille
+
+    def bateaux_restants(self):
+        """
+        Renvoie les bateaux non coulés
+
+        :return: bateaux restants
+        """
+        return [self.bateaux[numero] for numero in np.nonzero(self.touches[0] < self._tailles)[0]]
+
+    def flotte_coulee(self):
+        """
+        Détermine si tous les bateaux de la grille ont été coulés.
+
+        :return: booléen valant "True" si plus aucun bateau n'est à flot
+        """
+        return bool(np.all(self.touches[0] >= self._tailles))
+
+    def tirer_indice(self, indice):
+        """
+        Tire sur la case d'index "indice" sans aucune conversion de coordonnées.
+
+        :param indice: index de la case visée
+        :return: 1. État de la case après le tir, "None" si la case a déjà reçu un tir
+                 2. Cases modifiées s'il y en a, "None" sinon
+        """
+        etat = self.etats.flat[indice]
+        if etat == Etat.VIDE:
+            self.etats.flat[indice] = Etat.DANS_L_EAU
+            return Etat.DANS_L_EAU, [self._vue(indice)]
+        if etat != Etat.BATEAU_INTACT:
+            return None, None
+        self.etats.flat[indice] = Etat.TOUCHE
+        numero = int(self.ids.flat[indice])
+        self.touches[0, numero] += 1
+        if self.touches[0, numero] < self._tailles[numero]:
+            return Etat.TOUCHE, [self._vue(indice)]
+        cases_bateau = np.flatnonzero(self.ids == numero)
+        self.etats.flat[cases_bateau] = Etat.COULE
+        return Etat.COULE, [self._vue(int(i)) for i in cases_bateau]
+
+    def tirer_lot(self, indices):
+        """
+        Tire sur un tableau de cases en une seule passe vectorisée.
+
+        :param indices: tableau des index des cases visées ("ligne * taille + colonne"), dans l'ordre des tirs
+        :return: tableau "uint8" contenant l'état de chaque case après son tir, ou "DEJA_TIRE"
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return resoudre_tirs(self.etats.reshape(1, -1), self.ids.reshape(1, -1), self.touches, self._tailles,
+                             np.zeros(indices.shape, dtype=np.int64), indices)
+
+
+class PileDeGrilles:
+    """
+    Pile de grilles de même taille et de même flotte, dont les tirs sont résolus ensemble.
+
+    "etats[grille, ligne, colonne]" contient l'état des cases et "ids[grille, ligne, colonne]" le numéro du bateau
+    occupant chaque case, ou -1. Les bateaux sont identifiés par leur position dans "tailles_bateaux".
+    """
+
+    def __init__(self, nombre, tailles_bateaux, taille=10):
+        """
+        constructeur de la classe "PileDeGrilles"
+
+        :param nombre: nombre de grilles de la pile
+        :param tailles_bateaux: liste des tailles des bateaux de chaque grille
+        :param taille: nombre de cases d'un côté des grilles
+        """
+        self.taille = taille
+        self.tailles_bateaux = np.array(tailles_bateaux, dtype=np.int16)
+        self.etats = np.zeros((nombre, taille, taille), dtype=np.uint8)
+        self.ids = np.full((nombre, taille, taille), -1, dtype=np.int16)
+        self.touches = np.zeros((nombre, len(tailles_bateaux)), dtype=np.int16)
+
+    def __len__(self):
+        return self.etats.shape[0]
+
+    def placer_bateaux(self, generateur=random):
+        """
+        Place les bateaux de manière aléatoire sur chaque grille de la pile.
+
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        :return: tableau de booléens indiquant pour chaque grille si le placement a réussi
+        """
+        self.etats.fill(Etat.VIDE)
+        self.ids.fill(-1)
+        self.touches.fill(0)
+        reussites = np.zeros(len(self), dtype=bool)
+        tailles = [int(taille) for taille in self.tailles_bateaux]
+        ids = self.ids.reshape(len(self), -1)
+        etats = self.etats.reshape(len(self), -1)
+        for grille in range(len(self)):
+            masques = placer_flotte(self.taille, tailles, generateur=generateur)
+            if masques is not None:
+                reussites[grille] = True
+                for numero, masque in enumerate(masques):
+                    indices = indices_masque(masque)
+                    ids[grille, indices] = numero
+                    etats[grille, indices] = Etat.BATEAU_INTACT
+        return reussites
+
+    def tirer_lot(self, indices):
+        """
+        Tire sur toutes les grilles de la pile en une seule passe vectorisée.
+
+        :param indices: tableau de forme (nombre de grilles,) pour un tir par grille ou (nombre de grilles, nombre de
+                        tirs) pour plusieurs tirs par grille, tirés dans l'ordre des colonnes
+        :return: tableau "uint8" de même forme que "indices" contenant l'état de chaque case après son tir, ou
+                 "DEJA_TIRE"
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        grilles = np.arange(len(self), dtype=np.int64).reshape((len(self),) + (1,) * (indices.ndim - 1))
+        return resoudre_tirs(self.etats.reshape(len(self), -1), self.ids.reshape(len(self), -1), self.touches,
+                             self.tailles_bateaux, np.broadcast_to(grilles, indices.shape), indices)
+
+    def flottes_coulees(self):
+        """
+        :return: tableau de booléens indiquant pour chaque grille si tous ses bateaux sont coulés
+        """
+        return np.all(self.touches >= self.tailles_bateaux, axis=1)
+
+    def nombre_bateaux_restants(self):
+        """
+        :return: tableau du nombre de bateaux non coulés de chaque grille
+        """
+        return np.count_nonzero(self.touches < self.tailles_bateaux, axis=1)
@@ -0,0 +1,167 @@
+# coding: utf-8
+"""
+Module contenant une intelligence artificielle qui tire selon la densité de placements possibles des bateaux.
+
+Pour chaque case, on compte les placements des bateaux restants qui la couvrent et qui sont compatibles avec les tirs
+déjà effectués : un placement est exclu dès qu'il couvre une case dans l'eau ou un bateau coulé, et son poids est
+multiplié par "POIDS_TOUCHE" pour chaque case touchée qu'il couvre, ce qui fait passer naturellement l'IA de la chasse
+à la poursuite d'un bateau touché. La case non visée ayant le plus grand score est choisie.
+
+Un tir ne modifie que les placements qui passent par la case visée, c'est-à-dire des placements de sa ligne et de sa
+colonne : la carte de chaleur est mise à jour de manière incrémentale au lieu d'être recalculée à chaque tour.
+"""
+import random
+
+from case import Etat
+from placement import masques_placements, indices_masque
+from strategie import AbstractStrategie
+
+_STRUCTURES = {}  # Cache des placements et de la carte initiale, indexé par (taille de la grille, taille du bateau)
+
+
+def structure_placements(taille_grille, taille_bateau):
+    """
+    Renvoie les placements d'un bateau sous forme de listes de cases, ainsi que les données qui en découlent.
+
+    Le résultat est calculé une seule fois par couple de tailles, puis gardé en cache.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param taille_bateau: nombre de cases du bateau
+    :return: tuple (liste des cases de chaque placement, liste des placements passant par chaque case, nombre de
+             placements passant par chaque case sur une grille vide)
+    """
+    cle = (taille_grille, taille_bateau)
+    if cle not in _STRUCTURES:
+        placements = [tuple(indices_masque(masque)) for masque in masques_placements(taille_grille, taille_bateau)]
+        par_case = [[] for _ in range(taille_grille ** 2)]
+        for numero, cases in enumerate(placements):
+            for case in cases:
+                par_case[case].append(numero)
+        carte = [len(numeros) for numeros in par_case]
+        _STRUCTURES[cle] = (placements, par_case, carte)
+    return _STRUCTURES[cle]
+
+
+class StrategieDensite(AbstractStrategie):
+    """
+    Stratégie de chasse et de poursuite guidée par la densité de placements possibles des bateaux restants.
+    """
+    NOM = "densite"
+    POIDS_TOUCHE = 20  # facteur appliqué au poids d'un placement pour chaque case touchée qu'il couvre
+
+    def __init__(self, taille, tailles_bateaux, generateur=random):
+        AbstractStrategie.__init__(self, taille, tailles_bateaux, generateur)
+        self._nombre_restant = {}  # nombre de bateaux non coulés par taille
+        for taille_bateau in tailles_bateaux:
+            self._nombre_restant[taille_bateau] = self._nombre_restant.get(taille_bateau, 0) + 1
+        self._placements = {}
+        self._par_case = {}
+        self._poids = {}  # poids de chaque placement (0 si le placement est exclu)
+        self._touches = {}  # nombre de cases touchées couvertes par chaque placement
+        self._cartes = {}  # somme des poids des placements couvrant chaque case, par taille
+        self.scores = [0] * taille ** 2  # somme des cartes, pondérées par le nombre de bateaux restants
+        for taille_bateau, nombre in self._nombre_restant.items():
+            placements, par_case, carte = structure_placements(taille, taille_bateau)
+            self._placements[taille_bateau] = placements
+            self._par_case[taille_bateau] = par_case
+            self._poids[taille_bateau] = [1] * len(placements)
+            self._touches[taille_bateau] = [0] * len(placements)
+            self._cartes[taille_bateau] = list(carte)
+            for case, valeur in enumerate(carte):
+                self.scores[case] += nombre * valeur
+        self._tirees = [False] * taille ** 2
+
+    def _changer_poids(self, taille_bateau, numero, nouveau_poids):
+        """
+        Change le poids d'un placement et répercute la différence sur les cases qu'il couvre.
+
+        :param taille_bateau: taille du bateau du placement
+        :param numero: numéro du placement
+        :param nouveau_poids: nouveau poids du placement
+        :return: pas de retour
+        """
+        poids = self._poids[taille_bateau]
+        difference = nouveau_poids - poids[numero]
+        if difference:
+            poids[numero] = nouveau_poids
+            carte = self._cartes[taille_bateau]
+            difference_score = difference * self._nombre_restant[taille_bateau]
+            for case in self._placements[taille_bateau][numero]:
+                carte[case] += difference
+                self.scores[case] += difference_score
+
+    def _exclure_case(self, case):
+        """
+        Exclut tous les placements passant par une case qui ne peut plus contenir de bateau à flot.
+
+        :param case: index de la case
+        :return: pas de retour
+        """
+        for taille_bateau, par_case in self._par_case.items():
+            poids = self._poids[taille_bateau]
+            for numero in par_case[case]:
+                if poids[numero]:
+                    self._changer_poids(taille_bateau, numero, 0)
+
+    def _ajouter_touche(self, case):
+        """
+        Augmente le poids des placements passant par une case touchée.
+
+        :param case: index de la case
+        :return: pas de retour
+        """
+        for taille_bateau, par_case in self._par_case.items():
+            poids = self._poids[taille_bateau]
+            touches = self._touches[taille_bateau]
+            for numero in par_case[case]:
+                touches[numero] += 1
+                if poids[numero]:
+                    self._changer_poids(taille_bateau, numero, poids[numero] * self.POIDS_TOUCHE)
+
+    def choisir_tir(self):
+        """
+        Choisit la case non visée ayant le plus grand score, au hasard en cas d'égalité.
+
+        :return: index de la case
+        """
+        scores = self.scores
+        tirees = self._tirees
+        meilleur_score = -1
+        candidats = []
+        for case in range(len(scores)):
+            if not tirees[case]:
+                score = scores[case]
+                if score > meilleur_score:
+                    meilleur_score = score
+                    candidats = [case]
+                elif score == meilleur_score:
+                    candidats.append(case)
+        if len(candidats) == 1:
+            return candidats[0]
+        return self.generateur.choice(candidats)
+
+    def observer(self, indice, etat, indices_modifies):
+        """
+        Met à jour la carte de chaleur après un tir.
+
+        :param indice: index de la case visée
+        :param etat: état de la case après le tir
+        :param indices_modifies: index des cases modifiées par le tir
+        :return: pas de retour
+        """
+        if self._tirees[indice]:
+            return
+        self._tirees[indice] = True
+        if etat == Etat.DANS_L_EAU:
+            self._exclure_case(indice)
+        elif etat == Etat.TOUCHE:
+            self._ajouter_touche(indice)
+        elif etat == Etat.COULE:
+            for case in indices_modifies:  # Les cases d'un bateau coulé ne peuvent plus contenir d'autre bateau
+                self._exclure_case(case)
+            taille_bateau = len(indices_modifies)
+            if self._nombre_restant.get(taille_bateau):
+                # Un bateau de moins de cette taille : on retire une fois sa carte des scores
+                self._nombre_restant[taille_bateau] -= 1
+                carte = self._cartes[taille_bateau]
+                for case in range(len(self.scores)):
+                    self.scores[case] -= carte[case]
@@ -0,0 +1,212 @@
+# coding: utf-8
+"""
+Module contenant l'instrumentation optionnelle des chemins critiques du jeu.
+
+Quand l'instrumentation est désactivée (par défaut), aucune méthode n'est modifiée : elle ne coûte donc rien. Quand
+elle est activée, chaque méthode de "CIBLES" est remplacée sur sa classe par une enveloppe qui compte les appels et
+mesure leur durée ; la désactivation remet les méthodes d'origine. Le placement des bateaux compte en plus les
+échecs et les retours en arrière de la recherche (voir "placement.DERNIERE_RECHERCHE").
+
+Exemple : python batailleNavale.py --stats --stats-fichier stats.json, puis "stats" pendant la partie
+"""
+import atexit
+import json
+import sys
+import time
+
+import placement
+
+CIBLES = (
+    ("case", "Grille", "tirer"),
+    ("case", "Grille", "coord_bataille_vers_index"),
+    ("case", "Grille", "placer_bateaux"),
+    ("grillebinaire", "GrilleBinaire", "placer_bateaux"),
+    ("grillenumpy", "GrilleNumpy", "placer_bateaux"),
+    ("grillecreuse", "GrilleCreuse", "placer_bateaux"),
+    ("interfacegraphique", "Afficheur", "actualiser"),
+    ("interfacegraphique", "Afficheur", "dessiner_tout"),
+    ("interfacegraphique", "Afficheur", "tic"),
+    ("tortue", "RenduGrille", "dessiner_grille"),
+    ("tortue", "RenduGrille", "dessiner_case"),
+    ("tortue", "TableauDeBord", "actualiser"),
+    ("tortue", "Tortue", "dessinfond"),
+    ("tortue", "Tortue", "dessinbateaux"),
+)  # (module, classe, méthode) ; les modules pas encore importés sont instrumentés au prochain appel d'"instrumenter"
+
+
+class Compteur:
+    """
+    Nombre d'appels et durées d'une méthode instrumentée.
+    """
+    __slots__ = ("appels", "duree", "duree_max")
+
+    def __init__(self):
+        """
+        constructeur de la classe "Compteur"
+        """
+        self.appels = 0
+        self.duree = 0.0  # en secondes
+        self.duree_max = 0.0
+
+    def ajouter(self, duree):
+        """
+        Enregistre un appel.
+
+        :param duree: durée de l'appel en secondes
+        :return: pas de retour
+        """
+        self.appels += 1
+        self.duree += duree
+        if duree > self.duree_max:
+            self.duree_max = duree
+
+
+compteurs = {}  # "Classe.méthode" -> "Compteur"
+evenements = {}  # Nom d'un évènement compté (ex : échecs de placement) -> nombre
+_originales = {}  # (classe, nom de la méthode) -> méthode d'origine, pour les méthodes actuellement instrumentées
+_active = False
+
+
+def est_active():
+    """
+    :return: booléen valant "True" si l'instrumentation est activée
+    """
+    return _active
+
+
+def compter(nom, nombre=1):
+    """
+    Compte un évènement.
+
+    :param nom: nom de l'évènement
+    :param nombre: nombre d'évènements à ajouter
+    :return: pas de retour
+    """
+    evenements[nom] = evenements.get(nom, 0) + nombre
+
+
+def envelopper(nom, methode):
+    """
+    Crée l'enveloppe mesurant une méthode.
+
+    :param nom: nom du compteur
+    :param methode: méthode d'origine
+    :return: fonction à mettre à la place de la méthode sur la classe
+    """
+    compteur = compteurs.setdefault(nom, Compteur())
+    mesurer_placement = nom.endswith(".placer_bateaux")
+
+    def enveloppe(*args, **kwargs):
+        if mesurer_placement:  # Un placement qui ne passe pas par "placement" ne compte pas ceux du précédent
+            placement.DERNIERE_RECHERCHE["impasses"] = 0
+        debut = time.perf_counter()
+        try:
+            resultat = methode(*args, **kwargs)
+        finally:
+            compteur.ajouter(time.perf_counter() - debut)
+        if mesurer_placement:
+            compter("placement : retours en arrière", placement.DERNIERE_RECHERCHE["impasses"])
+            if not resultat:
+                compter("placement : échecs")
+        return resultat
+
+    enveloppe.__name__ = methode.__name__
+    enveloppe.__doc__ = methode.__doc__
+    return enveloppe
+
+
+def instrumenter():
+    """
+    Remplace les méthodes de "CIBLES" des modules déjà importés qui ne sont pas encore instrumentées.
+
+    Aucun module n'est importé ici, pour ne pas charger Tk en mode console.
+    :return: pas de retour
+    """
+    for nom_module, nom_classe, nom_methode in CIBLES:
+        module = sys.modules.get(nom_module)
+        classe = getattr(module, nom_classe, None)
+        if classe is None or (classe, nom_methode) in _originales or nom_methode not in classe.__dict__:
+            continue
+        methode = classe.__dict__[nom_methode]
+        _originales[(classe, nom_methode)] = methode
+        setattr(classe, nom_methode, envelopper(nom_classe + "." + nom_methode, methode))
+
+
+def activer():
+    """
+    Active l'instrumentation.
+
+    :return: pas de retour
+    """
+    global _active
+    _active = True
+    instrumenter()
+
+
+def desactiver():
+    """
+    Désactive l'instrumentation et remet les méthodes d'origine. Les mesures déjà faites sont gardées.
+
+    :return: pas de retour
+    """
+    global _active
+    _active = False
+    for (classe, nom_methode), methode in _originales.items():
+        setattr(classe, nom_methode, methode)
+    _originales.clear()
+
+
+def reinitialiser():
+    """
+    Efface toutes les mesures.
+
+    :return: pas de retour
+    """
+    for compteur in compteurs.values():
+        compteur.__init__()
+    evenements.clear()
+
+
+def rapport():
+    """
+    Met en forme les mesures.
+
+    :return: liste de lignes de texte, des méthodes les plus coûteuses au total aux moins coûteuses
+    """
+    if not _active and not compteurs:
+        return ["Instrumentation désactivée, lancez le jeu avec \"--stats\"."]
+    lignes = []
+    for nom, compteur in sorted(compteurs.items(), key=lambda element: -element[1].duree):
+        if compteur.appels:
+            lignes.append("{0} : {1} appels, {2:.1f} ms au total, {3:.0f} µs en moyenne, {4:.1f} ms au maximum".format(
+                nom, compteur.appels, compteur.duree * 1e3, compteur.duree / compteur.appels * 1e6,
+                compteur.duree_max * 1e3))
+    for nom, nombre in sorted(evenements.items()):
+        lignes.append("{0} : {1}".format(nom, nombre))
+    if not lignes:
+        lignes.append("Aucune mesure pour l'instant.")
+    return lignes
+
+
+def ecrire(chemin):
+    """
+    Écrit les mesures dans un fichier JSON.
+
+    :param chemin: chemin du fichier
+    :return: pas de retour
+    """
+    with open(chemin, "w") as fichier:
+        json.dump({"methodes": {nom: {"appels": compteur.appels, "duree": compteur.duree,
+                                      "duree_max": compteur.duree_max} for nom, compteur in compteurs.items()},
+                   "evenements": evenements}, fichier, indent=2, sort_keys=True, ensure_ascii=False)
+        fichier.write("\n")
+
+
+def ecrire_a_la_sortie(chemin):
+    """
+    Écrit les mesures dans un fichier JSON à la fin du programme.
+
+    :param chemin: chemin du fichier
+    :return: pas de retour
+    """
+    atexit.register(ecrire, chemin)
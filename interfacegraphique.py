@@ -8,15 +8,21 @@ from __future__ import print_function  # Permet d'utiliser la fonction print de
 
 import math
 import os
-import string
 import time
-import turtle
+import sys
 from sys import platform
-from sys import stdin  # Sert à recevoir des entrées de l'utilisateur en restant compatible avec python 3
 
 from enum import IntEnum, unique
 
-from case import Etat, Case
+import batailleNavale
+from case import Etat, Grille
+from console import RenduConsole
+from evenements import BoucleEntrees
+import instrumentation
+import placement
+
+EXPIRATION = object()  # Entrée renvoyée par "Afficheur.recevoir_entree" si le temps de la partie est écoulé, elle ne
+# peut pas être confondue avec du texte entré par l'utilisateur
 
 
 def chaine_nettoyee(chaine):
@@ -29,25 +35,30 @@ def chaine_nettoyee(chaine):
     return chaine.lower().replace(" ", "")
 
 
-def decimales(nombre):
+@unique
+class Mode(IntEnum):
     """
-    Nombre de décimales d'un nombre.
+    Énumération décrivant les différents modes d'affichage.
 
-    :param nombre: nombre dont on veut savoir les décimales
-    :return: nombre de décimales
+    "CONSOLE" est l'affichage dans la console seulement, sans jamais importer "turtle" ni Tk
+    "TORTUE" est l'affichage avec la tortue, en plus de la console
     """
-    return int(math.floor(math.log10(nombre) + 0.00001) + 1)
+    CONSOLE, TORTUE = range(2)
 
 
-@unique
-class Mode(IntEnum):
+class ObjetNul:
     """
-    Énumération décrivant les différents modes d'affichage.
+    Objet remplaçant les tortues en mode console : tous ses attributs et appels ne font rien.
 
-    "CONSOLE" est l'affichage dans la console
-    "TORTUE" est l'affichage avec la tortue
+    Tout attribut renvoie l'objet lui-même et tout appel renvoie "None", ce qui permet d'écrire par exemple
+    "tortue.screen.update()" sans vérifier le mode d'affichage.
     """
-    CONSOLE, TORTUE = range(2)
+
+    def __getattr__(self, nom):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return None
 
 
 @unique
@@ -58,314 +69,86 @@ class Difficulte(IntEnum):
     FACILE, MOYEN, DIFFICILE = range(3)
 
 
-class Tortue(turtle.Turtle):
-    """
-    Cette classe permet de customiser la tortue fournie par le module "turtle".
+class GeometrieGrille:
     """
-    COULEUR_FOND = "#5bc6d2"
-    COULEUR_ARRIERE_PLAN = "white"
-
-    COULEUR_CALE = "#767F7E"
-    HAUTEUR_CALE = 20
-
-    COULEUR_CHEMINEE = "#c61c10"
-    HAUTEUR_CHEMINEE = 25
-    LARGEUR_CHEMINEE = 8
-    ESPACEMENT_CHEMINEE = 17
+    Classe calculant la position en pixels des cases d'une grille à partir de leur index.
 
-    LARGEUR_TOURELLE = 18
-    HAUTEUR_TOURELLE = 12
-    ELOIGNEMENT_TOURELLE_BORD = 2
+    La largeur des cases est ajustée pour avoir une largeur de grille approximativement fixe, tout en ayant un nombre
+    entier de pixels par case. La position d'une case est celle de son coin inférieur gauche. Les géométries sont
+    partagées entre les grilles de même taille, elles s'obtiennent avec "GeometrieGrille.pour_taille".
+    """
+    LARGEUR_PIXELS_IDEALE = 400.0
+    _GEOMETRIES = {}  # Géométries déjà créées, indexées par taille
 
-    def __init__(self):
-        """
-        constructeur de la classe "Tortue"
+    def __init__(self, taille):
         """
-        turtle.Turtle.__init__(self)
-        self.hideturtle()  # cache la tortue
-        self.screen.tracer(0, 0)  # rend le dessin instantané, mais l'écran doit être rafraîchit manuellement
-        # en appelant "self.screen.update()"
+        constructeur de la classe "GeometrieGrille"
 
-    @staticmethod
-    def couleur_case(etat):
+        :param taille: nombre de cases d'un côté de la grille
         """
-        Retourne la couleur correspondant à l'état de la case.
+        self.taille = taille
+        self.largeur_case = max(1, round(self.LARGEUR_PIXELS_IDEALE / taille))
+        self.decalage_x = -taille * self.largeur_case / 2.0 + 80  # décalage permettant de centrer la grille
+        self.decalage_y = taille * self.largeur_case / 2.0 - 40  # on décale moins, car sinon la grille est trop haute
 
-        :param etat: état de la case à dessiner
-        :return: couleur correspondant à l'état de la case
+    @classmethod
+    def pour_taille(cls, taille):
         """
-        if etat == Etat.DANS_L_EAU:
-            return "blue"
-        elif etat == Etat.TOUCHE:
-            return "orange"
-        elif etat == Etat.COULE:
-            return "red"
-        else:
-            return "white"
+        Renvoie la géométrie d'une taille de grille, en la créant si elle n'existe pas encore.
 
-    def aller_a(self, x, y=None):
+        :param taille: nombre de cases d'un côté de la grille
+        :return: objet "GeometrieGrille"
         """
-        Va à une position sans laisser de traces.
+        if taille not in cls._GEOMETRIES:
+            cls._GEOMETRIES[taille] = cls(taille)
+        return cls._GEOMETRIES[taille]
 
-        :param x: entier représentant la coordonnée x ou liste contenant les deux coordonnées.
-        :param y: entier représentant la coordonnée y
-        :return: pas de retour
+    def position_case(self, index_ligne, index_colonne):
         """
-        etait_en_bas = self.isdown()
-        self.up()
-        if y is None:
-            self.goto(x)
-        else:
-            self.goto(x, y)
-        if etait_en_bas:
-            self.down()
+        Calcule la position en pixels du coin inférieur gauche d'une case de la grille.
 
-    def ecrire(self, message, position, alignement="left", fonte=("Arial", 8, "normal"), couleur="black"):
+        :param index_ligne: index de la ligne de la case
+        :param index_colonne: index de la colonne de la case
+        :return: position cartésienne de la case
         """
-        Écrit un message à l'écran
+        return (index_colonne * self.largeur_case + self.decalage_x,
+                -index_ligne * self.largeur_case + self.decalage_y)
 
-        :param message: message à écrire
-        :param position: endroit où écrire le message
-        :param alignement: alignement du texte
-        :param fonte: fonte à utiliser
-        :param couleur: couleur du texte
-        :return: pas de retour
+    def carre(self, case):
         """
-        ancienne_couleur = self.pencolor()  # Enregistre la couleur de la tortue
-        self.pencolor(couleur)
-        self.aller_a(position)
-        self.write(message, align=alignement, font=fonte)
-        self.pencolor(ancienne_couleur)  # Rétablit la couleur de la tortue
-
-    def dessinfond(self):
+        :param case: case de la grille
+        :return: carré occupé par la case
         """
-        Donne une couleur à l'arrière-plan
-        :return: pas de retour
-        """
-        self.fillcolor(self.COULEUR_FOND)
-        self.setheading(0)
-        self.begin_fill()
-        self.aller_a(-4000, -4000)  # On prend large pour être sûr de remplir l'écran
-        for i in range(4):
-            self.forward(8000)
-            self.left(90)
-        self.end_fill()
-        self.screen.update()
+        x, y = self.position_case(case.ligne, case.colonne)
+        cote = self.largeur_case
+        return [x, y], [x + cote, y], [x + cote, y + cote], [x, y + cote]
 
-    @staticmethod
-    def longueur_bateau(taille):
+    def milieu(self, case):
         """
-        Définit la longueur graphique du bateau
-        :param taille: nombre de case du bateau
-        :return: taille graphique
+        :param case: case de la grille
+        :return: position du milieu de la case
         """
-        return 30 * taille
+        x, y = self.position_case(case.ligne, case.colonne)
+        demi_longueur = self.largeur_case / 2.0
+        return x + demi_longueur, y + demi_longueur
 
-    def dessincale(self, bateau):
-        """
-        Dessine la cale du bateau selon ce schéma:
-                 _______________
-        alpha -> \             / <- beta
-                  \___________/
-        :param bateau: bateau dont il faut dessiner la cale
-        :return: pas de retour
+    def largeur_pixels(self):
         """
-        alpha = 85
-        beta = 60
-        self.pensize(2)
-        self.down()
-        self.fillcolor(self.COULEUR_CALE)
-        self.begin_fill()
-        self.right(alpha)
-        self.forward(self.HAUTEUR_CALE / math.sin(math.radians(alpha)))
-        self.left(alpha)
-        self.forward(self.longueur_bateau(bateau.TAILLE) - self.HAUTEUR_CALE / math.tan(
-            math.radians(alpha)) - self.HAUTEUR_CALE / math.tan(math.radians(beta)))
-        self.left(beta)
-        self.forward(self.HAUTEUR_CALE / math.sin(math.radians(beta)))
-        self.left(180 - beta)
-        pos = self.pos()
-        self.forward(self.longueur_bateau(bateau.TAILLE))
-        self.end_fill()
-        self.up()
-        self.goto(pos)
-
-    def dessintourelle(self, orientation):
-        """
-        Dessine une tourelle
-         __
-        /__\====
-        
-        :param orientation: défini l'orientation de la tourelle. 1 veut dire droite et -1 gauche
-        :return: pas de retour
-        """
-        alpha = 70
-        beta = 80
-        origine = self.pos()
-        self.setheading(0)
-        self.down()
-        self.pensize(2)
-        self.fillcolor("grey")
-        self.begin_fill()
-        self.forward(self.LARGEUR_TOURELLE * orientation)
-        self.left((180 - alpha) * orientation)
-        self.forward(
-            ((self.HAUTEUR_TOURELLE / math.sin(math.radians(alpha))) / 2.0 - self.HAUTEUR_TOURELLE / 6.0) * orientation)
-        self.right(75 * orientation)
-        self.forward(self.LARGEUR_TOURELLE * orientation)
-        self.left(90 * orientation)
-        self.forward(self.LARGEUR_TOURELLE / 6.0 * orientation)
-        self.left(90 * orientation)
-        self.forward(
-            (self.LARGEUR_TOURELLE - self.LARGEUR_TOURELLE / 6.0 * math.tan(math.radians(90 - 75))) * orientation)
-        self.right(105 * orientation)
-        self.forward((self.HAUTEUR_TOURELLE / math.sin(math.radians(alpha))) / 2.0 * orientation)
-        self.left(alpha * orientation)
-        self.forward(abs(self.LARGEUR_TOURELLE - self.HAUTEUR_TOURELLE / math.tan(
-            math.radians(alpha)) - self.HAUTEUR_TOURELLE / math.tan(math.radians(beta))) * orientation)
-        self.left(beta * orientation)
-        self.goto(origine)
-        self.end_fill()
-        self.up()
-
-    def dessincheminee(self):
-        """
-        Dessine une cheminée pour les bateaux
-        :return: pas de retour
-        """
-        origine = self.pos()
-        self.setheading(90)
-        self.down()
-        self.pensize(1)
-        self.fillcolor(self.COULEUR_CHEMINEE)
-        self.begin_fill()
-        self.forward(self.HAUTEUR_CHEMINEE)
-        self.left(90)
-        self.forward(self.LARGEUR_CHEMINEE)
-        self.left(90)
-        self.forward(self.HAUTEUR_CHEMINEE)
-        self.right(90)
-        self.goto(origine)
-        self.end_fill()
-        self.setheading(180)
-        self.up()
-
-    def dessinbateaux(self, grille, position):
-        """Dessine les bateaux stylisés
-                ___
-               __|__
-         __   |O O O|   __
-    ====/__\__|_____|__/__\====
-        \ . . . . . . . . /
-         \_______________/
-                  """
-        bateaux_par_type = []  # liste stockant un bateau par type
-        for bateau in grille.bateaux:
-            type_dans_liste = False  # Est-ce que le type du bateau est déjà compté?
-            for bateau_par_type in bateaux_par_type:
-                if bateau.TYPE == bateau_par_type.TYPE:
-                    type_dans_liste = True
-            if not type_dans_liste:
-                bateaux_par_type.append(bateau)  # On ne stocke qu'un bateau par type
-
-        for i, bateau in enumerate(bateaux_par_type):
-            origine = (position[0], position[1] + i * 94)
-            self.aller_a(origine)
-            self.setheading(0)
-            self.dessincale(bateau)
-            self.forward(self.LARGEUR_TOURELLE + self.ELOIGNEMENT_TOURELLE_BORD)
-            self.dessintourelle(1)
-            self.setheading(180)
-            self.forward(
-                self.longueur_bateau(bateau.TAILLE) - 2 * (self.LARGEUR_TOURELLE + self.ELOIGNEMENT_TOURELLE_BORD))
-            self.dessintourelle(-1)
-            self.setheading(0)
-
-            if bateau.TAILLE <= 2:
-                nombre_cheminees = 0
-            elif bateau.TAILLE == 3:
-                nombre_cheminees = 1
-            elif bateau.TAILLE == 4:
-                nombre_cheminees = 2
-            else:
-                nombre_cheminees = 3
-            self.forward(self.longueur_bateau(bateau.TAILLE) / 2.0 - self.LARGEUR_TOURELLE
-                         + (nombre_cheminees * self.LARGEUR_CHEMINEE
-                            + (nombre_cheminees - 1) * self.ESPACEMENT_CHEMINEE) / 2.0
-                         - self.LARGEUR_CHEMINEE)
-            for j in range(nombre_cheminees):  # On dessine deux cheminées
-                self.dessincheminee()
-                if j < nombre_cheminees - 1:
-                    self.forward(self.ESPACEMENT_CHEMINEE)
-            self.screen.update()
-
-    def dessintextenombrebateaux(self, grille, position):
-        """
-        Affiche le nombre de bateaux restants par type à côté du dessin des bateaux.
-
-        :param grille: Instance de la classe "Grille" décrivant la grille de jeu.
-        :param position: Tuple contenant les coordonnées où afficher le texte
-        """
-        for i, bateau in enumerate(grille.bateaux):
-            self.aller_a(position[0] - 15, position[1] + i * 94 - 20)
-            self.down()
-            nombre_restant = grille.nombrebateauxdeboutpartype(bateau.TYPE)
-            if nombre_restant == 0:
-                self.pencolor("red")
-            self.write(str(nombre_restant) + " × ", align="center", font=("Arial", 14, "bold"))
-            self.pencolor("black")
-        self.screen.update()
-
-    def dessiner_graduations(self, origine, cote_grille):
-        """
-        Dessine les graduations à côté de la grille.
-
-        :param origine: origine de la case supérieure gauche de la grille.
-        :param cote_grille: nombre de cases composant le côté de la grille
-        :return: pas de retour
-        """
-        x_0, y_0 = origine
-        decimales_max = decimales(cote_grille)  # Nombre de caractères pour écrire le nombre
-        cote_case = Case.largeur_pixels  # Taille en pixels de la case
-        taille_fonte = int(Case.largeur_pixels / 10.0 + 8)  # Taille de la fonte
-        for i in range(cote_grille):
-            x = x_0 + i * cote_case + cote_case / 2.0
-            y = y_0 + cote_case + decimales_max * taille_fonte / 2.0
-            self.ecrire(string.ascii_uppercase[i], (x, y), alignement="center", fonte=("Arial", taille_fonte, "bold"))
-            x = x_0 - decimales_max * taille_fonte / 2.0
-            y = y_0 - (i - 1) * cote_case - cote_case / 2.0 - taille_fonte
-            self.ecrire(str(i + 1), (x, y), alignement="right", fonte=("Arial", taille_fonte, "bold"))
+        Renvoie la largeur exacte de la grille en pixels.
 
-    def dessiner_case(self, case):
+        :return: largeur de la grille en pixels
         """
-        Dessine une case à l'écran.
+        return self.taille * self.largeur_case
 
-        :param case: case à dessiner
-        :return: pas de retour
+    def position_coins(self):
         """
-        self.down()
-        self.pensize(1)
-        self.color("black", self.couleur_case(case.etat))
-        points = case.carre()
-        self.aller_a(points[0])  # Va au point inférieur droite de la case
-        self.begin_fill()
-        for i in range(1, len(points)):  # la tortue est déjà à "points[0]", donc on commence à 1
-            self.goto(points[i])
-        self.goto(points[0])
-        self.end_fill()
+        Retourne les coordonnées des coins de la grille.
 
-    def dessiner_grille(self, cases):
+        :return: liste contenant les quatre coins de la grille.
         """
-        Dessine la grille.
-
-        :param cases: grille à dessiner
-        :return: pas de retour
-        """
-        self.dessiner_graduations(cases[0][0].position, len(cases))
-        for ligne in cases:
-            for case in ligne:
-                self.dessiner_case(case)
-        self.screen.update()
+        x_gauche, y_haut = self.position_case(-1, 0)
+        x_droit, y_bas = self.position_case(self.taille - 1, self.taille)
+        return (x_gauche, y_haut), (x_gauche, y_bas), (x_droit, y_bas), (x_droit, y_haut)
 
 
 class Afficheur:
@@ -375,11 +158,20 @@ class Afficheur:
     """
     TAILLE_POLICE_DEFAUT = 14
 
-    def __init__(self, grille):
+    def __init__(self, grille, mode=Mode.TORTUE, ansi=False, adversaire=None, table_difficulte=None, journal=None):
         """
         constructeur de la classe "Afficheur"
 
         :param grille: grille de jeu à afficher
+        :param mode: mode d'affichage, voir "Mode"
+        :param ansi: booléen indiquant si la console comprend les séquences d'échappement ANSI, ce qui permet de ne
+                     réécrire que les cases modifiées
+        :param adversaire: "adversaire.Adversaire" tirant sur la flotte du joueur après chacun de ses tirs, "None"
+                           pour jouer seul
+        :param table_difficulte: "difficulte.TableDifficulte" des limites de coups calibrées, "None" pour n'utiliser
+                                 que la formule approchée, sans aucune calibration en arrière-plan
+        :param journal: "journal.EcrivainJournal" dans lequel enregistrer les parties du joueur, "None" pour ne pas
+                        les enregistrer
         """
         self.difficulte = Difficulte.MOYEN
         self._nouvelle_difficulte = self.difficulte
@@ -389,14 +181,52 @@ class Afficheur:
         self._parametre_temps_maximum = "auto"
         self._nouveau_parametre_temps_maximum = self._parametre_temps_maximum
         self.grille = grille
+        self.adversaire = adversaire
         self._nouvelle_taille_grille = grille.taille()
-        self.tortue_elements_permanents = Tortue()  # Tortue dessinant les éléments restants plusieurs tours d'affilée
-        self.tortue_elements_provisoires = Tortue()  # Tortue dessinant les éléments changés à chaque tour
-        self.tortue_questions = Tortue()  # Tortue affichant les questions
-        self.tortue_erreurs = Tortue()  # tortue affichant les erreurs
+        self._nouvelle_flotte = None  # Flotte choisie dans les paramètres, "None" pour garder celle de la grille
+        self.table_difficulte = table_difficulte
+        self.journal = journal
+        self.mode = mode
+        if mode == Mode.TORTUE:
+            import tortue  # Importé ici pour que le mode console n'ait jamais besoin de "turtle" ni de Tk
+
+            self.tortue_elements_permanents = tortue.Tortue()  # Tortue dessinant les éléments restants plusieurs
+            # tours d'affilée
+            self.tortue_elements_provisoires = tortue.Tortue()  # Tortue dessinant les éléments changés à chaque tour
+            self.tortue_questions = tortue.Tortue()  # Tortue affichant les questions
+            self.tortue_erreurs = tortue.Tortue()  # tortue affichant les erreurs
+            self.tableau_de_bord = tortue.TableauDeBord(self.tortue_elements_provisoires.screen,
+                                                        self.TAILLE_POLICE_DEFAUT)
+            self.rendu_grille = tortue.RenduGrille(self.tortue_elements_permanents.screen)
+            if instrumentation.est_active():
+                instrumentation.instrumenter()  # Les méthodes de "tortue" ne peuvent être instrumentées qu'une fois
+                # le module importé
+        else:
+            objet_nul = ObjetNul()
+            self.tortue_elements_permanents = objet_nul
+            self.tortue_elements_provisoires = objet_nul
+            self.tortue_questions = objet_nul
+            self.tortue_erreurs = objet_nul
+            self.tableau_de_bord = objet_nul
+            self.rendu_grille = objet_nul
+        self.rendu_console = RenduConsole(ansi=ansi)
+        self.boucle_entrees = BoucleEntrees()  # D'autres sources d'entrées peuvent y être ajoutées
+        self.boucle_entrees.ajouter_tic(self.tic)
+        self._attente_de_tir = False
         self.nombre_de_coups = 0
         self.temps_depart = 0
         self.grille_visible = False
+        self._nombre_de_coups_maximum_partie = 0
+        self._temps_maximum_partie = 0
+        self.fixer_limites_partie()
+
+    def geometrie(self):
+        """
+        Renvoie la géométrie en pixels de la grille affichée, qui dépend de sa taille actuelle.
+
+        :return: objet "GeometrieGrille"
+        """
+        return GeometrieGrille.pour_taille(self.grille.taille())
 
     def chaine_nouvelle_difficulte(self):
         """
@@ -414,17 +244,29 @@ class Afficheur:
     def generer_nombre_de_coups_maximum(self, taille_grille=None, difficulte=None):
         """
         Génère automatiquement une valeur pour le nombre de coups maximum en fonction de la difficulté
-        
+
+        La valeur vient de la table calibrée par simulation (voir "difficulte"). Si la configuration n'y est pas encore,
+        une formule approchée est utilisée en attendant sa calibration (voir "calibrer_en_arriere_plan").
+        :param taille_grille: taille de la grille, celle de la prochaine partie si elle est donnée, sinon la taille
+                              actuelle
+        :param difficulte: difficulté, la difficulté actuelle si elle n'est pas donnée
         :return: nombre maximum de coups
         """
         _taille_grille = taille_grille
         _difficulte = difficulte
+        tailles_bateaux = self.tailles_nouvelle_flotte()
         if taille_grille is None:
             _taille_grille = self.grille.taille()
-            if difficulte is None:
-                _difficulte = self.difficulte
-        nombre_cases_libres = _taille_grille ** 2 - self.grille.nombre_de_cases_occupees()
-        return int(round(self.grille.nombre_de_cases_occupees() + nombre_cases_libres / 2.0 * (1 - _difficulte / 5.0)))
+            tailles_bateaux = [bateau.TAILLE for bateau in self.grille.bateaux]
+        if difficulte is None:
+            _difficulte = self.difficulte
+        if self.table_difficulte is not None:
+            limite = self.table_difficulte.limite_coups(_taille_grille, tailles_bateaux, _difficulte)
+            if limite is not None:
+                return limite
+        nombre_cases_occupees = sum(tailles_bateaux)
+        nombre_cases_libres = _taille_grille ** 2 - nombre_cases_occupees
+        return int(round(nombre_cases_occupees + nombre_cases_libres / 2.0 * (1 - _difficulte / 5.0)))
 
     def nombre_de_coups_maximum(self, taille_grille=None, difficulte=None):
         """
@@ -454,15 +296,17 @@ class Afficheur:
 
         :return: nombre de coups restants
         """
-        return self.nombre_de_coups_maximum() - self.nombre_de_coups
+        return self._nombre_de_coups_maximum_partie - self.nombre_de_coups
 
-    def generer_temps_maximum(self, taille_grille=None, difficulte=None):
+    def generer_temps_maximum(self, taille_grille=None, difficulte=None, nombre_de_coups_maximum=None):
         """
         Génère automatiquement une valeur pour le temps maximum en fonction de la difficulté
 
+        :param nombre_de_coups_maximum: nombre maximum de coups dont découle le temps, calculé s'il n'est pas donné
         :return: temps maximum
         """
-        nombre_de_coups_maximum = self.nombre_de_coups_maximum(taille_grille, difficulte)
+        if nombre_de_coups_maximum is None:
+            nombre_de_coups_maximum = self.nombre_de_coups_maximum(taille_grille, difficulte)
         _difficulte = difficulte
         if difficulte is None:
             _difficulte = self.difficulte
@@ -471,13 +315,36 @@ class Afficheur:
 
     def temps_maximum(self):
         """
-        Retourne le temps maximal par partie.
+        Retourne le temps maximal de la partie en cours.
 
         :return: temps maximal
         """
+        return self._temps_maximum_partie
+
+    def calibrer_en_arriere_plan(self):
+        """
+        Lance en arrière-plan la calibration des limites de coups de la prochaine partie, s'il y a une table de
+        difficulté et que la configuration n'y est pas encore.
+
+        :return: pas de retour
+        """
+        if self.table_difficulte is not None:
+            self.table_difficulte.calibrer_en_arriere_plan(self._nouvelle_taille_grille, self.tailles_nouvelle_flotte())
+
+    def fixer_limites_partie(self):
+        """
+        Fixe le nombre maximum de coups et le temps maximum de la partie qui commence, d'après les paramètres actuels.
+
+        Ils ne changent plus jusqu'à la partie suivante, même si la calibration de la configuration (voir
+        "difficulte") se termine pendant la partie.
+        :return: pas de retour
+        """
+        self._nombre_de_coups_maximum_partie = self.nombre_de_coups_maximum()
         if self._parametre_temps_maximum == "auto":
-            return self.generer_temps_maximum()
-        return self._parametre_temps_maximum
+            self._temps_maximum_partie = self.generer_temps_maximum(
+                nombre_de_coups_maximum=self._nombre_de_coups_maximum_partie)
+        else:
+            self._temps_maximum_partie = self._parametre_temps_maximum
 
     def chaine_nouveau_parametre_temps_maximum(self):
         """
@@ -516,10 +383,7 @@ class Afficheur:
         """
         if self.joueur_a_perdu():  # On vérifie que le joueur n'a pas perdu (en particulier que le temps n'est pas écoulé)
             return False
-        for bateau in self.grille.bateaux:
-            if not bateau.est_coule():  # On vérifie pour chaque bateau si il est coulé
-                return False
-        return True
+        return self.grille.flotte_coulee()  # On vérifie que tous les bateaux sont coulés
 
     def effacer_tout(self):
         """
@@ -531,6 +395,9 @@ class Afficheur:
         self.tortue_elements_permanents.clear()
         self.tortue_questions.clear()
         self.tortue_erreurs.clear()
+        self.tableau_de_bord.cacher()
+        self.rendu_grille.cacher()
+        self.rendu_console.terminer()  # La grille sera redessinée en entier au prochain affichage
 
     def ecrire_texte(self, lignes, position, alignement="left", fonte=("Arial", 12, "normal"), couleur="black",
                      tortue=None):
@@ -570,12 +437,13 @@ class Afficheur:
         if tortue is None:
             _tortue = self.tortue_elements_provisoires
         print(message, end=fin)
+        geometrie = self.geometrie()
+        coin_inferieur_gauche = geometrie.position_coins()[1]
         if self.grille_visible:
-            position = (self.grille.position_coins()[1][0] + self.grille.largeur_pixels() / 2.0,
-                        self.grille.position_coins()[1][
-                            1] - 25 - numero_ligne * 20)  # On place en bas au milieu de la grille
+            position = (coin_inferieur_gauche[0] + geometrie.largeur_pixels() / 2.0,
+                        coin_inferieur_gauche[1] - 25 - numero_ligne * 20)  # On place en bas au milieu de la grille
         else:
-            position = (0, self.grille.position_coins()[1][1] - 25 - numero_ligne * 20)
+            position = (0, coin_inferieur_gauche[1] - 25 - numero_ligne * 20)
         _tortue.ecrire(message, position, alignement="center", fonte=("Arial", self.TAILLE_POLICE_DEFAUT, "bold"))
         _tortue.screen.update()
 
@@ -599,6 +467,22 @@ class Afficheur:
                           fonte=("Arial", self.TAILLE_POLICE_DEFAUT, "normal"))
         return chaine_nettoyee(self.recevoir_entree(">>> "))
 
+    def afficher_statistiques(self):
+        """
+        Affiche les mesures de l'instrumentation (voir "instrumentation") et attend que le joueur appuie sur entrée.
+
+        :return: pas de retour
+        """
+        self.grille_visible = False
+        self.effacer_tout()
+        self.afficher_titre()
+        sous_titre = "   Statistiques   "
+        print("\n" + sous_titre)
+        self.tortue_elements_permanents.ecrire(sous_titre, (0, 160), alignement="center",
+                                               fonte=("Arial", self.TAILLE_POLICE_DEFAUT, "bold"))
+        self.ecrire_texte(instrumentation.rapport(), (-380, 120), fonte=("Arial", 10, "normal"))
+        self.recevoir_entree("\nAppuyez sur entrée pour revenir.\n>>> ")
+
     def afficher_parametres(self, partie_en_cours=False):
         """
         Affiche les paramètres et permet à l'utilisateur de changer leur valeur.
@@ -606,11 +490,13 @@ class Afficheur:
         :param partie_en_cours: Booléen indiquant si la partie est en cours, cela a une importance pour afficher le menu.
         :return: pas de retour
         """
+        self.calibrer_en_arriere_plan()  # Les limites calibrées pourront être affichées quand le joueur y reviendra
         sous_titre = "Paramètres"
         texte = ["1. Difficulté : {0}".format(self.chaine_nouvelle_difficulte()),
                  "2. Nombre maximum de coups : {0}".format(self.chaine_nouveau_nombre_de_coups_maximum()),
                  "3. Temps maximum : {0}".format(self.chaine_nouveau_parametre_temps_maximum()),
-                 "4. Taille grille : {0}".format(self._nouvelle_taille_grille)]
+                 "4. Taille grille : {0}".format(self._nouvelle_taille_grille),
+                 "5. Flotte : {0}".format(",".join(str(taille) for taille in sorted(self.tailles_nouvelle_flotte())))]
         nombre_caracteres_max = len(max(texte, key=len))
         caracteres_a_ajouter = nombre_caracteres_max - len(sous_titre)
         sous_titre = " " * int(math.ceil(caracteres_a_ajouter / 2.0)) + sous_titre + " " * int(
@@ -712,7 +598,8 @@ class Afficheur:
                                 self.afficher(
                                     ("Temps réglé de manière automatique ({0} s), "
                                      "les modifications prendront effet à la prochaine partie.").format(
-                                        self.temps_maximum()))
+                                        self.generer_temps_maximum(self._nouvelle_taille_grille,
+                                                                   self._nouvelle_difficulte)))
                             else:
                                 try:
                                     nouvelle_valeur = int(float(nouvelle_valeur))
@@ -730,8 +617,39 @@ class Afficheur:
                                     self.afficher_erreur("Temps insuffisant.")
                                     recommencer2 = True
                                     continue
+                        elif entree == 5:  # "Flotte"
+                            texte = ["\nTailles des bateaux séparées par des virgules (ex : 2,3,3,4,5), "
+                                     "ou \"auto\" pour la flotte par défaut\n"]
+                            nouvelle_valeur = self.changer_parametre(texte)
+                            if nouvelle_valeur in ("", "<"):
+                                self.afficher_parametres(partie_en_cours=partie_en_cours)
+                                return
+                            if nouvelle_valeur in ("a", "auto"):
+                                flotte = batailleNavale.FLOTTE_DEFAUT
+                            else:
+                                try:
+                                    tailles = [int(taille) for taille in nouvelle_valeur.split(",") if taille]
+                                except ValueError:
+                                    self.afficher_erreur("Entrée invalide.")
+                                    recommencer2 = True
+                                    continue
+                                if not tailles or min(tailles) < 1:
+                                    self.afficher_erreur("Les bateaux doivent avoir au moins une case.")
+                                    recommencer2 = True
+                                    continue
+                                flotte = batailleNavale.flotte_depuis_tailles(tailles)
+                            erreur = self.erreur_placement(self._nouvelle_taille_grille,
+                                                           batailleNavale.tailles_flotte(flotte))
+                            if erreur is not None:
+                                self.afficher_erreur(erreur)
+                                recommencer2 = True
+                                continue
+                            self._nouvelle_flotte = flotte
+                            self.calibrer_en_arriere_plan()
+                            self.afficher("Flotte changée, les modifications prendront effet à la prochaine partie.")
                         else:  # "Taille grille"
-                            texte = ["\nAvec quelle taille de grille souhaitez-vous jouer? (nombre entre 6 et 26)\n"]
+                            texte = ["\nAvec quelle taille de grille souhaitez-vous jouer? (nombre entre 6 et {0})\n".format(
+                                Grille.TAILLE_MAX)]
                             nouvelle_valeur = self.changer_parametre(texte)
                             if nouvelle_valeur in ("", "<"):
                                 self.afficher_parametres(partie_en_cours=partie_en_cours)
@@ -741,9 +659,17 @@ class Afficheur:
                                     nouvelle_valeur))  # Le "float" permet d'accepter des valeurs comme 5.0 ou 2.3e1 (23)
                             except ValueError:  # Si une erreur de valeur est signalée
                                 self.afficher_erreur("Erreur, vous devez entrer un nombre")
-                            if 6 <= nouvelle_valeur <= 26:
+                            erreur = None
+                            if 6 <= nouvelle_valeur <= Grille.TAILLE_MAX:
+                                erreur = self.erreur_placement(nouvelle_valeur, self.tailles_nouvelle_flotte())
+                            if erreur is not None:
+                                self.afficher_erreur(erreur)
+                                recommencer2 = True
+                                continue
+                            elif 6 <= nouvelle_valeur <= Grille.TAILLE_MAX:
                                 cote = nouvelle_valeur
                                 self._nouvelle_taille_grille = cote
+                                self.calibrer_en_arriere_plan()
                                 self.afficher(
                                     ("Taille de la grille changée à {0}, "
                                      "les modifications prendront effet à la prochaine partie.").format(cote))
@@ -753,7 +679,8 @@ class Afficheur:
                                 recommencer2 = True
                                 continue
                             else:
-                                self.afficher_erreur("La grille est trop grande, le maximum est 26")
+                                self.afficher_erreur(
+                                    "La grille est trop grande, le maximum est {0}".format(Grille.TAILLE_MAX))
                                 recommencer2 = True
                                 continue
                 else:
@@ -772,7 +699,20 @@ class Afficheur:
         self.difficulte = self._nouvelle_difficulte
         self._parametre_nombre_de_coups_maximum = self._nouveau_parametre_nombre_de_coups_maximum
         self._parametre_temps_maximum = self._nouveau_parametre_temps_maximum
-        self.grille.set_taille(self._nouvelle_taille_grille)
+        if self._nouvelle_taille_grille != self.grille.taille():  # On ne recrée les cases que si nécessaire
+            self.grille.set_taille(self._nouvelle_taille_grille)
+        if self._nouvelle_flotte is not None:
+            self.grille.set_bateaux(batailleNavale.creer_bateaux(self._nouvelle_flotte))
+            self._nouvelle_flotte = None
+        self.fixer_limites_partie()
+
+    def tailles_nouvelle_flotte(self):
+        """
+        :return: tailles des bateaux de la flotte de la prochaine partie
+        """
+        if self._nouvelle_flotte is not None:
+            return batailleNavale.tailles_flotte(self._nouvelle_flotte)
+        return [bateau.TAILLE for bateau in self.grille.bateaux]
 
     def afficher_menu(self, partie_en_cours=False):
         """
@@ -787,6 +727,7 @@ class Afficheur:
             texte.append("Continuer      ")
         texte.extend(("Nouvelle partie",
                       "Paramètres     ",
+                      "Statistiques   ",
                       "Quitter        "))
         for i in range(len(texte)):
             texte[i] = str(i + 1) + ".  " + texte[i]  # On ajoute un numéro devant chaque élément du menu
@@ -831,9 +772,13 @@ class Afficheur:
                 elif entree == 2:  # "Paramètres"
                     self.afficher_parametres(partie_en_cours=partie_en_cours)
                     return
-                elif entree == 3:  # "Quitter"
+                elif entree == 3:  # "Statistiques"
+                    self.afficher_statistiques()
+                    recommencer = True
+                    continue
+                elif entree == 4:  # "Quitter"
                     if self.confirmer_quitter():
-                        exit(0)
+                        self.quitter()
                     else:
                         self.actualiser()
                         recommencer = True
@@ -843,25 +788,22 @@ class Afficheur:
                     recommencer = True
                     continue
 
-    def afficher_coups_restants(self):
+    def afficher_tableau_de_bord(self):
         """
-        Affiche le nombre de coups restants pour l'utilisateur.
+        Affiche le nombre de coups restants et le temps restant pour l'utilisateur, ainsi que le nombre de bateaux
+        restants par type.
 
         :return: pas de retour
         """
-        self.tortue_elements_provisoires.ecrire("Coups restants : " + str(self.coups_restants()), (-330, 295), "left",
-                                                ("Arial", self.TAILLE_POLICE_DEFAUT, "normal"))
+        self.tableau_de_bord.actualiser(self.coups_restants(), self.temps_restant(), self.grille)
 
     def afficher_temps_restant(self):
         """
-        Affiche le temps restant avant la fin de la partie.
+        Affiche le temps restant avant la fin de la partie dans la console.
 
         :return: pas de retour
         """
-        texte = "Temps restant : {0} s".format(int(round(self.temps_restant())))
-        print(texte)
-        self.tortue_elements_provisoires.ecrire(texte, (-330, 275), "left",
-                                                ("Arial", self.TAILLE_POLICE_DEFAUT, "normal"))
+        print("Temps restant : {0} s".format(int(round(self.temps_restant()))))
 
     def afficher_erreur(self, message="Une erreur s'est produite."):
         """
@@ -872,16 +814,37 @@ class Afficheur:
         self.tortue_erreurs.clear()
         self.afficher(message, tortue=self.tortue_erreurs)
 
-    @staticmethod
-    def recevoir_entree(texte_a_afficher=""):
+    def recevoir_entree(self, texte_a_afficher="", expiration=False):
         """
         Fonction équivalente à "raw_input()", mais compatible avec python 3
 
+        Pendant l'attente, la fenêtre de la tortue reste réactive et le temps restant est mis à jour (voir "tic").
         :param texte_a_afficher: texte aà afficher avant de recevoir l'entrée de l'utilisateur
+        :param expiration: si "True", l'attente se termine dès que le joueur a perdu, par exemple parce que le temps
+                           est écoulé, et la fonction renvoie alors "EXPIRATION"
         :return: texte entré par l'utilisateur
         """
         print(texte_a_afficher, end="")
-        return stdin.readline().replace("\n", "")
+        sys.stdout.flush()
+        self._attente_de_tir = expiration
+        try:
+            return self.boucle_entrees.attendre()
+        finally:
+            self._attente_de_tir = False
+
+    def tic(self):
+        """
+        Fonction appelée régulièrement pendant l'attente d'une entrée.
+
+        Elle traite les évènements de la fenêtre de la tortue et met à jour le temps restant affiché.
+        :return: "EXPIRATION" si le joueur a perdu pendant l'attente d'un tir, "None" sinon
+        """
+        self.tortue_questions.screen.update()
+        if self.grille_visible:
+            self.afficher_tableau_de_bord()
+        if self._attente_de_tir and self.joueur_a_perdu():
+            return EXPIRATION
+        return None
 
     def confirmer_question(self, question):
         """
@@ -905,6 +868,17 @@ class Afficheur:
         """
         return self.confirmer_question("\nÊtes-vous sûr(e) de vouloir quitter? o/n")
 
+    def quitter(self):
+        """
+        Arrête les calculs de l'adversaire en arrière-plan, s'il y en a un, et quitte le jeu.
+
+        :return: pas de retour
+        """
+        if self.adversaire is not None:
+            self.adversaire.fermer()
+        sys.exit(0)  # "exit" fermerait l'entrée standard, que le fil de lecture de la console attend (voir
+        # "evenements") : le programme resterait bloqué
+
     def demander_rejouer(self):
         """
         Demande à l'utilisateur si il veut rejouer.
@@ -928,11 +902,18 @@ class Afficheur:
         """
         self.actualiser_parametres()
         self.nombre_de_coups = 0
-        if not self.grille.placer_bateaux():
-            self.afficher(
-                "Impossible de placer les bateaux, la grille est peut-être trop petite par rapport au nombre de bateaux.")
+        erreur = self.erreur_placement(self.grille.taille(), [bateau.TAILLE for bateau in self.grille.bateaux])
+        if erreur is None and (not self.grille.placer_bateaux() or (
+                self.adversaire is not None and not self.adversaire.commencer(self.grille.taille(),
+                                                                               self.grille.bateaux))):
+            erreur = "Impossible de placer les bateaux."
+        if erreur is not None:
+            self.afficher(erreur)
             self.afficher_menu(partie_en_cours=False)
             return
+        self.calibrer_en_arriere_plan()  # Pour les parties suivantes, si la configuration n'était pas calibrée
+        if self.journal is not None:
+            self.journal.commencer_partie(self.grille)  # Termine aussi la partie précédente, si elle a été abandonnée
         self.temps_depart = time.time()
         self.dessiner_tout()
 
@@ -950,14 +931,13 @@ class Afficheur:
         self.tortue_questions.screen.update()
         if retour_tir != "aucun retour":
             self.afficher_retour_tir(retour_tir, cases)
-        self.dessiner_grille_console()
+        self.dessiner_grille_console(cases)
         if cases is not None:
             for case in cases:
-                self.tortue_elements_permanents.dessiner_case(case)
-        self.tortue_elements_permanents.screen.update()
-        self.afficher_coups_restants()
+                self.rendu_grille.dessiner_case(case)
+        self.afficher_tableau_de_bord()
         self.afficher_temps_restant()
-        self.tortue_elements_provisoires.dessintextenombrebateaux(self.grille, (-300, -175))
+        self.tortue_elements_permanents.screen.update()
 
     def dessiner_tout(self):
         """
@@ -969,78 +949,30 @@ class Afficheur:
         self.grille_visible = True
         self.effacer_tout()
         self.tortue_elements_permanents.dessinfond()
-        self.tortue_elements_permanents.dessiner_grille(self.grille.cases)
-        self.tortue_elements_permanents.dessinbateaux(self.grille, (-300, -175))
+        self.rendu_grille.dessiner_grille(self.grille.cases, self.geometrie())
+        self.tortue_elements_permanents.dessinbateaux(self.grille, self.tableau_de_bord.POSITION_BATEAUX)
+        self.tableau_de_bord.montrer()  # Replace le tableau de bord au-dessus du fond qui vient d'être dessiné
         self.actualiser()
+        self.dessiner_flotte_joueur()
 
-    def ajouter_espacement_avant(self, nombre=None):
-        """
-        Ajoute un espacement avant la grille pour aligner les nombres sur la droite.
-
-        :param nombre: nombre qui doit être aligné
-        :return: pas de retour
+    def dessiner_grille_console(self, cases=None):
         """
-        espacement_total = decimales(self.grille.taille())
-        if nombre is None:
-            espacement = espacement_total
-        else:
-            espacement = espacement_total - decimales(nombre)
-        print(" " * espacement, end="")  # Ajoute un espacement pour aligner les nombres à droite
+        Dessine la grille dans la console, voir "console.RenduConsole".
 
-    def dessiner_premiere_ligne_console(self):
-        """
-        Dessine la ligne de numérotation des colonnes de la grille.
-
-        Exemple: _A_B_C_D_E_F_G_H_I_J_
+        :param cases: cases modifiées par le dernier tir, "None" s'il n'y en a pas
         :return: pas de retour
         """
-        self.ajouter_espacement_avant()
-        for index_x in range(self.grille.taille()):
-            print("_" + string.ascii_uppercase[index_x], end="")
-        print("_\n", end="")
+        self.rendu_console.dessiner_cases(self.grille, cases)
 
-    def dessiner_case_console(self, index_y, index_x):
+    def dessiner_flotte_joueur(self):
         """
-        Dessine une case de la grille dans la console.
+        Dessine dans la console la grille portant la flotte du joueur, sur laquelle tire l'adversaire, s'il y en a un.
 
-        :param index_y: index de la ligne
-        :param index_x: index de la colonne
         :return: pas de retour
         """
-        case = self.grille.cases[index_y][index_x]
-        print("|", end="")
-        print(case.caractere_etat(), end="")
-        if index_x == self.grille.taille() - 1:
-            print("|\n", end="")
-
-    def dessiner_grille_console(self):
-        """
-        Dessine la grille dans la console.
-
-        Exemple pour une grille de largeur 10 :
-              _A_B_C_D_E_F_G_H_I_J_
-             1|_|_|_|_|_|_|_|_|_|_|
-             2|_|_|_|_|_|_|_|_|_|_|
-             3|_|_|_|_|_|_|_|_|_|_|
-             4|_|_|_|_|_|_|_|_|_|_|
-             5|_|_|_|_|_|_|_|_|_|_|
-             6|_|_|_|_|_|_|_|_|_|_|
-             7|_|_|_|_|_|_|_|_|_|_|
-             8|_|_|_|_|_|_|_|_|_|_|
-             9|_|_|_|_|_|_|_|_|_|_|
-            10|_|_|_|_|_|_|_|_|_|_|
-        :return: pas de retour
-        """
-        for index_y in range(self.grille.taille()):
-            for index_x in range(self.grille.taille()):
-                if index_y == 0 and index_x == 0:
-                    self.dessiner_premiere_ligne_console()
-
-                if index_x == 0:
-                    self.ajouter_espacement_avant(index_y + 1)
-                    print(str(index_y + 1), end="")
-
-                self.dessiner_case_console(index_y, index_x)
+        if self.adversaire is not None:
+            self.rendu_console.ecrire("Votre flotte :\n"
+                                      + self.rendu_console.image(self.adversaire.grille, montrer_bateaux=True))
 
     @staticmethod
     def _effacer_tout_console():
@@ -1075,68 +1007,118 @@ class Afficheur:
         if retour is None:
             self.afficher("\nVous avez déjà tiré sur cette case.")
         elif retour in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
-            if retour == Etat.DANS_L_EAU:
-                self.afficher("Dans l'eau")
-            elif retour == Etat.TOUCHE:
-                self.afficher("Touché")
-            else:
-                type_bateau = cases_affectees[0].bateau().TYPE  # On récupère le type du bateau touché
-                type_bateau = type_bateau[0].upper() + type_bateau[
-                                                       1:len(type_bateau)]  # On met la première lettre en majuscules
-                self.afficher(type_bateau + " coulé")
+            self.afficher(self.message_tir(retour, cases_affectees))
             self.nombre_de_coups += 1
         else:
             self.afficher_erreur("Case entrée invalide")
 
+    @staticmethod
+    def erreur_placement(taille, tailles):
+        """
+        Vérifie qu'une flotte peut être placée avant de l'accepter. La vérification est limitée en temps (voir
+        "placement.flotte_placable") : une flotte trop dense pour être tranchée rapidement est refusée.
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles: tailles des bateaux
+        :return: message d'erreur, ou "None" si la flotte peut être placée
+        """
+        placable = placement.flotte_placable(taille, tailles)
+        if placable:
+            return None
+        if placable is None:
+            return ("Impossible de vérifier rapidement que la flotte rentre dans une grille de taille {0}, "
+                    "elle est trop dense.").format(taille)
+        return "La flotte ne rentre pas dans une grille de taille {0}.".format(taille)
+
+    @staticmethod
+    def message_tir(retour, cases_affectees):
+        """
+        :param retour: état de la case après un tir réussi
+        :param cases_affectees: cases modifiées par le tir
+        :return: message décrivant le résultat du tir, par ex. "Touché" ou "Porte-avion coulé"
+        """
+        if retour == Etat.DANS_L_EAU:
+            return "Dans l'eau"
+        elif retour == Etat.TOUCHE:
+            return "Touché"
+        type_bateau = cases_affectees[0].bateau().TYPE  # On récupère le type du bateau touché
+        return type_bateau[0].upper() + type_bateau[1:] + " coulé"  # On met la première lettre en majuscules
+
+    def tour_adversaire(self):
+        """
+        Fait tirer l'adversaire sur la flotte du joueur et affiche le résultat.
+
+        Le tir a été calculé en arrière-plan pendant que le joueur jouait (voir "adversaire.Adversaire").
+        :return: booléen indiquant si l'adversaire a coulé toute la flotte du joueur
+        """
+        indice, retour, cases = self.adversaire.jouer()
+        taille = self.adversaire.grille.taille()
+        coordonnees = Grille.index_vers_coord_bataille((indice % taille, indice // taille))
+        self.dessiner_flotte_joueur()
+        self.afficher("L'ordinateur tire en {0} : {1}".format(coordonnees, self.message_tir(retour, cases).lower()),
+                      numero_ligne=1)
+        return self.adversaire.a_gagne()
+
     def avancer_d_un_tour(self, entree):
         """
         Fonction permettant au jeu d'avancer d'un tour.
 
         Elle peut être passée à "turtle.Turtle.screen.onclick", car elle commence par les arguments "x" et "y"
-        :param entree: entrée de l'utilisateur dans la console
+        :param entree: entrée de l'utilisateur dans la console, ou "EXPIRATION" si le temps s'est écoulé pendant
+                       l'attente
         :return: booléen indiquant si le jeu doit continuer
         """
-        if chaine_nettoyee(entree) in ("quitter", "q"):  # Si l'utilisateur veut quitter
+        if entree is EXPIRATION:
+            self.actualiser()
+            self.afficher("Temps écoulé, vous avez perdu!", numero_ligne=1)
+            self.proposer_nouvelle_partie()
+        elif chaine_nettoyee(entree) in ("quitter", "q"):  # Si l'utilisateur veut quitter
             self.actualiser()
             if self.confirmer_quitter():
-                exit(0)
+                self.quitter()
             else:
                 self.actualiser()
         elif chaine_nettoyee(entree) in ("", "<", "menu", "m"):
             self.afficher_menu(partie_en_cours=True)
         elif chaine_nettoyee(entree) in ("parametres", "paramÈtres", "paramètres", "p"):
             self.afficher_parametres(partie_en_cours=True)
+        elif chaine_nettoyee(entree) in ("statistiques", "stats"):
+            self.afficher_statistiques()
+            self.dessiner_tout()
         else:
             retour, cases = self.grille.tirer(
                 entree)  # On tire sur la case et on enregistre le retour de la méthode et les cases affectées
+            if self.journal is not None and retour is not False:  # Les coordonnées invalides ne sont pas des tirs
+                self.journal.enregistrer_tir(self.grille.indice_coordonnees(entree), retour)
             self.actualiser(retour, cases)
 
             if self.joueur_a_gagne():
                 self.afficher("Vous avez gagné, bravo!", numero_ligne=2)
-                self.afficher("Tapez \"m\", \"menu\" ou la touche entrée pour accéder au menu.", numero_ligne=3)
-                choix = chaine_nettoyee(self.recevoir_entree("\n>>> "))
-                if choix in ("m", "menu", ""):
-                    self.afficher_menu()
-                    return
-                else:
-                    if self.demander_rejouer():
-                        self.rejouer()
-                        return
-                    exit(0)
+                self.proposer_nouvelle_partie()
             elif self.joueur_a_perdu():
                 self.afficher("Vous avez perdu!", numero_ligne=1)
-                self.afficher("Tapez \"m\", \"menu\" ou la touche entrée pour accéder au menu.", numero_ligne=3)
-                choix = chaine_nettoyee(self.recevoir_entree("\n>>> "))
-                if choix in ("m", "menu", ""):
-                    self.afficher_menu()
-                    return
-                else:
-                    if self.demander_rejouer():
-                        self.rejouer()
-                        return
-                    exit(0)
-                if self.demander_rejouer():
-                    self.rejouer()
+                self.proposer_nouvelle_partie()
+            elif self.adversaire is not None and retour in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
+                if self.tour_adversaire():
+                    self.afficher("L'ordinateur a coulé toute votre flotte, vous avez perdu!", numero_ligne=2)
+                    self.proposer_nouvelle_partie()
+
+    def proposer_nouvelle_partie(self):
+        """
+        Propose au joueur d'aller au menu ou de rejouer à la fin d'une partie, et quitte s'il ne veut pas rejouer.
+
+        :return: pas de retour
+        """
+        if self.journal is not None:
+            self.journal.terminer_partie()
+        self.afficher("Tapez \"m\", \"menu\" ou la touche entrée pour accéder au menu.", numero_ligne=3)
+        choix = chaine_nettoyee(self.recevoir_entree("\n>>> "))
+        if choix in ("m", "menu", ""):
+            self.afficher_menu()
+        elif self.demander_rejouer():
+            self.rejouer()
+        else:
+            self.quitter()
 
     def boucle_des_evenements(self):
         """
@@ -1146,5 +1128,6 @@ class Afficheur:
         :return: pas de retour
         """
         while True:
-            entree = self.recevoir_entree("\n>>> ")  # Équivalent à "raw_input("\n>>> ")", mais compatible avec python 3
+            entree = self.recevoir_entree("\n>>> ", expiration=True)  # Équivalent à "raw_input("\n>>> ")", mais
+            # compatible avec python 3
             self.avancer_d_un_tour(entree)
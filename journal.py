@@ -0,0 +1,361 @@
+# coding: utf-8
+"""
+Module contenant l'enregistrement des parties dans un journal binaire et leur relecture sans affichage.
+
+Un journal est une suite de parties, écrites les unes après les autres sans jamais revenir en arrière. Chaque partie
+commence par un en-tête :
+    - "BNJ2" ;
+    - la taille de la grille et le nombre de bateaux ("<IH") ;
+    - pour chaque bateau, la longueur de son type, son type en UTF-8, l'index de sa première case, son orientation et
+      sa taille ("<B", type, "<QBH", l'orientation valant 1 pour un bateau vertical). La taille permet de relire les
+      flottes personnalisées ; les journaux "BNJ1", sans la taille, sont toujours lus pour les types prédéfinis.
+Suivent les tirs, par blocs : le nombre de tirs du bloc ("<I"), l'index de chaque case visée, puis le résultat de
+chaque tir sur un octet (valeur de l'"Etat", "DEJA_TIRE" ou "ERREUR"). Les index sont stockés sur 2, 4 ou 8 octets
+selon la taille de la grille. Un bloc vide termine la partie ; si le programme s'est arrêté avant, la partie est relue
+jusqu'au dernier bloc complet.
+
+Les parties simulées, les parties du joueur et celles jouées sur le serveur peuvent être enregistrées.
+
+Exemple : python simulation.py -n 10000 --journal parties.bnj
+          python batailleNavale.py --journal parties.bnj
+          python serveur.py serveur --journal parties.bnj
+          python journal.py parties.bnj -m grille
+"""
+from __future__ import print_function
+
+import argparse
+import array
+import struct
+import sys
+import time
+
+from grillebinaire import GrilleBinaire
+from bateau import TYPES_BATEAUX, bateau_depuis_type
+
+MAGIE = b"BNJ2"
+MAGIE_V1 = b"BNJ1"  # Ancien format, sans la taille des bateaux
+EN_TETE = struct.Struct("<IH")  # taille de la grille, nombre de bateaux
+BATEAU = struct.Struct("<QBH")  # index de la première case, orientation, taille
+BATEAU_V1 = struct.Struct("<QB")  # index de la première case, orientation
+BLOC = struct.Struct("<I")  # nombre de tirs du bloc
+DEJA_TIRE = 0xFF  # Résultat d'un tir sur une case ayant déjà reçu un tir
+ERREUR = 0xFE  # Résultat d'un tir refusé par la grille
+
+
+def code_resultat(etat):
+    """
+    :param etat: état renvoyé par "tirer" ou "tirer_indice"
+    :return: résultat du tir sur un octet
+    """
+    if etat is None:
+        return DEJA_TIRE
+    if etat is False:
+        return ERREUR
+    return int(etat)
+
+
+def format_indices(taille):
+    """
+    Choisit le type des éléments d'"array" le plus petit pouvant contenir tous les index d'une grille.
+
+    :param taille: nombre de cases d'un côté de la grille
+    :return: code de type d'"array"
+    """
+    for code in ("H", "I", "L", "Q"):
+        if taille ** 2 <= 1 << (8 * array.array(code).itemsize):
+            return code
+    raise ValueError("Grille trop grande pour le journal : {0}".format(taille))
+
+
+def _lire(fichier, nombre):
+    """
+    Lit exactement "nombre" octets.
+
+    :param fichier: fichier binaire
+    :param nombre: nombre d'octets à lire
+    :return: octets lus, ou "None" si le fichier se termine avant
+    """
+    octets = fichier.read(nombre)
+    if len(octets) < nombre:
+        return None
+    return octets
+
+
+class EcrivainJournal:
+    """
+    Classe enregistrant des parties à la fin d'un journal.
+
+    Les tirs sont gardés en mémoire et écrits par blocs de "TIRS_PAR_BLOC", ou à la fin de la partie.
+    """
+    TIRS_PAR_BLOC = 4096
+
+    def __init__(self, fichier):
+        """
+        constructeur de la classe "EcrivainJournal"
+
+        :param fichier: fichier binaire ouvert en écriture, par ex. avec open(chemin, "ab")
+        """
+        self._fichier = fichier
+        self._tirs = None  # Tirs de la partie en cours pas encore écrits, "None" hors d'une partie
+        self._resultats = None
+
+    def commencer_partie(self, grille):
+        """
+        Écrit l'en-tête d'une partie : taille de la grille, flotte et positions des bateaux.
+
+        Les bateaux doivent déjà être placés. Une partie commencée et pas terminée est terminée d'abord.
+        :param grille: grille de la partie (n'importe quel moteur)
+        :return: pas de retour
+        """
+        if self._tirs is not None:
+            self.terminer_partie()
+        taille = grille.taille()
+        morceaux = [MAGIE, EN_TETE.pack(taille, len(grille.bateaux))]
+        for bateau, indices in zip(grille.bateaux, grille.positions_bateaux()):
+            type_bateau = bateau.TYPE.encode("utf-8")
+            vertical = len(indices) > 1 and indices[1] - indices[0] == taille
+            morceaux.append(struct.pack("<B", len(type_bateau)) + type_bateau
+                            + BATEAU.pack(indices[0] if indices else 0, vertical, bateau.TAILLE))
+        self._fichier.write(b"".join(morceaux))
+        self._tirs = array.array(format_indices(taille))
+        self._resultats = bytearray()
+
+    def enregistrer_tir(self, indice, etat):
+        """
+        Enregistre un tir de la partie en cours.
+
+        :param indice: index de la case visée ("ligne * taille + colonne")
+        :param etat: état renvoyé par le tir
+        :return: pas de retour
+        """
+        self._tirs.append(indice)
+        self._resultats.append(code_resultat(etat))
+        if len(self._tirs) >= self.TIRS_PAR_BLOC:
+            self._ecrire_bloc()
+
+    def _ecrire_bloc(self):
+        """
+        Écrit les tirs en attente dans un bloc.
+
+        :return: pas de retour
+        """
+        if sys.byteorder == "big":  # Le journal est toujours en petit-boutiste
+            self._tirs.byteswap()
+        self._fichier.write(BLOC.pack(len(self._tirs)) + self._tirs.tobytes() + bytes(self._resultats))
+        del self._tirs[:]
+        del self._resultats[:]
+
+    def terminer_partie(self):
+        """
+        Écrit les derniers tirs et la fin de la partie. Ne fait rien hors d'une partie, ce qui permet de l'appeler
+        sans savoir si une partie est en cours, par ex. quand le joueur quitte.
+
+        :return: pas de retour
+        """
+        if self._tirs is None:
+            return
+        if self._tirs:
+            self._ecrire_bloc()
+        self._fichier.write(BLOC.pack(0))
+        self._tirs = None
+        self._resultats = None
+
+
+class PartieJournal:
+    """
+    Partie lue dans un journal.
+    """
+    __slots__ = ("taille", "types", "positions", "tirs", "resultats")
+
+    def __init__(self, taille, types, positions, tirs, resultats):
+        """
+        constructeur de la classe "PartieJournal"
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param types: liste des types des bateaux
+        :param positions: liste de tuples contenant les index des cases de chaque bateau
+        :param tirs: "array" des index des cases visées, dans l'ordre des tirs
+        :param resultats: "bytes" contenant le résultat enregistré de chaque tir
+        """
+        self.taille = taille
+        self.types = types
+        self.positions = positions
+        self.tirs = tirs
+        self.resultats = resultats
+
+    def creer_bateaux(self):
+        """
+        Crée la flotte de la partie, y compris les types de bateaux personnalisés (voir "bateau.classe_bateau").
+
+        :return: liste de nouveaux bateaux sans cases, dans l'ordre de "types"
+        """
+        bateaux = []
+        for type_bateau, indices in zip(self.types, self.positions):
+            bateau = bateau_depuis_type(type_bateau, len(indices))
+            if bateau is None:
+                raise ValueError("Type de bateau incompatible dans le journal : {0}".format(type_bateau))
+            bateaux.append(bateau)
+        return bateaux
+
+    def creer_grille(self, moteur=GrilleBinaire):
+        """
+        Crée une grille dont les bateaux sont placés comme au début de la partie.
+
+        :param moteur: classe de la grille à créer
+        :return: grille prête à rejouer la partie
+        """
+        grille = moteur(self.creer_bateaux(), self.taille)
+        if not grille.placer_bateaux_positions(self.positions):
+            raise ValueError("Positions des bateaux invalides dans le journal")
+        return grille
+
+
+def lire_parties(fichier):
+    """
+    Lit les parties d'un journal les unes après les autres.
+
+    :param fichier: fichier binaire ouvert en lecture
+    :return: générateur de "PartieJournal"
+    """
+    while True:
+        magie = fichier.read(len(MAGIE))
+        if not magie:
+            return
+        if magie not in (MAGIE, MAGIE_V1):
+            raise ValueError("Ce fichier n'est pas un journal de parties")
+        octets = _lire(fichier, EN_TETE.size)
+        if octets is None:
+            return  # En-tête incomplet, le programme s'est arrêté pendant l'écriture
+        taille, nombre_bateaux = EN_TETE.unpack(octets)
+        types = []
+        positions = []
+        for i in range(nombre_bateaux):
+            longueur = _lire(fichier, 1)
+            type_bateau = None if longueur is None else _lire(fichier, longueur[0])
+            format_bateau = BATEAU if magie == MAGIE else BATEAU_V1
+            octets = None if type_bateau is None else _lire(fichier, format_bateau.size)
+            if octets is None:
+                return
+            type_bateau = type_bateau.decode("utf-8")
+            if magie == MAGIE:
+                depart, vertical, taille_bateau = BATEAU.unpack(octets)
+            else:
+                depart, vertical = BATEAU_V1.unpack(octets)
+                classe = TYPES_BATEAUX.get(type_bateau)
+                if classe is None:
+                    raise ValueError("Type de bateau inconnu dans le journal : {0}".format(type_bateau))
+                taille_bateau = classe.TAILLE
+            pas = taille if vertical else 1
+            types.append(type_bateau)
+            positions.append(tuple(range(depart, depart + pas * taille_bateau, pas)))
+        tirs = array.array(format_indices(taille))
+        resultats = bytearray()
+        while True:
+            octets = _lire(fichier, BLOC.size)
+            if octets is None:
+                break
+            nombre = BLOC.unpack(octets)[0]
+            if nombre == 0:
+                break
+            octets = _lire(fichier, nombre * (tirs.itemsize + 1))
+            if octets is None:
+                break
+            bloc = array.array(tirs.typecode, octets[:nombre * tirs.itemsize])
+            if sys.byteorder == "big":
+                bloc.byteswap()
+            tirs.extend(bloc)
+            resultats.extend(octets[nombre * tirs.itemsize:])
+        yield PartieJournal(taille, types, positions, tirs, bytes(resultats))
+
+
+def rejouer(partie, grille=None):
+    """
+    Rejoue les tirs d'une partie sans affichage.
+
+    :param partie: partie à rejouer
+    :param grille: grille à réutiliser, de même taille et de même flotte que la partie, pour éviter d'en créer une à
+                   chaque partie ; par défaut une nouvelle "GrilleBinaire"
+    :return: "bytes" contenant le résultat de chaque tir, comparable à "partie.resultats"
+    """
+    if grille is None:
+        grille = partie.creer_grille()
+    elif not grille.placer_bateaux_positions(partie.positions):
+        raise ValueError("Positions des bateaux invalides dans le journal")
+    resultats = bytearray(len(partie.tirs))
+    if isinstance(grille, GrilleBinaire):  # Chemin rapide, sans créer de vues sur les cases
+        tirer = grille.tirer_masque
+    else:
+        tirer = grille.tirer_indice
+    for i, indice in enumerate(partie.tirs):
+        resultats[i] = code_resultat(tirer(indice)[0])
+    return bytes(resultats)
+
+
+def premiere_divergence(partie, resultats):
+    """
+    Compare les résultats d'une relecture à ceux enregistrés.
+
+    :param partie: partie enregistrée
+    :param resultats: résultats renvoyés par "rejouer"
+    :return: numéro du premier tir dont le résultat diffère, ou "None" si tous les résultats sont identiques
+    """
+    if resultats == partie.resultats:
+        return None
+    for i, (obtenu, attendu) in enumerate(zip(resultats, partie.resultats)):
+        if obtenu != attendu:
+            return i
+    return min(len(resultats), len(partie.resultats))
+
+
+def rejouer_journal(fichier, moteur=GrilleBinaire):
+    """
+    Rejoue et vérifie toutes les parties d'un journal.
+
+    Une grille est gardée pour chaque couple (taille, flotte) rencontré, puis réutilisée.
+    :param fichier: fichier binaire ouvert en lecture
+    :param moteur: classe des grilles utilisées pour rejouer
+    :return: générateur de tuples (numéro de la partie, partie, numéro du premier tir divergent ou "None")
+    """
+    grilles = {}
+    for numero, partie in enumerate(lire_parties(fichier)):
+        cle = (partie.taille, tuple(partie.types), tuple(len(indices) for indices in partie.positions))
+        if cle not in grilles:
+            grilles[cle] = moteur(partie.creer_bateaux(), partie.taille)
+        yield numero, partie, premiere_divergence(partie, rejouer(partie, grilles[cle]))
+
+
+def main():
+    """
+    Point d'entrée de la relecture de journaux en ligne de commande.
+
+    :return: pas de retour
+    """
+    from simulation import MOTEURS  # Importé ici, "simulation" importe ce module
+
+    parser = argparse.ArgumentParser(description="Relecture et vérification de parties enregistrées.")
+    parser.add_argument("journaux", nargs="+", help="fichiers de journal à rejouer")
+    parser.add_argument("-m", "--moteur", choices=sorted(MOTEURS), default="binaire", help="moteur de grille")
+    arguments = parser.parse_args()
+
+    debut = time.time()
+    nombre_parties = 0
+    nombre_tirs = 0
+    nombre_divergences = 0
+    for chemin in arguments.journaux:
+        with open(chemin, "rb") as fichier:
+            for numero, partie, divergence in rejouer_journal(fichier, MOTEURS[arguments.moteur]):
+                nombre_parties += 1
+                nombre_tirs += len(partie.tirs)
+                if divergence is not None:
+                    nombre_divergences += 1
+                    print("{0}, partie {1} : divergence au tir {2}".format(chemin, numero, divergence))
+    ecoule = max(time.time() - debut, 1e-9)
+    print("Parties rejouées : {0} en {1:.2f} s ({2:.0f} parties/s, {3:.0f} tirs/s)".format(
+        nombre_parties, ecoule, nombre_parties / ecoule, nombre_tirs / ecoule))
+    print("Parties divergentes : {0}".format(nombre_divergences))
+    if nombre_divergences:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
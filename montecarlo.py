@@ -0,0 +1,330 @@
+# coding: utf-8
+"""
+Module contenant une intelligence artificielle qui tire sur la case la plus probable, estimée par tirage de flottes.
+
+À chaque tour, on tire au hasard un grand nombre de placements des bateaux restants compatibles avec ce qui a été
+observé : les cases dans l'eau et les bateaux coulés sont interdits, chaque case touchée doit être couverte par un
+bateau restant et aucun bateau restant ne peut être entièrement touché (il serait coulé). On compte combien de
+placements tirés couvrent chaque case non visée, et on tire sur la case la plus souvent couverte.
+
+Les cases touchées sont couvertes en premier, chacune par un placement tiré parmi ceux qui la contiennent, puis les
+autres bateaux sont placés au hasard ; les placements impossibles sont abandonnés. Les tirages sont répartis sur un
+groupe de processus et s'arrêtent à l'expiration d'un délai par coup, ce qui garantit un temps de réponse fixe en
+partie comme en simulation. Dans un processus de calcul de "simulation" (qui ne peut pas créer de processus), les
+tirages sont faits dans le processus lui-même.
+
+Exemple : python montecarlo.py -n 20 --delai 0.1 -p 4
+"""
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import random
+import time
+
+from case import Etat
+from grillebinaire import masque_etats
+from placement import masques_placements, indices_masque
+from strategie import AbstractStrategie
+
+ESSAIS_PAR_BATEAU = 20  # Nombre de placements tirés pour un bateau avant d'abandonner la flotte en cours
+_pool = None  # Groupe de processus partagé par toutes les stratégies, voir "pool_de_calcul"
+_processus_pool = 0
+
+
+def placements_legaux(taille, tailles, interdites, touches):
+    """
+    Renvoie les placements de chaque taille de bateau compatibles avec les tirs.
+
+    :param taille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux restants
+    :param interdites: masque des cases dans l'eau ou coulées
+    :param touches: masque des cases touchées des bateaux restants
+    :return: dictionnaire taille -> liste des masques des placements possibles
+    """
+    legaux = {}
+    for taille_bateau in set(tailles):
+        legaux[taille_bateau] = [masque for masque in masques_placements(taille, taille_bateau)
+                                 if not masque & interdites and masque & touches != masque]
+    return legaux
+
+
+def compter_placements(parametres):
+    """
+    Tire des placements de la flotte restante et compte combien couvrent chaque case. Cette fonction est exécutée
+    dans les processus de calcul.
+
+    :param parametres: tuple (taille de la grille, masque des cases dans l'eau, masque des cases touchées, masque des
+                       cases coulées, liste des tailles des bateaux restants, graine, durée maximale en secondes,
+                       nombre maximal de placements ou "None")
+    :return: tuple (liste du nombre de placements couvrant chaque case, nombre de placements tirés)
+    """
+    taille, eau, touches, coules, tailles, graine, duree, maximum = parametres
+    fin = time.perf_counter() + duree
+    generateur = random.Random(graine)
+    legaux = placements_legaux(taille, tailles, eau | coules, touches)
+    cases_touchees = indices_masque(touches)
+    couvrant = {}  # Placements légaux contenant une case touchée, par (case, taille)
+    for case in cases_touchees:
+        for taille_bateau, masques in legaux.items():
+            couvrant[(case, taille_bateau)] = [masque for masque in masques if masque >> case & 1]
+    comptes = [0] * (taille ** 2)
+    nombre = 0
+    while (maximum is None or nombre < maximum) and time.perf_counter() < fin:
+        occupation = 0
+        restantes = list(tailles)
+        a_couvrir = touches
+        possible = True
+        while a_couvrir:  # Chaque case touchée est couverte par un des bateaux restants
+            case = (a_couvrir & -a_couvrir).bit_length() - 1
+            options = [(taille_bateau, masque) for taille_bateau in set(restantes)
+                       for masque in couvrant[(case, taille_bateau)] if not masque & occupation]
+            if not options:
+                possible = False
+                break
+            taille_bateau, masque = options[generateur.randrange(len(options))]
+            occupation |= masque
+            a_couvrir &= ~masque
+            restantes.remove(taille_bateau)
+        if not possible:
+            continue
+        for taille_bateau in sorted(restantes, reverse=True):  # Les autres bateaux sont placés n'importe où
+            masques = legaux[taille_bateau]
+            for i in range(ESSAIS_PAR_BATEAU if masques else 0):
+                masque = masques[generateur.randrange(len(masques))]
+                if not masque & occupation:
+                    occupation |= masque
+                    break
+            else:
+                possible = False
+                break
+        if not possible:
+            continue
+        for case in indices_masque(occupation & ~touches):
+            comptes[case] += 1
+        nombre += 1
+    return comptes, nombre
+
+
+def pool_de_calcul(processus):
+    """
+    Renvoie le groupe de processus partagé, en le créant au premier appel ou si le nombre de processus a changé.
+
+    :param processus: nombre de processus de calcul
+    :return: "multiprocessing.Pool"
+    """
+    global _pool, _processus_pool
+    if _pool is None or _processus_pool != processus:
+        fermer_pool()
+        _pool = multiprocessing.Pool(processus)
+        _processus_pool = processus
+    return _pool
+
+
+def fermer_pool():
+    """
+    Arrête le groupe de processus partagé s'il existe.
+
+    :return: pas de retour
+    """
+    global _pool, _processus_pool
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+        _processus_pool = 0
+
+
+class StrategieMonteCarlo(AbstractStrategie):
+    """
+    Stratégie tirant sur la case la plus souvent couverte par des flottes tirées au hasard parmi celles compatibles
+    avec les tirs observés.
+    """
+    NOM = "montecarlo"
+    DELAI = 0.1  # Temps de réflexion par coup, en secondes
+    MARGE = 0.02  # Part du délai réservée à l'envoi des tirages aux processus et à la réception des comptes
+
+    def __init__(self, taille, tailles_bateaux, generateur=random, delai=None, processus=None, echantillons=None):
+        """
+        constructeur de la classe "StrategieMonteCarlo"
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles_bateaux: liste des tailles des bateaux de la flotte adverse
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        :param delai: temps de réflexion par coup en secondes, "DELAI" par défaut
+        :param processus: nombre de processus de calcul, par défaut le nombre de cœurs (1 pour tout calculer dans ce
+                          processus)
+        :param echantillons: nombre maximal de flottes tirées par coup, "None" pour en tirer jusqu'à la fin du délai
+        """
+        AbstractStrategie.__init__(self, taille, tailles_bateaux, generateur)
+        self.delai = self.DELAI if delai is None else delai
+        if processus is None:
+            processus = multiprocessing.cpu_count()
+        if multiprocessing.current_process().daemon:  # Les processus de calcul ne peuvent pas en créer d'autres
+            processus = 1
+        self.processus = processus
+        self.echantillons = echantillons
+        self.tailles_restantes = list(tailles_bateaux)
+        self.tirs = 0  # masque des cases ayant reçu un tir
+        self.eau = 0
+        self.touches = 0  # masque des cases touchées appartenant à des bateaux non coulés
+        self.coules = 0
+        self.dernier_nombre_echantillons = 0  # nombre de flottes tirées pour choisir le dernier tir
+
+    def observer_grille(self, grille):
+        """
+        Remplace les observations par l'état visible d'une grille : l'état des cases ayant reçu un tir et les bateaux
+        restants. Les bateaux intacts ne sont pas regardés.
+
+        :param grille: grille de jeu (n'importe quel moteur)
+        :return: pas de retour
+        """
+        etats = grille.etats_octets()
+        self.eau = masque_etats(etats, {Etat.DANS_L_EAU})
+        self.touches = masque_etats(etats, {Etat.TOUCHE})
+        self.coules = masque_etats(etats, {Etat.COULE})
+        self.tirs = self.eau | self.touches | self.coules
+        self.tailles_restantes = [bateau.TAILLE for bateau in grille.bateaux_restants()]
+
+    def observer(self, indice, etat, indices_modifies):
+        """
+        Enregistre le résultat d'un tir.
+
+        :param indice: index de la case visée
+        :param etat: état de la case après le tir
+        :param indices_modifies: index des cases modifiées par le tir
+        :return: pas de retour
+        """
+        bit = 1 << indice
+        if self.tirs & bit:
+            return
+        self.tirs |= bit
+        if etat == Etat.DANS_L_EAU:
+            self.eau |= bit
+        elif etat == Etat.TOUCHE:
+            self.touches |= bit
+        elif etat == Etat.COULE:
+            masque = 0
+            for case in indices_modifies:
+                masque |= 1 << case
+            self.coules |= masque
+            self.touches &= ~masque
+            if len(indices_modifies) in self.tailles_restantes:
+                self.tailles_restantes.remove(len(indices_modifies))
+
+    def estimer(self):
+        """
+        Tire des flottes compatibles avec les observations pendant au plus "delai" secondes.
+
+        :return: tuple (liste du nombre de flottes tirées couvrant chaque case, nombre de flottes tirées)
+        """
+        if self.processus <= 1:
+            return compter_placements((self.taille, self.eau, self.touches, self.coules, self.tailles_restantes,
+                                       self.generateur.getrandbits(64), self.delai, self.echantillons))
+        maximum = None if self.echantillons is None else -(-self.echantillons // self.processus)
+        pool = pool_de_calcul(self.processus)  # Créé avant de mesurer le délai : le démarrage des processus au premier
+        # coup ne doit pas consommer le temps de réflexion
+        fin = time.perf_counter() + self.delai
+        duree = max(0.0, self.delai - self.MARGE)
+        resultats = [pool.apply_async(compter_placements, ((
+            self.taille, self.eau, self.touches, self.coules, self.tailles_restantes, self.generateur.getrandbits(64),
+            duree, maximum),)) for i in range(self.processus)]
+        comptes = [0] * (self.taille ** 2)
+        nombre = 0
+        for resultat in resultats:
+            try:
+                comptes_processus, nombre_processus = resultat.get(max(0.0, fin - time.perf_counter()))
+            except multiprocessing.TimeoutError:  # Processus en retard, ses tirages sont ignorés
+                continue
+            for case, compte in enumerate(comptes_processus):
+                comptes[case] += compte
+            nombre += nombre_processus
+        return comptes, nombre
+
+    def choisir_tir(self):
+        """
+        Choisit la case non visée la plus souvent couverte, au hasard en cas d'égalité.
+
+        Si aucune flotte n'a pu être tirée à temps, on tire à côté d'une case touchée, ou au hasard.
+        :return: index de la case
+        """
+        comptes, self.dernier_nombre_echantillons = self.estimer()
+        non_visees = [case for case in range(self.taille ** 2) if not self.tirs >> case & 1]
+        if self.dernier_nombre_echantillons == 0:
+            voisines = [case for case in non_visees if any(
+                self.touches >> voisine & 1 for voisine in self.voisines(case))]
+            return self.generateur.choice(voisines or non_visees)
+        meilleur_compte = max(comptes[case] for case in non_visees)
+        return self.generateur.choice([case for case in non_visees if comptes[case] == meilleur_compte])
+
+    def voisines(self, case):
+        """
+        :param case: index d'une case
+        :return: liste des index des cases ayant un côté commun avec elle
+        """
+        ligne, colonne = divmod(case, self.taille)
+        resultat = []
+        if ligne > 0:
+            resultat.append(case - self.taille)
+        if ligne < self.taille - 1:
+            resultat.append(case + self.taille)
+        if colonne > 0:
+            resultat.append(case - 1)
+        if colonne < self.taille - 1:
+            resultat.append(case + 1)
+        return resultat
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : joue des parties avec la stratégie et mesure le temps de réflexion.
+
+    :return: pas de retour
+    """
+    from grillebinaire import GrilleBinaire  # Importés ici, "simulation" importe ce module
+    from simulation import jouer_partie
+    import batailleNavale
+
+    parser = argparse.ArgumentParser(description="Parties jouées par l'IA de Monte-Carlo.")
+    parser.add_argument("-n", "--parties", type=int, default=10, help="nombre de parties à jouer")
+    parser.add_argument("-t", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("--delai", type=float, default=StrategieMonteCarlo.DELAI, help="temps de réflexion par coup "
+                                                                                        "en secondes")
+    parser.add_argument("-p", "--processus", type=int, default=None, help="nombre de processus (défaut : nombre de "
+                                                                           "cœurs)")
+    parser.add_argument("--graine", type=int, default=0, help="graine des générateurs aléatoires")
+    arguments = parser.parse_args()
+
+    generateur = random.Random(arguments.graine)
+    bateaux = batailleNavale.creer_bateaux()
+    grille = GrilleBinaire(bateaux, arguments.taille)
+    tirs = []
+    durees = []
+    echantillons = []
+    try:
+        for partie in range(arguments.parties):
+            grille.placer_bateaux(generateur)
+            strategie = StrategieMonteCarlo(arguments.taille, [bateau.TAILLE for bateau in bateaux], generateur,
+                                            arguments.delai, arguments.processus)
+            choisir_tir = strategie.choisir_tir
+
+            def choisir_et_mesurer():
+                debut = time.perf_counter()
+                indice = choisir_tir()
+                durees.append(time.perf_counter() - debut)
+                echantillons.append(strategie.dernier_nombre_echantillons)
+                return indice
+
+            strategie.choisir_tir = choisir_et_mesurer
+            tirs.append(jouer_partie(grille, strategie))
+            print("Partie {0} : {1} tirs".format(partie + 1, tirs[-1]))
+    finally:
+        fermer_pool()
+    print("Nombre moyen de tirs par partie : {0:.2f}".format(sum(tirs) / float(len(tirs))))
+    print("Temps par coup : {0:.0f} ms en moyenne, {1:.0f} ms au maximum".format(
+        sum(durees) / len(durees) * 1e3, max(durees) * 1e3))
+    print("Flottes tirées par coup : {0:.0f} en moyenne".format(sum(echantillons) / float(len(echantillons))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,733 @@
+# coding: utf-8
+"""
+Module contenant le placement aléatoire des bateaux par satisfaction de contraintes.
+
+Chaque placement possible d'un bateau est représenté par un masque binaire dont les bits correspondent aux cases
+occupées, l'index du bit étant "ligne * taille_grille + colonne". Pour chaque taille de bateau, on tire directement
+parmi les placements encore légaux et on revient en arrière quand une taille de bateau restante n'a plus aucun
+placement possible. Les situations sans issue sont mémorisées, ce qui permet de prouver rapidement qu'une flotte ne
+peut pas être placée au lieu d'attendre l'expiration d'un délai. Chaque recherche est limitée en nombre d'opérations :
+sur une flotte dense, le placement reste ainsi borné en temps, quitte à reprendre un placement déjà connu.
+
+Les masques de tous les placements d'une taille de bateau occupent de l'ordre de taille_grille ** 4 / 8 octets (plus de
+2 Go pour une grille de 250 cases de côté). Au-delà de "TAILLE_MASQUES_MAX", ils ne sont donc jamais construits : la
+position de chaque bateau est tirée directement, et on reprend un placement connu de la flotte si les tirages échouent.
+
+Exemple (vérification que toute flotte acceptée par "flotte_placable" est placée et que les flottes denses le sont en
+un temps borné) : python placement.py -n 1000
+"""
+import argparse
+import random
+import time
+
+TAILLE_MASQUES_MAX = 64  # Taille de grille au-delà de laquelle les placements possibles ne sont pas construits
+ESSAIS_PAR_BATEAU = 1000  # Nombre maximum de tirages pour placer un bateau sur une grande grille
+OPERATIONS_MAX = 500  # Nombre maximum d'opérations d'une recherche de "placer_flotte"
+OPERATIONS_PRECONTROLE_MAX = 4000  # Nombre maximum d'opérations de la plus longue recherche de "flotte_placable"
+_PLACEMENTS = {}  # Cache des placements possibles, indexé par (taille de la grille, taille du bateau)
+_PLACABLES = {}  # Cache de "flotte_placable", indexé par (taille de la grille, tailles triées des bateaux), avec le
+# résultat, les tailles triées et les positions d'un placement s'il est connu
+DERNIERE_RECHERCHE = {"impasses": 0, "interrompue": False}  # Nombre de situations sans issue rencontrées par le
+# dernier placement, lu par l'instrumentation (voir "instrumentation") pour compter les retours en arrière, et booléen
+# indiquant si sa recherche a été interrompue faute d'opérations, auquel cas un échec ne prouve rien
+
+
+def indices_masque(masque):
+    """
+    Renvoie les index des bits valant 1 dans un masque.
+
+    :param masque: entier représentant un ensemble de cases
+    :return: liste des index des cases, dans l'ordre croissant
+    """
+    indices = []
+    while masque:
+        bit = masque & -masque  # isole le bit de poids le plus faible
+        indices.append(bit.bit_length() - 1)
+        masque ^= bit
+    return indices
+
+
+def masques_placements(taille_grille, taille_bateau):
+    """
+    Renvoie tous les placements d'un bateau sur une grille vide.
+
+    Le résultat est calculé une seule fois par couple de tailles, puis gardé en cache.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param taille_bateau: nombre de cases du bateau
+    :return: tuple des masques de chaque placement, horizontaux puis verticaux
+    """
+    cle = (taille_grille, taille_bateau)
+    if cle not in _PLACEMENTS:
+        masques = []
+        if 0 < taille_bateau <= taille_grille:
+            horizontal = (1 << taille_bateau) - 1
+            vertical = 0
+            for i in range(taille_bateau):
+                vertical |= 1 << (i * taille_grille)
+            for ligne in range(taille_grille):
+                for colonne in range(taille_grille - taille_bateau + 1):
+                    masques.append(horizontal << (ligne * taille_grille + colonne))
+            if taille_bateau > 1:  # Un bateau d'une case a le même placement dans les deux sens
+                for ligne in range(taille_grille - taille_bateau + 1):
+                    for colonne in range(taille_grille):
+                        masques.append(vertical << (ligne * taille_grille + colonne))
+        _PLACEMENTS[cle] = tuple(masques)
+    return _PLACEMENTS[cle]
+
+
+def _transposer(taille_grille, masque):
+    """
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param masque: masque d'un ensemble de cases
+    :return: masque des mêmes cases, les lignes et les colonnes de la grille étant échangées
+    """
+    transpose = 0
+    for indice in indices_masque(masque):
+        ligne, colonne = divmod(indice, taille_grille)
+        transpose |= 1 << (colonne * taille_grille + ligne)
+    return transpose
+
+
+def _capacite_suffisante(taille_grille, libres, libres_transposees, besoins, memoire):
+    """
+    Vérifie que les lignes et les colonnes de la grille ont assez de place pour les bateaux restants.
+
+    Un bateau d'au moins "taille" cases occupe au moins "taille" cases consécutives libres d'une ligne ou d'une
+    colonne, donc une suite de "n" cases libres en accueille au plus "n // taille". Si, pour une taille, les bateaux au
+    moins aussi grands sont plus nombreux que ces places, comptées sur toutes les lignes et toutes les colonnes, la
+    flotte ne peut pas être placée. C'est une condition nécessaire seulement : une case peut être comptée deux fois.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param libres: masque des cases libres
+    :param libres_transposees: masque des cases libres, les lignes et les colonnes de la grille étant échangées
+    :param besoins: liste de couples (taille, nombre de bateaux restants de cette taille), par taille décroissante,
+                    sans les bateaux d'une case
+    :param memoire: dictionnaire gardant le nombre de places de chaque ligne, indexé par (masque de la ligne, taille)
+    :return: booléen valant "False" si la flotte ne peut certainement pas être placée
+    """
+    if not besoins:
+        return True
+    masque_ligne = (1 << taille_grille) - 1
+    lignes = [(libres >> decalage) & masque_ligne for decalage in range(0, taille_grille ** 2, taille_grille)]
+    lignes += [(libres_transposees >> decalage) & masque_ligne
+               for decalage in range(0, taille_grille ** 2, taille_grille)]
+    bateaux = 0
+    for taille, nombre in besoins:
+        bateaux += nombre
+        places = 0
+        for ligne in lignes:
+            cle = (ligne, taille)
+            if cle not in memoire:
+                places_ligne = 0
+                reste = ligne
+                while reste:
+                    suite = reste & ~(reste + (reste & -reste))  # première suite de cases libres consécutives
+                    places_ligne += bin(suite).count("1") // taille
+                    reste ^= suite
+                memoire[cle] = places_ligne
+            places += memoire[cle]
+            if places >= bateaux:
+                break
+        else:
+            return False
+    return True
+
+
+def _placer_par_bateau(taille_grille, tailles, occupation, generateur, operations_max):
+    """
+    Place les bateaux un par un, en tirant chaque placement parmi ceux encore légaux.
+
+    Adapté aux grilles peu remplies : les listes de placements ne sont pas filtrées, les placements devenus illégaux
+    sont simplement écartés au moment du tirage. On revient en arrière dès qu'une taille de bateau restante n'a plus
+    aucun placement possible.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux, dans l'ordre où ils doivent être placés
+    :param occupation: masque des cases interdites
+    :param generateur: générateur de nombres aléatoires
+    :param operations_max: nombre maximum de placements examinés avant d'abandonner la recherche
+    :return: liste des masques des bateaux ou "None" si la flotte ne peut pas être placée ou si la recherche a été
+             interrompue
+    """
+    legaux = {}
+    for taille in set(tailles):
+        legaux[taille] = [masque for masque in masques_placements(taille_grille, taille) if not masque & occupation]
+    echecs = set()  # Couples (occupation, profondeur) dont on sait qu'ils n'ont pas de solution
+    masques = [0] * len(tailles)
+    if not tailles:
+        return masques
+    # Pile explicite plutôt que récursion, pour que les grandes flottes ne dépassent pas la limite de récursion : un
+    # étage par bateau placé, avec (occupation, candidats restants, tailles des bateaux suivants)
+    pile = [(occupation, list(legaux[tailles[0]]), set(tailles[1:]))]
+    reussite = False
+    operations = 0
+    while pile and operations < operations_max:
+        occupation_courante, candidats, tailles_suivantes = pile[-1]
+        profondeur = len(pile) - 1
+        nouvelle_occupation = None
+        while candidats and operations < operations_max:
+            # On tire un candidat au hasard et on le retire de la liste en l'échangeant avec le dernier
+            i = generateur.randrange(len(candidats))
+            candidats[i], candidats[-1] = candidats[-1], candidats[i]
+            masque = candidats.pop()
+            if masque & occupation_courante:
+                continue
+            occupation_candidate = occupation_courante | masque
+            if (occupation_candidate, profondeur + 1) in echecs:
+                continue
+            operations += 1
+            if any(all(m & occupation_candidate for m in legaux[taille_suivante])
+                   for taille_suivante in tailles_suivantes):
+                continue  # Une taille de bateau n'a plus aucun placement possible
+            masques[profondeur] = masque
+            nouvelle_occupation = occupation_candidate
+            break
+        if nouvelle_occupation is None:
+            if candidats:  # Recherche interrompue
+                break
+            echecs.add((occupation_courante, profondeur))  # Aucun candidat ne mène à une solution
+            pile.pop()
+        elif profondeur + 1 == len(tailles):
+            reussite = True
+            break
+        else:
+            pile.append((nouvelle_occupation, list(legaux[tailles[profondeur + 1]]), set(tailles[profondeur + 2:])))
+    DERNIERE_RECHERCHE["impasses"] = len(echecs)
+    DERNIERE_RECHERCHE["interrompue"] = not reussite and bool(pile)
+    if reussite:
+        return masques
+    return None
+
+
+def _placer_par_case(taille_grille, tailles, occupation, generateur, operations_max):
+    """
+    Place les bateaux en parcourant les cases libres dans l'ordre.
+
+    Adapté aux grilles denses : la première case libre est soit couverte par un bateau commençant sur elle (il n'y a
+    que deux placements possibles par taille, vers la droite ou vers le bas), soit laissée vide si la marge le permet.
+    Avant d'explorer une situation, on vérifie que les lignes et les colonnes ont encore assez de place pour les bateaux
+    restants (voir "_capacite_suffisante"). Les situations sans issue sont mémorisées, ce qui rend la preuve
+    d'impossibilité rapide.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux à placer
+    :param occupation: masque des cases interdites
+    :param generateur: générateur de nombres aléatoires
+    :param operations_max: nombre maximum de situations explorées avant d'abandonner la recherche
+    :return: liste des masques des bateaux, dans l'ordre de "tailles", ou "None" si la flotte ne peut pas être placée
+             ou si la recherche a été interrompue
+    """
+    tout = (1 << taille_grille ** 2) - 1
+    tailles_distinctes = sorted(set(tailles))
+    placements_depuis = {}  # Placements dont la case de départ est donnée, par (case, taille), avec leur transposé
+    for taille in tailles_distinctes:
+        for masque in masques_placements(taille_grille, taille):
+            placements_depuis.setdefault(((masque & -masque).bit_length() - 1, taille), []).append(
+                (masque, _transposer(taille_grille, masque)))
+    echecs = set()
+    memoire = {}  # Nombre de places de chaque ligne, pour "_capacite_suffisante"
+    places = []  # Couples (taille, masque) des bateaux placés
+
+    def options_case(bloquees, restants, marge):
+        """
+        Liste les façons de traiter la première case libre : la couvrir par un bateau commençant sur elle, ou la
+        laisser vide.
+
+        :param bloquees: masque des cases occupées ou laissées vides
+        :param restants: tuple du nombre de bateaux restants pour chaque taille de "tailles_distinctes"
+        :param marge: nombre de cases libres pouvant encore être laissées vides
+        :return: liste de triplets (index de la taille ou "None" pour laisser la case vide, masque, masque transposé),
+                 la dernière option étant à essayer en premier
+        """
+        libres = tout & ~bloquees
+        case = (libres & -libres).bit_length() - 1  # première case libre
+        options = []
+        for i, taille in enumerate(tailles_distinctes):
+            if restants[i]:
+                for masque, transpose in placements_depuis.get((case, taille), ()):
+                    if not masque & bloquees:
+                        options.append((i, masque, transpose))
+        generateur.shuffle(options)
+        if marge > 0:
+            # On laisse la case vide avec une probabilité proportionnelle à la marge, pour ne pas entasser les bateaux
+            # dans le haut de la grille
+            ligne, colonne = divmod(case, taille_grille)
+            vide = (None, 1 << case, 1 << (colonne * taille_grille + ligne))
+            if generateur.random() * bin(libres).count("1") < marge:
+                options.append(vide)
+            else:
+                options.insert(0, vide)
+        return options
+
+    # Pile explicite plutôt que récursion : une grande flotte ne dépasse pas la limite de récursion. Chaque étage
+    # contient (cases bloquées, cases bloquées transposées, bateaux restants, marge, options restantes, booléen
+    # indiquant si on y est arrivé en plaçant un bateau)
+    restants = tuple(tailles.count(taille) for taille in tailles_distinctes)
+    marge = taille_grille ** 2 - bin(occupation).count("1") - sum(tailles)
+    pile = []
+    suivante = (occupation, _transposer(taille_grille, occupation), restants, marge, False)
+    reussite = False
+    operations = 0
+    while operations < operations_max:
+        if suivante is not None:
+            bloquees, bloquees_transposees, restants, marge, bateau_place = suivante
+            suivante = None
+            if not any(restants):
+                reussite = True
+                break
+            operations += 1
+            besoins = [(taille, restants[i]) for i, taille in reversed(list(enumerate(tailles_distinctes)))
+                       if restants[i] and taille > 1]
+            if (bloquees, restants) in echecs or not _capacite_suffisante(
+                    taille_grille, tout & ~bloquees, tout & ~bloquees_transposees, besoins, memoire):
+                echecs.add((bloquees, restants))
+                if bateau_place:
+                    places.pop()
+            else:
+                pile.append((bloquees, bloquees_transposees, restants, marge,
+                             options_case(bloquees, restants, marge), bateau_place))
+        if not pile:
+            break
+        bloquees, bloquees_transposees, restants, marge, options, bateau_place = pile[-1]
+        if options:
+            i, masque, transpose = options.pop()
+            if i is None:
+                suivante = (bloquees | masque, bloquees_transposees | transpose, restants, marge - 1, False)
+            else:
+                places.append((tailles_distinctes[i], masque))
+                suivante = (bloquees | masque, bloquees_transposees | transpose,
+                            restants[:i] + (restants[i] - 1,) + restants[i + 1:], marge, True)
+        else:
+            echecs.add((bloquees, restants))
+            pile.pop()
+            if bateau_place:
+                places.pop()
+    DERNIERE_RECHERCHE["impasses"] = len(echecs)
+    DERNIERE_RECHERCHE["interrompue"] = not reussite and bool(pile)
+    if not reussite:
+        return None
+    # On attribue les masques trouvés aux bateaux de la bonne taille, dans un ordre aléatoire
+    generateur.shuffle(places)
+    resultat = []
+    for taille in tailles:
+        for j, (taille_placee, masque) in enumerate(places):
+            if taille_placee == taille:
+                resultat.append(masque)
+                del places[j]
+                break
+    return resultat
+
+
+def _chercher(taille_grille, tailles, occupation, generateur, operations_max):
+    """
+    Cherche un placement de la flotte avec "_placer_par_case" si elle occupe plus de la moitié des cases libres, avec
+    "_placer_par_bateau" sinon, en plaçant les plus grands bateaux en premier.
+
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux à placer
+    :param occupation: masque des cases interdites
+    :param generateur: générateur de nombres aléatoires
+    :param operations_max: nombre maximum d'opérations de la recherche
+    :return: liste des masques des bateaux, dans l'ordre de "tailles", ou "None" si la flotte ne peut pas être placée
+             ou si la recherche a été interrompue
+    """
+    nombre_cases_libres = taille_grille ** 2 - bin(occupation).count("1")
+    if (nombre_cases_libres - sum(tailles)) * 2 < nombre_cases_libres:
+        return _placer_par_case(taille_grille, list(tailles), occupation, generateur, operations_max)
+
+    ordre = sorted(range(len(tailles)), key=lambda i: tailles[i], reverse=True)  # Les plus grands en premier
+    masques = _placer_par_bateau(taille_grille, [tailles[i] for i in ordre], occupation, generateur, operations_max)
+    if masques is None:
+        return None
+    resultat = [0] * len(tailles)
+    for profondeur, i in enumerate(ordre):
+        resultat[i] = masques[profondeur]
+    return resultat
+
+
+def placer_flotte(taille_grille, tailles, occupation=0, generateur=random):
+    """
+    Place une flotte de manière aléatoire sur une grille.
+
+    Sur une grille peu remplie, les bateaux sont tirés un par un parmi leurs placements légaux, du plus grand au plus
+    petit. Quand la flotte occupe plus de la moitié des cases libres, on cherche plutôt à couvrir les cases une par
+    une, ce qui reste rapide même quand la flotte remplit presque toute la grille ou ne peut pas y être placée. La
+    recherche est limitée à "OPERATIONS_MAX" opérations : si elle est interrompue sur une grille vide, on reprend le
+    placement trouvé par "flotte_placable", orienté au hasard (voir "_placer_par_solution"), ce qui garde un temps
+    borné sur les flottes denses. Au-delà de "TAILLE_MASQUES_MAX", voir "_placer_par_tirage" et
+    "placer_flotte_indices".
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: liste des tailles des bateaux à placer
+    :param occupation: masque des cases interdites, par ex. déjà occupées
+    :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+    :return: liste des masques des bateaux, dans le même ordre que "tailles", ou "None" si la flotte ne peut pas
+             être placée
+    """
+    DERNIERE_RECHERCHE["impasses"] = 0
+    DERNIERE_RECHERCHE["interrompue"] = False
+    nombre_cases_libres = taille_grille ** 2 - bin(occupation).count("1")
+    if sum(tailles) > nombre_cases_libres or any(taille > taille_grille for taille in tailles):
+        return None  # Inutile de chercher, les bateaux ne rentrent pas
+    if taille_grille > TAILLE_MASQUES_MAX:
+        placements = _placer_par_tirage(taille_grille, list(tailles), set(indices_masque(occupation)), generateur)
+        DERNIERE_RECHERCHE["interrompue"] = placements is None
+        masques = None if placements is None else [sum(1 << indice for indice in indices) for indices in placements]
+    else:
+        masques = _chercher(taille_grille, tailles, occupation, generateur, OPERATIONS_MAX)
+    if masques is None and DERNIERE_RECHERCHE["interrompue"] and not occupation:
+        masques = _placer_par_solution(taille_grille, list(tailles), generateur)
+    return masques
+
+
+def _masque_bateau(taille_grille, depart, taille_bateau, vertical):
+    """
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param depart: index de la première case du bateau
+    :param taille_bateau: nombre de cases du bateau
+    :param vertical: booléen indiquant si le bateau est vertical
+    :return: masque des cases du bateau
+    """
+    if not vertical:
+        return ((1 << taille_bateau) - 1) << depart
+    masque = 0
+    for i in range(taille_bateau):
+        masque |= 1 << (depart + i * taille_grille)
+    return masque
+
+
+def _indices_bateau(taille_grille, depart, taille_bateau, vertical):
+    """
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param depart: index de la première case du bateau
+    :param taille_bateau: nombre de cases du bateau
+    :param vertical: booléen indiquant si le bateau est vertical
+    :return: index des cases du bateau (objet "range")
+    """
+    pas = taille_grille if vertical else 1
+    return range(depart, depart + pas * taille_bateau, pas)
+
+
+def _placer_par_tirage(taille_grille, tailles, occupees, generateur):
+    """
+    Tire directement la position de chaque bateau, du plus grand au plus petit, avec un nombre d'essais limité.
+
+    Adapté aux grandes grilles, où les bateaux occupent une petite partie des cases : les placements possibles ne sont
+    pas construits, seules les cases occupées sont gardées dans un ensemble.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux à placer
+    :param occupees: ensemble des index des cases interdites, complété par les cases des bateaux placés
+    :param generateur: générateur de nombres aléatoires
+    :return: liste des index des cases (objets "range") de chaque bateau, dans l'ordre de "tailles", ou "None" si un
+             bateau n'a pas pu être placé
+    """
+    placements = [None] * len(tailles)
+    for numero in sorted(range(len(tailles)), key=lambda i: tailles[i], reverse=True):
+        taille_bateau = tailles[numero]
+        for essai in range(ESSAIS_PAR_BATEAU):
+            vertical = generateur.random() < 0.5
+            if vertical:
+                depart = generateur.randrange(taille_grille - taille_bateau + 1) * taille_grille \
+                         + generateur.randrange(taille_grille)
+            else:
+                depart = generateur.randrange(taille_grille) * taille_grille \
+                         + generateur.randrange(taille_grille - taille_bateau + 1)
+            indices = _indices_bateau(taille_grille, depart, taille_bateau, vertical)
+            if not any(indice in occupees for indice in indices):
+                occupees.update(indices)
+                placements[numero] = indices
+                break
+        else:
+            return None
+    return placements
+
+
+def placer_flotte_indices(taille_grille, tailles, generateur=random):
+    """
+    Place une flotte de manière aléatoire sur une grande grille vide, sans manipuler de masques.
+
+    Les bateaux sont tirés par "_placer_par_tirage" ; si les tirages échouent, on reprend le placement trouvé par
+    "flotte_placable" (voir "_placer_par_solution"). À utiliser au-delà de "TAILLE_MASQUES_MAX", où un masque de la
+    grille compte des millions de bits.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: liste des tailles des bateaux à placer
+    :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+    :return: liste des index des cases (objets "range") de chaque bateau, dans le même ordre que "tailles", ou "None"
+             si la flotte ne peut pas être placée
+    """
+    DERNIERE_RECHERCHE["impasses"] = 0
+    DERNIERE_RECHERCHE["interrompue"] = False
+    if sum(tailles) > taille_grille ** 2 or any(taille > taille_grille for taille in tailles):
+        return None  # Inutile de chercher, les bateaux ne rentrent pas
+    placements = _placer_par_tirage(taille_grille, list(tailles), set(), generateur)
+    if placements is None:
+        DERNIERE_RECHERCHE["interrompue"] = True
+        placements = _placer_par_solution(taille_grille, list(tailles), generateur, _indices_bateau)
+    return placements
+
+
+def _rangement(taille_grille, tailles):
+    """
+    Range les bateaux, du plus grand au plus petit, chacun dans le premier segment de ligne ou de colonne où il reste
+    assez de place.
+
+    Les segments sont d'abord les lignes entières de la grille. Si la flotte n'y rentre pas, on essaie des moulinets :
+    une bordure de "b" lignes et "b" colonnes est découpée en quatre blocs de segments de longueur "taille_grille - b",
+    alternativement horizontaux et verticaux, autour d'un carré central rangé par lignes. Un moulinet accueille ainsi
+    des bateaux de plus d'une demi-grille à la fois sur des lignes et sur des colonnes. C'est une heuristique : si elle
+    réussit, la flotte peut être placée, si elle échoue, on ne sait rien.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux
+    :return: liste des positions (ligne, colonne, booléen indiquant si le bateau est vertical) de chaque bateau, dans
+             l'ordre de "tailles", ou "None" si tous les bateaux n'ont pas pu être rangés
+    """
+    ordre = sorted(range(len(tailles)), key=lambda i: tailles[i], reverse=True)
+    for bordure in range(taille_grille // 2 + 1):
+        cote = taille_grille - bordure  # longueur des segments de la bordure
+        if bordure and (tailles[ordre[0]] > cote
+                        or sum(1 for taille in tailles if taille > cote - bordure) > 4 * bordure):
+            continue  # Les grands bateaux ne rentrent pas dans la bordure
+        # Segments [ligne, colonne, vertical, cases encore libres] : la bordure (vide si "bordure" vaut 0) en quatre
+        # blocs, puis les lignes du carré central
+        segments = [[ligne, 0, False, cote] for ligne in range(bordure)]
+        segments += [[0, colonne, True, cote] for colonne in range(cote, taille_grille)]
+        segments += [[ligne, bordure, False, cote] for ligne in range(cote, taille_grille)]
+        segments += [[bordure, colonne, True, cote] for colonne in range(bordure)]
+        segments += [[ligne, bordure, False, cote - bordure] for ligne in range(bordure, cote)]
+        positions = [None] * len(tailles)
+        for numero in ordre:
+            for segment in segments:
+                if segment[3] >= tailles[numero]:
+                    positions[numero] = (segment[0], segment[1], segment[2])
+                    segment[0 if segment[2] else 1] += tailles[numero]
+                    segment[3] -= tailles[numero]
+                    break
+            else:
+                break
+        else:
+            return positions
+    return None
+
+
+def _positions(taille_grille, tailles, masques):
+    """
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux
+    :param masques: masques des bateaux, dans l'ordre de "tailles"
+    :return: liste des positions (ligne, colonne, booléen indiquant si le bateau est vertical) de chaque bateau
+    """
+    positions = []
+    for taille, masque in zip(tailles, masques):
+        indices = indices_masque(masque)
+        ligne, colonne = divmod(indices[0], taille_grille)
+        positions.append((ligne, colonne, taille > 1 and indices[1] - indices[0] == taille_grille))
+    return positions
+
+
+def _placer_par_solution(taille_grille, tailles, generateur, construire=_masque_bateau):
+    """
+    Place la flotte comme dans le placement trouvé par "flotte_placable", transformé par une symétrie du carré tirée
+    au hasard, les bateaux de même taille échangeant leurs places au hasard.
+
+    C'est le dernier recours quand la recherche de "placer_flotte" est interrompue ou que les tirages de
+    "_placer_par_tirage" ont échoué : il réussit pour toute flotte acceptée par "flotte_placable".
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux à placer
+    :param generateur: générateur de nombres aléatoires
+    :param construire: fonction construisant un bateau à partir de (taille de la grille, index de la première case,
+                       taille du bateau, booléen indiquant si le bateau est vertical), "_masque_bateau" ou
+                       "_indices_bateau"
+    :return: liste des bateaux construits, dans l'ordre de "tailles", ou "None" si aucun placement n'est connu
+    """
+    if not flotte_placable(taille_grille, tailles):
+        return None
+    tailles_triees, positions = _PLACABLES[(taille_grille, tuple(sorted(tailles)))][1:]
+    transposer, inverser_lignes, inverser_colonnes = [generateur.random() < 0.5 for _ in range(3)]
+
+    def image(ligne, colonne):
+        """
+        :param ligne: index de la ligne d'une case
+        :param colonne: index de la colonne de la case
+        :return: couple (ligne, colonne) de l'image de la case par la symétrie tirée
+        """
+        if transposer:
+            ligne, colonne = colonne, ligne
+        if inverser_lignes:
+            ligne = taille_grille - 1 - ligne
+        if inverser_colonnes:
+            colonne = taille_grille - 1 - colonne
+        return ligne, colonne
+
+    par_taille = {}
+    for taille, (ligne, colonne, vertical) in zip(tailles_triees, positions):
+        debut = image(ligne, colonne)
+        fin = image(ligne + (taille - 1) * vertical, colonne + (taille - 1) * (not vertical))
+        depart = min(debut, fin)
+        par_taille.setdefault(taille, []).append(construire(
+            taille_grille, depart[0] * taille_grille + depart[1], taille, taille > 1 and debut[1] == fin[1]))
+    for bateaux in par_taille.values():
+        generateur.shuffle(bateaux)
+    return [par_taille[taille].pop() for taille in tailles]
+
+
+def flotte_placable(taille_grille, tailles):
+    """
+    Détermine si une flotte peut être placée sur une grille vide, à vérifier avant de commencer une partie.
+
+    Les cas les plus courants sont tranchés sans recherche : la flotte est trop grande (trop de cases, bateau plus long
+    que la grille, lignes et colonnes sans assez de place pour les grands bateaux, voir "_capacite_suffisante"), ou
+    elle peut être rangée par lignes ou en moulinet (voir "_rangement"). Sinon, on cherche un placement avec des
+    recherches de plus en plus longues, la dernière étant limitée à "OPERATIONS_PRECONTROLE_MAX" opérations : une
+    recherche terminée sans placement prouve l'impossibilité, un budget épuisé laisse la question ouverte. Au-delà de
+    "TAILLE_MASQUES_MAX", il n'y a pas de recherche. Le résultat et le placement trouvé (repris par
+    "_placer_par_solution") sont gardés en cache.
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux
+    :return: "True" si la flotte peut être placée, "False" si elle ne peut pas l'être, "None" si on ne sait pas
+    """
+    tailles_triees = tuple(sorted(tailles))
+    cle = (taille_grille, tailles_triees)
+    if cle not in _PLACABLES:
+        positions = None
+        if not tailles:
+            placable = True
+            positions = []
+        elif sum(tailles) > taille_grille ** 2 or tailles_triees[-1] > taille_grille or tailles_triees[0] < 1:
+            placable = False
+        else:
+            besoins = [(taille, tailles_triees.count(taille)) for taille in sorted(set(tailles_triees), reverse=True)
+                       if taille > 1]
+            positions = _rangement(taille_grille, tailles_triees)
+            tout = (1 << taille_grille ** 2) - 1 if positions is None else 0  # Masque de la grille, construit s'il sert
+            if positions is not None:
+                placable = True
+            elif not _capacite_suffisante(taille_grille, tout, tout, besoins, {}):
+                placable = False
+            elif taille_grille > TAILLE_MASQUES_MAX:
+                placable = None
+            else:
+                placable = None
+                operations, essai = OPERATIONS_MAX, 0
+                while placable is None and operations <= OPERATIONS_PRECONTROLE_MAX:
+                    masques = _chercher(taille_grille, tailles_triees, 0, random.Random(essai), operations)
+                    if masques is not None:
+                        placable = True
+                        positions = _positions(taille_grille, tailles_triees, masques)
+                    elif not DERNIERE_RECHERCHE["interrompue"]:
+                        placable = False
+                    operations, essai = operations * 2, essai + 1
+        _PLACABLES[cle] = (placable, tailles_triees, positions)
+    return _PLACABLES[cle][0]
+
+
+def est_placement_valide(taille_grille, taille_bateau, indices):
+    """
+    Détermine si des cases forment un placement légal d'un bateau : le bon nombre de cases, consécutives sur une même
+    ligne ou une même colonne de la grille.
+
+    :param taille_grille: nombre de cases d'un côté de la grille
+    :param taille_bateau: nombre de cases du bateau
+    :param indices: index des cases du bateau ("ligne * taille_grille + colonne"), dans n'importe quel ordre
+    :return: booléen valant "True" si le placement est légal
+    """
+    indices = sorted(indices)
+    if len(indices) != taille_bateau or taille_bateau == 0:
+        return False
+    if indices[0] < 0 or indices[-1] >= taille_grille ** 2:
+        return False
+    if indices == list(range(indices[0], indices[0] + taille_bateau)):  # Horizontal, sur une seule ligne
+        return indices[0] // taille_grille == indices[-1] // taille_grille
+    return indices == list(range(indices[0], indices[0] + taille_bateau * taille_grille, taille_grille))
+
+
+FLOTTES_LIMITES = [(40, [2] * 500), (45, [1] * 1200), (10, [2] * 50), (8, [8] * 16), (6, [3] * 12),
+                   (100, [100] * 100), (300, [5, 4, 3, 3, 2]), (702, [5, 4, 3, 3, 2])]  # Flottes nombreuses,
+# remplissant toute la grille ou sur de très grandes grilles, vérifiées en plus des flottes tirées au hasard
+FLOTTES_DENSES = [(9, [5] * 14), (12, [7] * 18), (14, [8] * 22), (20, [11] * 30),
+                  (10, [1, 2, 2, 2, 4, 7, 9, 10, 10, 10]), (63, [9] * 440), (64, [8] * 511),
+                  (65, [13] * 324)]  # Flottes remplissant presque toute la grille, dont le placement doit prendre
+# moins de "DUREE_DENSE_MAX", en particulier juste en dessous et au-dessus de "TAILLE_MASQUES_MAX"
+DUREE_DENSE_MAX = 0.5  # Durée maximale en secondes de "flotte_placable" puis de "placer_flotte" sur une flotte dense
+
+
+def verifier_flottes(flottes, generateur=random):
+    """
+    Vérifie que chaque flotte acceptée par "flotte_placable" est placée par "placer_flotte", avec des placements
+    légaux et sans chevauchement, et que chaque flotte refusée ne l'est pas. Une flotte dont "flotte_placable" ne sait
+    pas si elle peut être placée n'est pas vérifiée.
+
+    :param flottes: liste de couples (taille de la grille, tailles des bateaux)
+    :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+    :return: liste des couples (taille de la grille, tailles des bateaux) en défaut
+    """
+    defauts = []
+    for taille_grille, tailles in flottes:
+        masques = placer_flotte(taille_grille, tailles, generateur=generateur)
+        valide = masques is not None
+        if valide:
+            occupation = 0
+            for taille, masque in zip(tailles, masques):
+                if masque & occupation or not est_placement_valide(taille_grille, taille, indices_masque(masque)):
+                    valide = False
+                occupation |= masque
+        placable = flotte_placable(taille_grille, tailles)
+        if placable is not None and valide != placable:
+            defauts.append((taille_grille, tailles))
+    return defauts
+
+
+def verifier_durees(flottes, duree_max, generateur=random):
+    """
+    Vérifie que "flotte_placable" accepte chaque flotte, puis que "flotte_placable" et "placer_flotte" se terminent
+    chacun en moins de "duree_max" secondes, caches vidés.
+
+    :param flottes: liste de couples (taille de la grille, tailles des bateaux) pouvant être placées
+    :param duree_max: durée maximale en secondes
+    :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+    :return: liste des triplets (taille de la grille, nombre de bateaux, durée la plus longue) en défaut
+    """
+    defauts = []
+    for taille_grille, tailles in flottes:
+        _PLACABLES.clear()
+        debut = time.perf_counter()
+        placable = flotte_placable(taille_grille, tailles)
+        duree = time.perf_counter() - debut
+        _PLACABLES.clear()
+        debut = time.perf_counter()
+        place = placer_flotte(taille_grille, tailles, generateur=generateur) is not None
+        duree = max(duree, time.perf_counter() - debut)
+        if not placable or not place or duree > duree_max:
+            defauts.append((taille_grille, len(tailles), duree))
+    return defauts
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : vérifie le placement des flottes limites et de flottes tirées au hasard, puis
+    la durée du placement des flottes denses.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Vérification du placement des flottes.")
+    parser.add_argument("-n", "--flottes", type=int, default=1000, help="nombre de flottes tirées au hasard")
+    parser.add_argument("-t", "--taille", type=int, default=8, help="taille maximale de la grille")
+    parser.add_argument("--graine", type=int, default=0, help="graine du générateur aléatoire")
+    arguments = parser.parse_args()
+
+    generateur = random.Random(arguments.graine)
+    flottes = list(FLOTTES_LIMITES)
+    for _ in range(arguments.flottes):
+        taille_grille = generateur.randint(1, arguments.taille)
+        flottes.append((taille_grille, [generateur.randint(1, taille_grille)
+                                        for _ in range(generateur.randint(0, taille_grille))]))
+    defauts = verifier_flottes(flottes, generateur)
+    for taille_grille, tailles in defauts:
+        print("Flotte en défaut sur une grille de taille {0} : {1}".format(taille_grille, tailles))
+    print("{0} flottes vérifiées, {1} en défaut".format(len(flottes), len(defauts)))
+    lentes = verifier_durees(FLOTTES_DENSES, DUREE_DENSE_MAX, generateur)
+    for taille_grille, nombre, duree in lentes:
+        print("Flotte dense en défaut sur une grille de taille {0} ({1} bateaux) : {2:.3f} s".format(
+            taille_grille, nombre, duree))
+    print("{0} flottes denses vérifiées, {1} en défaut".format(len(FLOTTES_DENSES), len(lentes)))
+    if defauts or lentes:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+# coding: utf-8
+"""
+Module contenant un serveur de bataille navale en TCP, qui héberge une partie par connexion.
+
+Le protocole est ligne par ligne, en UTF-8. À la connexion, le serveur envoie "BIENVENUE <taille> <nombre de
+bateaux>". Le client envoie ensuite des commandes, chacune recevant une ligne de réponse :
+    - des coordonnées (ex : "B7") : le serveur tire sur la case avec "tirer" et répond par le nom de l'état de la case
+      ("DANS_L_EAU", "TOUCHE" ou "COULE", voir "Etat") suivi des coordonnées des cases modifiées, puis " GAGNE
+      <nombre de tirs>" si tous les bateaux sont coulés. Il répond "DEJA_TIRE" si la case a déjà reçu un tir et
+      "ERREUR" si les coordonnées ne sont pas valides ;
+    - "NOUVELLE" : replace les bateaux pour une nouvelle partie et répond "BIENVENUE ..." ;
+    - "STATS" : répond "STATS <sessions> <requêtes> <p50> <p90> <p99>", les latences étant en microsecondes ;
+    - "QUITTER" : ferme la connexion.
+
+Chaque session utilise une grille compacte ("binaire" par défaut), dont la mémoire ne dépend que de la taille de la
+grille : des milliers de sessions tiennent dans un seul processus.
+
+Exemples : python serveur.py serveur --port 5000
+           python serveur.py charge --port 5000 -c 1000
+           python serveur.py test -c 1000 (serveur et clients dans le même processus)
+           python serveur.py test -c 100 --journal parties.bnj (parties enregistrées, puis rejouées et vérifiées)
+"""
+from __future__ import print_function
+
+import argparse
+import asyncio
+import collections
+import io
+import random
+import time
+
+from case import Etat, Grille
+from journal import EcrivainJournal, rejouer_journal
+from simulation import MOTEURS
+import batailleNavale
+
+LONGUEUR_MAX_LIGNE = 64  # Les lignes plus longues ferment la connexion, ce qui borne la mémoire par session
+
+
+def centiles(valeurs, rangs=(50, 90, 99)):
+    """
+    Calcule des centiles.
+
+    :param valeurs: liste de nombres
+    :param rangs: centiles voulus, entre 0 et 100
+    :return: liste des centiles, dans l'ordre de "rangs", ou de "None" si "valeurs" est vide
+    """
+    if not valeurs:
+        return [None] * len(rangs)
+    triees = sorted(valeurs)
+    return [triees[min(len(triees) - 1, int(len(triees) * rang / 100.0))] for rang in rangs]
+
+
+class Session:
+    """
+    Partie jouée par une connexion.
+
+    Si le serveur enregistre les parties, chaque partie est d'abord écrite dans un journal en mémoire, puis ajoutée
+    d'un seul bloc au fichier du serveur quand elle se termine : les parties des sessions simultanées ne sont ainsi
+    jamais mélangées dans le fichier.
+    """
+    __slots__ = ("grille", "generateur", "nombre_de_tirs", "fichier_journal", "_octets_journal", "_journal")
+
+    def __init__(self, moteur, taille, generateur, fichier_journal=None):
+        """
+        constructeur de la classe "Session"
+
+        :param moteur: nom du moteur de grille (clé de "simulation.MOTEURS")
+        :param taille: nombre de cases d'un côté de la grille
+        :param generateur: générateur de nombres aléatoires de la session
+        :param fichier_journal: fichier binaire, partagé par toutes les sessions, à la fin duquel enregistrer les
+                                parties (voir "journal"), "None" pour ne pas les enregistrer
+        """
+        self.grille = MOTEURS[moteur](batailleNavale.creer_bateaux(), taille)
+        self.generateur = generateur
+        self.nombre_de_tirs = 0
+        self.fichier_journal = fichier_journal
+        self._octets_journal = None  # Partie en cours, écrite en mémoire
+        self._journal = None  # "EcrivainJournal" de la partie en cours, "None" hors d'une partie enregistrée
+
+    def nouvelle_partie(self):
+        """
+        Place les bateaux pour une nouvelle partie.
+
+        :return: ligne de bienvenue, "ERREUR" si les bateaux ne rentrent pas dans la grille
+        """
+        self.terminer_partie()
+        self.nombre_de_tirs = 0
+        if not self.grille.placer_bateaux(self.generateur):
+            return "ERREUR"
+        if self.fichier_journal is not None:
+            self._octets_journal = io.BytesIO()
+            self._journal = EcrivainJournal(self._octets_journal)
+            self._journal.commencer_partie(self.grille)
+        return "BIENVENUE {0} {1}".format(self.grille.taille(), len(self.grille.bateaux))
+
+    def terminer_partie(self):
+        """
+        Ajoute la partie en cours, même inachevée, au fichier du journal. Ne fait rien si aucune partie enregistrée
+        n'est en cours.
+
+        :return: pas de retour
+        """
+        if self._journal is None:
+            return
+        self._journal.terminer_partie()
+        self.fichier_journal.write(self._octets_journal.getvalue())
+        self._journal = None
+        self._octets_journal = None
+
+    def tirer(self, coordonnees):
+        """
+        Tire sur une case et construit la réponse du protocole.
+
+        :param coordonnees: coordonnées de la bataille navale envoyées par le client
+        :return: ligne de réponse
+        """
+        etat, cases = self.grille.tirer(coordonnees)
+        if self._journal is not None and etat is not False:  # Les coordonnées invalides ne sont pas des tirs
+            self._journal.enregistrer_tir(self.grille.indice_coordonnees(coordonnees), etat)
+        if etat is None:
+            return "DEJA_TIRE"
+        if etat not in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
+            return "ERREUR"
+        self.nombre_de_tirs += 1
+        reponse = " ".join([etat.name] + [self.grille.index_vers_coord_bataille(case.index) for case in cases])
+        if etat == Etat.COULE and self.grille.flotte_coulee():
+            reponse += " GAGNE {0}".format(self.nombre_de_tirs)
+            self.terminer_partie()
+        return reponse
+
+
+class Serveur:
+    """
+    Serveur hébergeant une session par connexion.
+
+    Les latences (du moment où une ligne est reçue jusqu'à l'écriture de la réponse) sont gardées dans une file de
+    longueur limitée, ce qui borne la mémoire quelle que soit la durée de vie du serveur.
+    """
+    NOMBRE_LATENCES = 100000
+    CONNEXIONS_EN_ATTENTE = 4096  # Permet à des milliers de clients de se connecter en même temps
+
+    def __init__(self, moteur="binaire", taille=10, graine=None, fichier_journal=None):
+        """
+        constructeur de la classe "Serveur"
+
+        :param moteur: nom du moteur de grille des sessions (clé de "simulation.MOTEURS")
+        :param taille: nombre de cases d'un côté des grilles
+        :param graine: graine des générateurs aléatoires des sessions, "None" pour des parties imprévisibles
+        :param fichier_journal: fichier binaire ouvert en écriture à la fin duquel enregistrer les parties de toutes
+                                les sessions, "None" pour ne pas les enregistrer
+        """
+        self.moteur = moteur
+        self.taille = taille
+        self.fichier_journal = fichier_journal
+        self._generateur = random.Random(graine)
+        self.nombre_sessions = 0
+        self.nombre_requetes = 0
+        self.latences = collections.deque(maxlen=self.NOMBRE_LATENCES)  # en secondes
+        self._serveur = None
+
+    async def demarrer(self, hote="127.0.0.1", port=5000):
+        """
+        Commence à accepter les connexions.
+
+        :param hote: adresse sur laquelle écouter
+        :param port: port sur lequel écouter, 0 pour laisser le système en choisir un
+        :return: port utilisé
+        """
+        self._serveur = await asyncio.start_server(self._gerer_connexion, hote, port, limit=LONGUEUR_MAX_LIGNE,
+                                                    backlog=self.CONNEXIONS_EN_ATTENTE)
+        return self._serveur.sockets[0].getsockname()[1]
+
+    async def arreter(self):
+        """
+        Arrête d'accepter les connexions.
+
+        :return: pas de retour
+        """
+        self._serveur.close()
+        await self._serveur.wait_closed()
+
+    def statistiques(self):
+        """
+        :return: ligne "STATS" du protocole
+        """
+        p50, p90, p99 = centiles(self.latences)
+        return "STATS {0} {1} {2} {3} {4}".format(self.nombre_sessions, self.nombre_requetes,
+                                                  *(0 if p is None else int(p * 1e6) for p in (p50, p90, p99)))
+
+    def repondre(self, session, ligne):
+        """
+        Traite une commande du protocole.
+
+        :param session: session de la connexion
+        :param ligne: ligne reçue, sans le retour à la ligne
+        :return: ligne de réponse, "None" pour fermer la connexion
+        """
+        commande = ligne.strip().upper()
+        if commande == "QUITTER":
+            return None
+        if commande == "NOUVELLE":
+            return session.nouvelle_partie()
+        if commande == "STATS":
+            return self.statistiques()
+        return session.tirer(commande)
+
+    async def _gerer_connexion(self, lecteur, ecrivain):
+        """
+        Joue une session avec un client, jusqu'à ce qu'il se déconnecte.
+
+        :param lecteur: flux de lecture de la connexion
+        :param ecrivain: flux d'écriture de la connexion
+        :return: pas de retour
+        """
+        session = Session(self.moteur, self.taille, random.Random(self._generateur.getrandbits(64)),
+                          self.fichier_journal)
+        self.nombre_sessions += 1
+        try:
+            ecrivain.write((session.nouvelle_partie() + "\n").encode())
+            while True:
+                try:
+                    ligne = await lecteur.readline()
+                except (ValueError, asyncio.LimitOverrunError):  # Ligne trop longue
+                    break
+                if not ligne:  # Le client s'est déconnecté
+                    break
+                debut = time.perf_counter()
+                reponse = self.repondre(session, ligne.decode("utf-8", "replace"))
+                if reponse is None:
+                    break
+                ecrivain.write((reponse + "\n").encode())
+                self.nombre_requetes += 1
+                self.latences.append(time.perf_counter() - debut)
+                await ecrivain.drain()
+        except ConnectionError:
+            pass
+        finally:
+            session.terminer_partie()  # Une partie abandonnée est enregistrée jusqu'au dernier tir
+            self.nombre_sessions -= 1
+            ecrivain.close()
+
+
+async def jouer_client(hote, port, generateur, latences, parties=1):
+    """
+    Client de test : joue des parties en tirant au hasard sur les cases non visées.
+
+    :param hote: adresse du serveur
+    :param port: port du serveur
+    :param generateur: générateur de nombres aléatoires du client
+    :param latences: liste à laquelle ajouter la durée de chaque aller-retour, en secondes
+    :param parties: nombre de parties à jouer
+    :return: nombre total de tirs
+    """
+    lecteur, ecrivain = await asyncio.open_connection(hote, port)
+    bienvenue = (await lecteur.readline()).decode().split()
+    taille = int(bienvenue[1])
+    nombre_de_tirs = 0
+    for partie in range(parties):
+        if partie > 0:
+            ecrivain.write(b"NOUVELLE\n")
+            await lecteur.readline()
+        cases = [(x, y) for x in range(taille) for y in range(taille)]
+        generateur.shuffle(cases)
+        for x, y in cases:
+            debut = time.perf_counter()
+            ecrivain.write((Grille.index_vers_coord_bataille((x, y)) + "\n").encode())
+            reponse = (await lecteur.readline()).decode()
+            latences.append(time.perf_counter() - debut)
+            nombre_de_tirs += 1
+            if " GAGNE " in reponse:
+                break
+    ecrivain.write(b"QUITTER\n")
+    ecrivain.close()
+    return nombre_de_tirs
+
+
+async def charge(hote, port, clients, parties=1, graine=0):
+    """
+    Lance des clients de test en parallèle et mesure les latences vues par les clients.
+
+    :param hote: adresse du serveur
+    :param port: port du serveur
+    :param clients: nombre de clients connectés en même temps
+    :param parties: nombre de parties par client
+    :param graine: graine des générateurs aléatoires des clients
+    :return: tuple (liste des latences en secondes, nombre total de tirs, durée totale en secondes)
+    """
+    latences = []
+    debut = time.perf_counter()
+    tirs = await asyncio.gather(*(jouer_client(hote, port, random.Random("{0}:{1}".format(graine, i)), latences,
+                                               parties) for i in range(clients)))
+    return latences, sum(tirs), time.perf_counter() - debut
+
+
+def afficher_charge(latences, tirs, duree, clients):
+    """
+    Affiche le résultat d'un test de charge.
+
+    :param latences: liste des latences en secondes
+    :param tirs: nombre total de tirs
+    :param duree: durée du test en secondes
+    :param clients: nombre de clients
+    :return: pas de retour
+    """
+    p50, p90, p99 = centiles(latences)
+    print("{0} clients, {1} tirs en {2:.2f} s, {3:.0f} tirs/s".format(clients, tirs, duree, tirs / duree))
+    print("Latence aller-retour : p50 {0:.0f} µs, p90 {1:.0f} µs, p99 {2:.0f} µs".format(
+        p50 * 1e6, p90 * 1e6, p99 * 1e6))
+
+
+def verifier_journal(chemin, moteur="binaire"):
+    """
+    Rejoue les parties d'un journal enregistré par le serveur et vérifie que chaque tir donne le même résultat.
+
+    :param chemin: chemin du journal
+    :param moteur: nom du moteur de grille utilisé pour rejouer (clé de "simulation.MOTEURS")
+    :return: tuple (nombre de parties rejouées, nombre de parties divergentes)
+    """
+    nombre_parties = 0
+    nombre_divergences = 0
+    with open(chemin, "rb") as fichier:
+        for numero, partie, divergence in rejouer_journal(fichier, MOTEURS[moteur]):
+            nombre_parties += 1
+            if divergence is not None:
+                nombre_divergences += 1
+    return nombre_parties, nombre_divergences
+
+
+def main():
+    """
+    Point d'entrée du serveur et du client de test en ligne de commande.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Serveur de bataille navale en TCP et client de test.")
+    parser.add_argument("action", choices=("serveur", "charge", "test"),
+                        help="lancer le serveur, un test de charge sur un serveur lancé, ou les deux à la fois")
+    parser.add_argument("--hote", default="127.0.0.1", help="adresse du serveur")
+    parser.add_argument("--port", type=int, default=5000, help="port du serveur")
+    parser.add_argument("-t", "--taille", type=int, default=10, help="taille des grilles")
+    parser.add_argument("-m", "--moteur", choices=sorted(MOTEURS), default="binaire", help="moteur de grille")
+    parser.add_argument("-c", "--clients", type=int, default=100, help="nombre de clients du test de charge "
+                                                                        "(limité par le nombre de fichiers ouverts, "
+                                                                        "voir \"ulimit -n\")")
+    parser.add_argument("--parties", type=int, default=1, help="nombre de parties par client")
+    parser.add_argument("--journal", default=None, help="fichier à la fin duquel enregistrer les parties des "
+                                                        "sessions ; avec \"test\", elles sont ensuite rejouées et "
+                                                        "vérifiées")
+    arguments = parser.parse_args()
+    fichier_journal = open(arguments.journal, "ab") if arguments.journal and arguments.action != "charge" else None
+
+    async def lancer():
+        if arguments.action == "charge":
+            afficher_charge(*await charge(arguments.hote, arguments.port, arguments.clients, arguments.parties),
+                            clients=arguments.clients)
+            return
+        serveur = Serveur(arguments.moteur, arguments.taille, fichier_journal=fichier_journal)
+        port = await serveur.demarrer(arguments.hote, 0 if arguments.action == "test" else arguments.port)
+        if arguments.action == "serveur":
+            print("Serveur à l'écoute sur {0}:{1}".format(arguments.hote, port))
+            while True:
+                await asyncio.sleep(10)
+                print(serveur.statistiques())
+        afficher_charge(*await charge(arguments.hote, port, arguments.clients, arguments.parties),
+                        clients=arguments.clients)
+        print("Côté serveur : " + serveur.statistiques())
+        await serveur.arreter()
+
+    try:
+        asyncio.run(lancer())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if fichier_journal is not None:
+            fichier_journal.close()
+    if fichier_journal is not None and arguments.action == "test":
+        nombre_parties, nombre_divergences = verifier_journal(arguments.journal, arguments.moteur)
+        print("Journal : {0} parties rejouées, {1} divergentes".format(nombre_parties, nombre_divergences))
+        if nombre_divergences:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
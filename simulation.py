@@ -0,0 +1,197 @@
+# coding: utf-8
+"""
+Module de simulation de parties de bataille navale sans affichage.
+
+Les parties sont jouées par une stratégie de tir, sans jamais utiliser "turtle" ni "Afficheur". Elles sont réparties
+par lots sur plusieurs processus, chaque lot ayant son propre générateur aléatoire dont la graine ne dépend que de la
+graine de la simulation et du numéro du lot, ce qui rend les résultats reproductibles quel que soit le nombre de
+processus.
+
+Exemple : python simulation.py -n 100000 -t 10 -s densite -p 4
+"""
+from __future__ import print_function
+
+import argparse
+import io
+import multiprocessing
+import random
+import time
+
+from case import Etat, Grille
+from grillebinaire import GrilleBinaire
+from grillecreuse import GrilleCreuse
+from placement import indices_masque
+from strategie import StrategieAleatoire, StrategieChasseCible
+from ia import StrategieDensite
+from montecarlo import StrategieMonteCarlo
+from solveur import StrategieSolveur
+from journal import EcrivainJournal
+import batailleNavale
+
+MOTEURS = {"grille": Grille, "binaire": GrilleBinaire, "creuse": GrilleCreuse}
+try:
+    from grillenumpy import GrilleNumpy
+    MOTEURS["numpy"] = GrilleNumpy
+except ImportError:  # NumPy n'est pas installé, le moteur correspondant n'est simplement pas proposé
+    pass
+STRATEGIES = {StrategieAleatoire.NOM: StrategieAleatoire, StrategieChasseCible.NOM: StrategieChasseCible,
+              StrategieDensite.NOM: StrategieDensite, StrategieMonteCarlo.NOM: StrategieMonteCarlo,
+              StrategieSolveur.NOM: StrategieSolveur}
+
+
+def jouer_partie(grille, strategie, journal=None):
+    """
+    Joue une partie complète sur une grille dont les bateaux sont déjà placés.
+
+    :param grille: grille de jeu ("Grille" ou "GrilleBinaire")
+    :param strategie: stratégie choisissant les tirs
+    :param journal: "EcrivainJournal" dans lequel enregistrer la partie, "None" pour ne pas l'enregistrer
+    :return: nombre de tirs nécessaires pour couler tous les bateaux
+    """
+    taille = grille.taille()
+    nombre_de_tirs = 0
+    if journal is not None:
+        journal.commencer_partie(grille)
+    if isinstance(grille, GrilleBinaire):  # Chemin rapide, sans créer de vues sur les cases
+        while not grille.flotte_coulee():
+            indice = strategie.choisir_tir()
+            etat, masque = grille.tirer_masque(indice)
+            if journal is not None:
+                journal.enregistrer_tir(indice, etat)
+            if etat is not None:
+                nombre_de_tirs += 1
+                strategie.observer(indice, etat, indices_masque(masque))
+    else:
+        while not grille.flotte_coulee():
+            indice = strategie.choisir_tir()
+            etat, cases = grille.tirer((indice % taille, indice // taille))
+            if journal is not None:
+                journal.enregistrer_tir(indice, etat)
+            if etat in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
+                nombre_de_tirs += 1
+                strategie.observer(indice, etat, [case.index[1] * taille + case.index[0] for case in cases])
+    if journal is not None:
+        journal.terminer_partie()
+    return nombre_de_tirs
+
+
+def graine_lot(graine, numero_lot):
+    """
+    Calcule la graine du générateur aléatoire d'un lot.
+
+    :param graine: graine de la simulation
+    :param numero_lot: numéro du lot
+    :return: graine du lot
+    """
+    return "{0}:{1}".format(graine, numero_lot)
+
+
+def simuler_lot(parametres):
+    """
+    Simule un lot de parties. Cette fonction est exécutée dans les processus de calcul.
+
+    :param parametres: tuple (nom du moteur, nom de la stratégie, taille de la grille, nombre de parties, graine du
+                       simulateur, numéro du lot, booléen indiquant s'il faut enregistrer les parties)
+    :return: tuple (numéro du lot, liste du nombre de tirs de chaque partie, durée du lot en secondes, journal des
+             parties du lot en "bytes" ou "None")
+    """
+    moteur, nom_strategie, taille, nombre_parties, graine, numero_lot, enregistrer = parametres
+    debut = time.time()
+    generateur = random.Random(graine_lot(graine, numero_lot))
+    bateaux = batailleNavale.creer_bateaux()
+    tailles_bateaux = [bateau.TAILLE for bateau in bateaux]
+    grille = MOTEURS[moteur](bateaux, taille)
+    classe_strategie = STRATEGIES[nom_strategie]
+    tirs = []
+    octets = io.BytesIO() if enregistrer else None
+    journal = EcrivainJournal(octets) if enregistrer else None
+    for i in range(nombre_parties):
+        if not grille.placer_bateaux(generateur):
+            raise ValueError("Impossible de placer les bateaux sur une grille de taille {0}".format(taille))
+        tirs.append(jouer_partie(grille, classe_strategie(taille, tailles_bateaux, generateur), journal))
+    return numero_lot, tirs, time.time() - debut, octets.getvalue() if enregistrer else None
+
+
+def simuler(nombre_parties, taille=10, strategie=StrategieAleatoire.NOM, moteur="binaire", processus=None,
+            taille_lot=500, graine=0, enregistrer=False):
+    """
+    Simule des parties et renvoie les résultats au fur et à mesure qu'ils sont calculés.
+
+    :param nombre_parties: nombre total de parties à jouer
+    :param taille: nombre de cases d'un côté de la grille
+    :param strategie: nom de la stratégie de tir (clé de "STRATEGIES")
+    :param moteur: nom du moteur de grille (clé de "MOTEURS")
+    :param processus: nombre de processus de calcul, par défaut le nombre de cœurs
+    :param taille_lot: nombre de parties par lot envoyé à un processus
+    :param graine: graine de la simulation
+    :param enregistrer: booléen indiquant s'il faut enregistrer les parties dans un journal (voir "journal")
+    :return: générateur de tuples (numéro du lot, liste du nombre de tirs de chaque partie, durée du lot, journal des
+             parties du lot en "bytes" ou "None")
+    """
+    lots = []
+    numero_lot = 0
+    while numero_lot * taille_lot < nombre_parties:
+        nombre = min(taille_lot, nombre_parties - numero_lot * taille_lot)
+        lots.append((moteur, strategie, taille, nombre, graine, numero_lot, enregistrer))
+        numero_lot += 1
+    if processus is None:
+        processus = multiprocessing.cpu_count()
+
+    if processus <= 1:  # Pas besoin de processus supplémentaires
+        for lot in lots:
+            yield simuler_lot(lot)
+    else:
+        pool = multiprocessing.Pool(processus)
+        try:
+            for resultat in pool.imap_unordered(simuler_lot, lots):
+                yield resultat
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def main():
+    """
+    Point d'entrée de la simulation en ligne de commande.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Simulation de parties de bataille navale sans affichage.")
+    parser.add_argument("-n", "--parties", type=int, default=10000, help="nombre de parties à jouer")
+    parser.add_argument("-t", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("-s", "--strategie", choices=sorted(STRATEGIES), default=StrategieAleatoire.NOM,
+                        help="stratégie de tir")
+    parser.add_argument("-m", "--moteur", choices=sorted(MOTEURS), default="binaire", help="moteur de grille")
+    parser.add_argument("-p", "--processus", type=int, default=None, help="nombre de processus (défaut : nombre de "
+                                                                           "cœurs)")
+    parser.add_argument("--lot", type=int, default=500, help="nombre de parties par lot")
+    parser.add_argument("--graine", type=int, default=0, help="graine des générateurs aléatoires")
+    parser.add_argument("--journal", default=None, help="fichier à la fin duquel enregistrer les parties")
+    arguments = parser.parse_args()
+
+    debut = time.time()
+    nombre_parties = 0
+    nombre_tirs = 0
+    fichier_journal = open(arguments.journal, "ab") if arguments.journal else None
+    for numero_lot, tirs, duree, journal in simuler(arguments.parties, arguments.taille, arguments.strategie,
+                                                    arguments.moteur, arguments.processus, arguments.lot,
+                                                    arguments.graine, fichier_journal is not None):
+        if fichier_journal is not None:
+            fichier_journal.write(journal)
+        nombre_parties += len(tirs)
+        nombre_tirs += sum(tirs)
+        ecoule = time.time() - debut
+        print("\r{0}/{1} parties, {2:.0f} parties/s, {3:.0f} tirs/s".format(
+            nombre_parties, arguments.parties, nombre_parties / ecoule, nombre_tirs / ecoule), end="")
+    ecoule = time.time() - debut
+    if fichier_journal is not None:
+        fichier_journal.close()
+    print()
+    print("Parties jouées : {0} en {1:.2f} s".format(nombre_parties, ecoule))
+    print("Parties par seconde : {0:.0f}".format(nombre_parties / ecoule))
+    print("Tirs par seconde : {0:.0f}".format(nombre_tirs / ecoule))
+    print("Nombre moyen de tirs par partie : {0:.2f}".format(nombre_tirs / float(nombre_parties)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# coding: utf-8
+"""
+Module contenant un solveur exact de fin de partie, qui compte toutes les flottes compatibles avec les tirs observés.
+
+Les placements sont des masques binaires sur les cases de la grille (voir "placement"). Les contraintes sont
+propagées pendant la recherche : les cases dans l'eau et les bateaux coulés excluent tous les placements qui les
+couvrent, un placement entièrement touché est exclu (le bateau serait coulé), et la première case touchée non couverte
+doit l'être par l'un des bateaux restants, ce qui limite le choix à quelques placements. Les situations déjà
+rencontrées (bateaux restants, cases occupées) sont mémorisées : chacune n'est comptée qu'une fois.
+
+Le nombre de flottes passant par chaque case donne la probabilité exacte qu'elle contienne un bateau, toutes les
+flottes compatibles étant équiprobables. "StrategieSolveur" tire sur la case la plus probable quand la recherche est
+assez petite pour tenir en quelques millisecondes, et utilise les tirages de "StrategieMonteCarlo" sinon.
+
+Exemple : python solveur.py -n 20
+"""
+from __future__ import print_function
+
+import argparse
+import random
+import time
+
+from montecarlo import StrategieMonteCarlo, fermer_pool, placements_legaux
+from placement import indices_masque
+
+ESPACE_MAX = 10 ** 4  # Majorant du nombre de flottes au-delà duquel on ne cherche pas (voir "taille_espace")
+OPERATIONS_MAX = 20000  # Placements examinés au-delà desquels la recherche est abandonnée (environ 10 ms)
+FIN = ((), -1)  # Situation commune à toutes les flottes complètes
+
+
+class _RechercheTropLongue(Exception):
+    """
+    Levée quand la recherche dépasse "OPERATIONS_MAX".
+    """
+    pass
+
+
+def taille_espace(legaux, tailles):
+    """
+    Majore le nombre de flottes à examiner, sans tenir compte des collisions entre bateaux.
+
+    :param legaux: placements possibles par taille, voir "placements_legaux"
+    :param tailles: tailles des bateaux restants
+    :return: produit du nombre de placements possibles de chaque bateau
+    """
+    espace = 1
+    for taille_bateau in tailles:
+        espace *= len(legaux[taille_bateau])
+    return espace
+
+
+def compter_flottes(taille, tailles, interdites, touches, operations_max=OPERATIONS_MAX):
+    """
+    Compte exactement les flottes compatibles avec les tirs, et combien passent par chaque case.
+
+    Les bateaux sont considérés comme distincts, même quand ils ont la même taille : cela multiplie tous les comptes
+    par le même facteur et ne change donc pas les probabilités.
+    :param taille: nombre de cases d'un côté de la grille
+    :param tailles: tailles des bateaux restants
+    :param interdites: masque des cases dans l'eau ou coulées
+    :param touches: masque des cases touchées des bateaux restants
+    :param operations_max: nombre de placements examinés au-delà duquel la recherche est abandonnée
+    :return: tuple (nombre de flottes, liste du nombre de flottes couvrant chaque case non visée), ou "None" si la
+             recherche est trop longue
+    """
+    legaux = placements_legaux(taille, tailles, interdites, touches)
+    couvrant = {}  # Placements possibles contenant une case touchée, par (case, taille)
+    for case in indices_masque(touches):
+        for taille_bateau, masques in legaux.items():
+            couvrant[(case, taille_bateau)] = [masque for masque in masques if masque >> case & 1]
+    nombres = {FIN: 1}  # (tailles restantes, occupation) -> nombre de façons de placer les bateaux restants
+    enfants = {}  # (tailles restantes, occupation) -> liste de (multiplicité, masque, situation suivante)
+    operations = [0]
+
+    def explorer(restantes, occupation):
+        """
+        Compte les façons de placer les bateaux restants.
+
+        :param restantes: tuple des tailles des bateaux restants, décroissantes
+        :param occupation: masque des cases occupées par les bateaux déjà placés
+        :return: nombre de façons de placer les bateaux restants
+        """
+        cle = (restantes, occupation)
+        if cle in nombres:
+            return nombres[cle]
+        a_couvrir = touches & ~occupation
+        suivantes = []
+        total = 0
+        if not restantes:
+            total = 0 if a_couvrir else 1
+        elif bin(a_couvrir).count("1") <= sum(restantes):
+            if a_couvrir:  # La première case touchée non couverte doit l'être par un des bateaux restants
+                case = (a_couvrir & -a_couvrir).bit_length() - 1
+                choix = []
+                for taille_bateau in sorted(set(restantes), reverse=True):
+                    i = restantes.index(taille_bateau)
+                    choix.append((restantes.count(taille_bateau), restantes[:i] + restantes[i + 1:],
+                                  couvrant[(case, taille_bateau)]))
+            else:  # Toutes les cases touchées sont couvertes, le plus grand bateau restant va n'importe où
+                choix = [(1, restantes[1:], legaux[restantes[0]])]
+            for multiplicite, reste, masques in choix:
+                operations[0] += len(masques)
+                if operations[0] > operations_max:
+                    raise _RechercheTropLongue()
+                for masque in masques:
+                    if not masque & occupation:
+                        if reste:
+                            suivante = (reste, occupation | masque)
+                            nombre = explorer(*suivante)
+                        else:  # Dernier bateau : inutile de mémoriser la situation finale
+                            suivante = FIN
+                            nombre = 0 if a_couvrir & ~masque else 1
+                        if nombre:
+                            suivantes.append((multiplicite, masque, suivante))
+                            total += multiplicite * nombre
+        nombres[cle] = total
+        enfants[cle] = suivantes
+        return total
+
+    depart = (tuple(sorted(tailles, reverse=True)), 0)
+    if not tailles:
+        return (0 if touches else 1), [0] * (taille ** 2)
+    try:
+        nombre_flottes = explorer(*depart)
+    except _RechercheTropLongue:
+        return None
+    # Chaque situation est atteinte par un nombre de chemins depuis le départ ; un placement est présent dans
+    # (chemins jusqu'à la situation) * multiplicité * (façons de finir depuis la situation suivante) flottes
+    comptes = [0] * (taille ** 2)
+    chemins = {depart: 1}
+    for cle in sorted(nombres, key=lambda situation: -len(situation[0])):  # Chaque placement retire un bateau
+        if cle not in chemins or cle == FIN:
+            continue
+        for multiplicite, masque, suivante in enfants[cle]:
+            flottes = chemins[cle] * multiplicite * nombres[suivante]
+            for case in indices_masque(masque & ~touches):
+                comptes[case] += flottes
+            chemins[suivante] = chemins.get(suivante, 0) + chemins[cle] * multiplicite
+    return nombre_flottes, comptes
+
+
+class StrategieSolveur(StrategieMonteCarlo):
+    """
+    Stratégie tirant sur la case dont la probabilité exacte de contenir un bateau est la plus grande, quand la
+    recherche est assez petite, et utilisant les tirages de Monte-Carlo sinon.
+    """
+    NOM = "solveur"
+
+    def __init__(self, taille, tailles_bateaux, generateur=random, delai=None, processus=None, echantillons=None):
+        StrategieMonteCarlo.__init__(self, taille, tailles_bateaux, generateur, delai, processus, echantillons)
+        self.coups_exacts = 0  # nombre de tirs choisis par le solveur exact
+        self.coups_estimes = 0  # nombre de tirs choisis par les tirages
+
+    def probabilites(self):
+        """
+        Calcule la probabilité exacte que chaque case contienne un bateau, si la recherche est assez petite.
+
+        :return: liste des probabilités de chaque case (0 pour les cases déjà visées), ou "None" si la recherche
+                 serait trop longue
+        """
+        interdites = self.eau | self.coules
+        legaux = placements_legaux(self.taille, self.tailles_restantes, interdites, self.touches)
+        if taille_espace(legaux, self.tailles_restantes) > ESPACE_MAX:
+            return None
+        resultat = compter_flottes(self.taille, self.tailles_restantes, interdites, self.touches)
+        if resultat is None or resultat[0] == 0:
+            return None
+        nombre_flottes, comptes = resultat
+        return [compte / float(nombre_flottes) for compte in comptes]
+
+    def choisir_tir(self):
+        """
+        Choisit la case non visée la plus probable, au hasard en cas d'égalité.
+
+        :return: index de la case
+        """
+        probabilites = self.probabilites()
+        if probabilites is None:
+            self.coups_estimes += 1
+            return StrategieMonteCarlo.choisir_tir(self)
+        self.coups_exacts += 1
+        non_visees = [case for case in range(self.taille ** 2) if not self.tirs >> case & 1]
+        meilleure = max(probabilites[case] for case in non_visees)
+        return self.generateur.choice([case for case in non_visees if probabilites[case] == meilleure])
+
+
+def main():
+    """
+    Point d'entrée en ligne de commande : joue des parties avec le solveur et mesure la part des coups exacts.
+
+    :return: pas de retour
+    """
+    from grillebinaire import GrilleBinaire  # Importés ici, "simulation" importe ce module
+    from simulation import jouer_partie
+    import batailleNavale
+
+    parser = argparse.ArgumentParser(description="Parties jouées par le solveur exact de fin de partie.")
+    parser.add_argument("-n", "--parties", type=int, default=10, help="nombre de parties à jouer")
+    parser.add_argument("-t", "--taille", type=int, default=10, help="taille de la grille")
+    parser.add_argument("--delai", type=float, default=StrategieMonteCarlo.DELAI, help="temps de réflexion par coup "
+                                                                                        "des tirages en secondes")
+    parser.add_argument("-p", "--processus", type=int, default=None, help="nombre de processus des tirages (défaut : "
+                                                                           "nombre de cœurs)")
+    parser.add_argument("--graine", type=int, default=0, help="graine des générateurs aléatoires")
+    arguments = parser.parse_args()
+
+    generateur = random.Random(arguments.graine)
+    bateaux = batailleNavale.creer_bateaux()
+    grille = GrilleBinaire(bateaux, arguments.taille)
+    tirs = []
+    coups_exacts = 0
+    duree_exacte = 0.0
+    try:
+        for partie in range(arguments.parties):
+            grille.placer_bateaux(generateur)
+            strategie = StrategieSolveur(arguments.taille, [bateau.TAILLE for bateau in bateaux], generateur,
+                                         arguments.delai, arguments.processus)
+            probabilites = strategie.probabilites
+
+            def probabilites_mesurees():
+                debut = time.perf_counter()
+                resultat = probabilites()
+                if resultat is not None:
+                    nonlocal duree_exacte
+                    duree_exacte += time.perf_counter() - debut
+                return resultat
+
+            strategie.probabilites = probabilites_mesurees
+            tirs.append(jouer_partie(grille, strategie))
+            coups_exacts += strategie.coups_exacts
+            print("Partie {0} : {1} tirs, dont {2} choisis par le solveur exact".format(
+                partie + 1, tirs[-1], strategie.coups_exacts))
+    finally:
+        fermer_pool()
+    print("Nombre moyen de tirs par partie : {0:.2f}".format(sum(tirs) / float(len(tirs))))
+    print("Coups exacts : {0:.0f} %, {1:.1f} ms en moyenne".format(
+        100.0 * coups_exacts / sum(tirs), duree_exacte / max(coups_exacts, 1) * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# coding: utf-8
+"""
+Module contenant les stratégies de tir utilisées pour jouer sans joueur humain.
+
+Une stratégie ne voit que ce qu'un joueur verrait : le résultat de ses propres tirs. Les cases sont désignées par
+leur index "ligne * taille + colonne".
+"""
+import random
+
+from case import Etat
+
+
+class AbstractStrategie:
+    """
+    Classe servant de base aux stratégies de tir.
+
+    Le mot "Abstract" dans son nom indique qu'elle n'est pas conçue pour être utilisée de manière directe.
+    """
+    NOM = None  # nom de la stratégie, utilisé pour la choisir en ligne de commande
+
+    def __init__(self, taille, tailles_bateaux, generateur=random):
+        """
+        constructeur de la classe "AbstractStrategie"
+
+        :param taille: nombre de cases d'un côté de la grille
+        :param tailles_bateaux: liste des tailles des bateaux de la flotte adverse
+        :param generateur: générateur de nombres aléatoires à utiliser (module "random" ou objet "random.Random")
+        """
+        self.taille = taille
+        self.tailles_bateaux = list(tailles_bateaux)
+        self.generateur = generateur
+
+    def choisir_tir(self):
+        """
+        Choisit la prochaine case sur laquelle tirer.
+
+        :return: index de la case
+        """
+        raise NotImplementedError
+
+    def observer(self, indice, etat, indices_modifies):
+        """
+        Informe la stratégie du résultat d'un tir.
+
+        :param indice: index de la case visée
+        :param etat: état de la case après le tir (voir "Grille.tirer")
+        :param indices_modifies: index des cases modifiées par le tir, toutes les cases du bateau s'il est coulé
+        :return: pas de retour
+        """
+        pass
+
+    def jouer_un_tour(self, grille):
+        """
+        Choisit une case, tire dessus avec "grille.tirer" et observe le résultat.
+
+        :param grille: grille sur laquelle tirer
+        :return: tuple (index de la case visée, retour de "grille.tirer")
+        """
+        indice = self.choisir_tir()
+        etat, cases = grille.tirer((indice % self.taille, indice // self.taille))
+        if etat in (Etat.DANS_L_EAU, Etat.TOUCHE, Etat.COULE):
+            self.observer(indice, etat, [case.index[1] * self.taille + case.index[0] for case in cases])
+        return indice, (etat, cases)
+
+
+class StrategieAleatoire(AbstractStrategie):
+    """
+    Stratégie tirant au hasard sur les cases qui n'ont pas encore reçu de tir.
+    """
+    NOM = "aleatoire"
+
+    def __init__(self, taille, tailles_bateaux, generateur=random):
+        AbstractStrategie.__init__(self, taille, tailles_bateaux, generateur)
+        self._cases_restantes = list(range(taille ** 2))
+        generateur.shuffle(self._cases_restantes)
+
+    def choisir_tir(self):
+        """
+        Choisit la prochaine case sur laquelle tirer.
+
+        :return: index de la case
+        """
+        return self._cases_restantes.pop()
+
+
+class StrategieChasseCible(AbstractStrategie):
+    """
+    Stratégie de chasse et de poursuite classique.
+
+    En chasse, elle tire au hasard sur les cases dont la somme des coordonnées est un multiple de la taille du plus
+    petit bateau restant (un bateau ne peut pas se glisser entre elles). Après chaque case touchée, elle poursuit le
+    bateau en tirant sur les cases voisines, jusqu'à ce que tous les bateaux touchés soient coulés.
+    """
+    NOM = "chassecible"
+
+    def __init__(self, taille, tailles_bateaux, generateur=random):
+        AbstractStrategie.__init__(self, taille, tailles_bateaux, generateur)
+        self._cases_restantes = list(range(taille ** 2))
+        generateur.shuffle(self._cases_restantes)
+        self._chasse = {}  # cases de chasse dans un ordre aléatoire, par pas ; les cases visées en sont retirées
+        # à la demande
+        self._tirees = [False] * taille ** 2
+        self._cibles = []  # pile des cases voisines de cases touchées
+        self._touchees = set()  # cases touchées appartenant à des bateaux pas encore coulés
+        self._tailles_restantes = list(tailles_bateaux)
+
+    def choisir_tir(self):
+        """
+        Choisit la prochaine case sur laquelle tirer.
+
+        :return: index de la case
+        """
+        while self._cibles:
+            case = self._cibles.pop()
+            if not self._tirees[case]:
+                return case
+        pas = min(self._tailles_restantes) if self._tailles_restantes else 1
+        for pas_chasse in (pas, 1):  # Quand toutes les cases du pas ont été visées, on tire n'importe où
+            if pas_chasse not in self._chasse:
+                self._chasse[pas_chasse] = [case for case in self._cases_restantes
+                                            if sum(divmod(case, self.taille)) % pas_chasse == 0]
+            cases = self._chasse[pas_chasse]
+            while cases and self._tirees[cases[-1]]:
+                cases.pop()
+            if cases:
+                return cases[-1]
+
+    def observer(self, indice, etat, indices_modifies):
+        """
+        Met à jour les cases à poursuivre après un tir.
+
+        :param indice: index de la case visée
+        :param etat: état de la case après le tir
+        :param indices_modifies: index des cases modifiées par le tir
+        :return: pas de retour
+        """
+        self._tirees[indice] = True
+        if etat == Etat.TOUCHE:
+            self._touchees.add(indice)
+            ligne, colonne = divmod(indice, self.taille)
+            voisines = []
+            if ligne > 0:
+                voisines.append(indice - self.taille)
+            if ligne < self.taille - 1:
+                voisines.append(indice + self.taille)
+            if colonne > 0:
+                voisines.append(indice - 1)
+            if colonne < self.taille - 1:
+                voisines.append(indice + 1)
+            self.generateur.shuffle(voisines)
+            self._cibles.extend(case for case in voisines if not self._tirees[case])
+        elif etat == Etat.COULE:
+            self._touchees.difference_update(indices_modifies)
+            if len(indices_modifies) in self._tailles_restantes:
+                self._tailles_restantes.remove(len(indices_modifies))
+            if not self._touchees:  # Plus aucun bateau touché à poursuivre
+                self._cibles = []
@@ -0,0 +1,532 @@
+# coding: utf-8
+"""
+Module contenant l'affichage graphique avec la tortue.
+
+C'est le seul module qui importe "turtle", et donc Tk : il n'est importé que lorsque l'affichage avec la tortue est
+choisi (voir "interfacegraphique.Mode"), ce qui permet de jouer dans la console sans affichage graphique.
+"""
+import math
+import turtle
+
+from case import Etat, lettres_colonne
+
+
+def decimales(nombre):
+    """
+    Nombre de décimales d'un nombre.
+
+    :param nombre: nombre dont on veut savoir les décimales
+    :return: nombre de décimales
+    """
+    return int(math.floor(math.log10(nombre) + 0.00001) + 1)
+
+
+class Tortue(turtle.Turtle):
+    """
+    Cette classe permet de customiser la tortue fournie par le module "turtle".
+    """
+    COULEUR_FOND = "#5bc6d2"
+    COULEUR_ARRIERE_PLAN = "white"
+
+    COULEUR_CALE = "#767F7E"
+    HAUTEUR_CALE = 20
+
+    COULEUR_CHEMINEE = "#c61c10"
+    HAUTEUR_CHEMINEE = 25
+    LARGEUR_CHEMINEE = 8
+    ESPACEMENT_CHEMINEE = 17
+
+    LARGEUR_TOURELLE = 18
+    HAUTEUR_TOURELLE = 12
+    ELOIGNEMENT_TOURELLE_BORD = 2
+
+    def __init__(self):
+        """
+        constructeur de la classe "Tortue"
+        """
+        turtle.Turtle.__init__(self)
+        self.hideturtle()  # cache la tortue
+        self.screen.tracer(0, 0)  # rend le dessin instantané, mais l'écran doit être rafraîchit manuellement
+        # en appelant "self.screen.update()"
+
+    @staticmethod
+    def couleur_case(etat):
+        """
+        Retourne la couleur correspondant à l'état de la case.
+
+        :param etat: état de la case à dessiner
+        :return: couleur correspondant à l'état de la case
+        """
+        if etat == Etat.DANS_L_EAU:
+            return "blue"
+        elif etat == Etat.TOUCHE:
+            return "orange"
+        elif etat == Etat.COULE:
+            return "red"
+        else:
+            return "white"
+
+    def aller_a(self, x, y=None):
+        """
+        Va à une position sans laisser de traces.
+
+        :param x: entier représentant la coordonnée x ou liste contenant les deux coordonnées.
+        :param y: entier représentant la coordonnée y
+        :return: pas de retour
+        """
+        etait_en_bas = self.isdown()
+        self.up()
+        if y is None:
+            self.goto(x)
+        else:
+            self.goto(x, y)
+        if etait_en_bas:
+            self.down()
+
+    def ecrire(self, message, position, alignement="left", fonte=("Arial", 8, "normal"), couleur="black"):
+        """
+        Écrit un message à l'écran
+
+        :param message: message à écrire
+        :param position: endroit où écrire le message
+        :param alignement: alignement du texte
+        :param fonte: fonte à utiliser
+        :param couleur: couleur du texte
+        :return: pas de retour
+        """
+        ancienne_couleur = self.pencolor()  # Enregistre la couleur de la tortue
+        self.pencolor(couleur)
+        self.aller_a(position)
+        self.write(message, align=alignement, font=fonte)
+        self.pencolor(ancienne_couleur)  # Rétablit la couleur de la tortue
+
+    def dessinfond(self):
+        """
+        Donne une couleur à l'arrière-plan
+        :return: pas de retour
+        """
+        self.fillcolor(self.COULEUR_FOND)
+        self.setheading(0)
+        self.begin_fill()
+        self.aller_a(-4000, -4000)  # On prend large pour être sûr de remplir l'écran
+        for i in range(4):
+            self.forward(8000)
+            self.left(90)
+        self.end_fill()
+        self.screen.update()
+
+    @staticmethod
+    def longueur_bateau(taille):
+        """
+        Définit la longueur graphique du bateau
+        :param taille: nombre de case du bateau
+        :return: taille graphique
+        """
+        return 30 * taille
+
+    def dessincale(self, bateau):
+        """
+        Dessine la cale du bateau selon ce schéma:
+                 _______________
+        alpha -> \             / <- beta
+                  \___________/
+        :param bateau: bateau dont il faut dessiner la cale
+        :return: pas de retour
+        """
+        alpha = 85
+        beta = 60
+        self.pensize(2)
+        self.down()
+        self.fillcolor(self.COULEUR_CALE)
+        self.begin_fill()
+        self.right(alpha)
+        self.forward(self.HAUTEUR_CALE / math.sin(math.radians(alpha)))
+        self.left(alpha)
+        self.forward(self.longueur_bateau(bateau.TAILLE) - self.HAUTEUR_CALE / math.tan(
+            math.radians(alpha)) - self.HAUTEUR_CALE / math.tan(math.radians(beta)))
+        self.left(beta)
+        self.forward(self.HAUTEUR_CALE / math.sin(math.radians(beta)))
+        self.left(180 - beta)
+        pos = self.pos()
+        self.forward(self.longueur_bateau(bateau.TAILLE))
+        self.end_fill()
+        self.up()
+        self.goto(pos)
+
+    def dessintourelle(self, orientation):
+        """
+        Dessine une tourelle
+         __
+        /__\====
+        
+        :param orientation: défini l'orientation de la tourelle. 1 veut dire droite et -1 gauche
+        :return: pas de retour
+        """
+        alpha = 70
+        beta = 80
+        origine = self.pos()
+        self.setheading(0)
+        self.down()
+        self.pensize(2)
+        self.fillcolor("grey")
+        self.begin_fill()
+        self.forward(self.LARGEUR_TOURELLE * orientation)
+        self.left((180 - alpha) * orientation)
+        self.forward(
+            ((self.HAUTEUR_TOURELLE / math.sin(math.radians(alpha))) / 2.0 - self.HAUTEUR_TOURELLE / 6.0) * orientation)
+        self.right(75 * orientation)
+        self.forward(self.LARGEUR_TOURELLE * orientation)
+        self.left(90 * orientation)
+        self.forward(self.LARGEUR_TOURELLE / 6.0 * orientation)
+        self.left(90 * orientation)
+        self.forward(
+            (self.LARGEUR_TOURELLE - self.LARGEUR_TOURELLE / 6.0 * math.tan(math.radians(90 - 75))) * orientation)
+        self.right(105 * orientation)
+        self.forward((self.HAUTEUR_TOURELLE / math.sin(math.radians(alpha))) / 2.0 * orientation)
+        self.left(alpha * orientation)
+        self.forward(abs(self.LARGEUR_TOURELLE - self.HAUTEUR_TOURELLE / math.tan(
+            math.radians(alpha)) - self.HAUTEUR_TOURELLE / math.tan(math.radians(beta))) * orientation)
+        self.left(beta * orientation)
+        self.goto(origine)
+        self.end_fill()
+        self.up()
+
+    def dessincheminee(self):
+        """
+        Dessine une cheminée pour les bateaux
+        :return: pas de retour
+        """
+        origine = self.pos()
+        self.setheading(90)
+        self.down()
+        self.pensize(1)
+        self.fillcolor(self.COULEUR_CHEMINEE)
+        self.begin_fill()
+        self.forward(self.HAUTEUR_CHEMINEE)
+        self.left(90)
+        self.forward(self.LARGEUR_CHEMINEE)
+        self.left(90)
+        self.forward(self.HAUTEUR_CHEMINEE)
+        self.right(90)
+        self.goto(origine)
+        self.end_fill()
+        self.setheading(180)
+        self.up()
+
+    def dessinbateaux(self, grille, position):
+        """Dessine les bateaux stylisés
+                ___
+               __|__
+         __   |O O O|   __
+    ====/__\__|_____|__/__\====
+        \ . . . . . . . . /
+         \_______________/
+                  """
+        bateaux_par_type = []  # liste stockant un bateau par type
+        for bateau in grille.bateaux:
+            type_dans_liste = False  # Est-ce que le type du bateau est déjà compté?
+            for bateau_par_type in bateaux_par_type:
+                if bateau.TYPE == bateau_par_type.TYPE:
+                    type_dans_liste = True
+            if not type_dans_liste:
+                bateaux_par_type.append(bateau)  # On ne stocke qu'un bateau par type
+
+        for i, bateau in enumerate(bateaux_par_type):
+            origine = (position[0], position[1] + i * 94)
+            self.aller_a(origine)
+            self.setheading(0)
+            self.dessincale(bateau)
+            self.forward(self.LARGEUR_TOURELLE + self.ELOIGNEMENT_TOURELLE_BORD)
+            self.dessintourelle(1)
+            self.setheading(180)
+            self.forward(
+                self.longueur_bateau(bateau.TAILLE) - 2 * (self.LARGEUR_TOURELLE + self.ELOIGNEMENT_TOURELLE_BORD))
+            self.dessintourelle(-1)
+            self.setheading(0)
+
+            if bateau.TAILLE <= 2:
+                nombre_cheminees = 0
+            elif bateau.TAILLE == 3:
+                nombre_cheminees = 1
+            elif bateau.TAILLE == 4:
+                nombre_cheminees = 2
+            else:
+                nombre_cheminees = 3
+            self.forward(self.longueur_bateau(bateau.TAILLE) / 2.0 - self.LARGEUR_TOURELLE
+                         + (nombre_cheminees * self.LARGEUR_CHEMINEE
+                            + (nombre_cheminees - 1) * self.ESPACEMENT_CHEMINEE) / 2.0
+                         - self.LARGEUR_CHEMINEE)
+            for j in range(nombre_cheminees):  # On dessine deux cheminées
+                self.dessincheminee()
+                if j < nombre_cheminees - 1:
+                    self.forward(self.ESPACEMENT_CHEMINEE)
+            self.screen.update()
+
+
+class TexteRetenu:
+    """
+    Texte placé une seule fois sur le canevas de la tortue, dont on ne change ensuite que le contenu et la couleur.
+
+    Contrairement à "Tortue.ecrire", qui crée un nouvel élément sur le canevas à chaque appel, le canevas n'est modifié
+    que si le texte ou sa couleur ont changé.
+    """
+    ANCRES = {"left": "sw", "center": "s", "right": "se"}  # Mêmes ancrages que "turtle.Turtle.write"
+
+    def __init__(self, ecran, position, alignement="left", fonte=("Arial", 8, "normal")):
+        """
+        constructeur de la classe "TexteRetenu"
+
+        :param ecran: écran de la tortue ("turtle.Screen()")
+        :param position: endroit où écrire le texte, dans les coordonnées de la tortue
+        :param alignement: alignement du texte
+        :param fonte: fonte à utiliser
+        """
+        self._canevas = ecran.getcanvas()
+        self._position = (position[0] * ecran.xscale - 1, -position[1] * ecran.yscale)
+        self._alignement = alignement
+        self._fonte = fonte
+        self._element = None  # Élément du canevas, créé au premier affichage
+        self._texte = None
+        self._couleur = None
+
+    def changer(self, texte, couleur="black"):
+        """
+        Affiche un texte, en ne modifiant le canevas que si le texte ou la couleur ont changé.
+
+        :param texte: texte à afficher
+        :param couleur: couleur du texte
+        :return: pas de retour
+        """
+        if self._element is None:
+            self._element = self._canevas.create_text(self._position, text=texte, fill=couleur,
+                                                      anchor=self.ANCRES[self._alignement], font=self._fonte)
+        elif texte != self._texte or couleur != self._couleur:
+            self._canevas.itemconfigure(self._element, text=texte, fill=couleur)
+        self._texte = texte
+        self._couleur = couleur
+
+    def montrer(self):
+        """
+        Rend le texte visible et le place au-dessus des dessins faits depuis sa création.
+
+        :return: pas de retour
+        """
+        if self._element is not None:
+            self._canevas.itemconfigure(self._element, state="normal")
+            self._canevas.tag_raise(self._element)
+
+    def cacher(self):
+        """
+        Cache le texte sans le supprimer du canevas.
+
+        :return: pas de retour
+        """
+        if self._element is not None:
+            self._canevas.itemconfigure(self._element, state="hidden")
+
+    def supprimer(self):
+        """
+        Supprime le texte du canevas ; il sera recréé au prochain appel de "changer".
+
+        :return: pas de retour
+        """
+        if self._element is not None:
+            self._canevas.delete(self._element)
+        self._element = None
+        self._texte = None
+        self._couleur = None
+
+
+class TableauDeBord:
+    """
+    Informations affichées pendant la partie : coups restants, temps restant et nombre de bateaux restants par type.
+
+    Chaque information est un "TexteRetenu" : à chaque tour, seules les valeurs qui ont changé sont redessinées.
+    """
+    POSITION_COUPS = (-330, 295)
+    POSITION_TEMPS = (-330, 275)
+    POSITION_BATEAUX = (-300, -175)  # Doit correspondre à la position passée à "Tortue.dessinbateaux"
+
+    def __init__(self, ecran, taille_police=14):
+        """
+        constructeur de la classe "TableauDeBord"
+
+        :param ecran: écran de la tortue ("turtle.Screen()")
+        :param taille_police: taille de la police des textes
+        """
+        self._ecran = ecran
+        self.coups = TexteRetenu(ecran, self.POSITION_COUPS, "left", ("Arial", taille_police, "normal"))
+        self.temps = TexteRetenu(ecran, self.POSITION_TEMPS, "left", ("Arial", taille_police, "normal"))
+        self.bateaux = {}  # Textes du nombre de bateaux restants, indexés par type
+        self._visible = False
+
+    def textes(self):
+        """
+        :return: liste de tous les textes du tableau de bord
+        """
+        return [self.coups, self.temps] + list(self.bateaux.values())
+
+    def actualiser(self, coups_restants, temps_restant, grille):
+        """
+        Met à jour les valeurs affichées.
+
+        :param coups_restants: nombre de coups restants
+        :param temps_restant: temps restant en secondes
+        :param grille: grille de jeu, dont on affiche le nombre de bateaux restants par type
+        :return: pas de retour
+        """
+        self.coups.changer("Coups restants : " + str(coups_restants))
+        self.temps.changer("Temps restant : {0} s".format(int(round(temps_restant))))
+        types_bateaux = list(grille.types_bateaux())
+        if types_bateaux != list(self.bateaux):  # Nouvelle flotte : les lignes des types changent de position
+            for texte in self.bateaux.values():
+                texte.supprimer()
+            self.bateaux = {}
+        for i, type_bateau in enumerate(types_bateaux):  # Une ligne par type, comme "dessinbateaux"
+            if type_bateau not in self.bateaux:
+                position = (self.POSITION_BATEAUX[0] - 15, self.POSITION_BATEAUX[1] + i * 94 - 20)
+                self.bateaux[type_bateau] = TexteRetenu(self._ecran, position, "center", ("Arial", 14, "bold"))
+            nombre_restant = grille.nombrebateauxdeboutpartype(type_bateau)
+            self.bateaux[type_bateau].changer(str(nombre_restant) + " × ", "red" if nombre_restant == 0 else "black")
+        if not self._visible:
+            self.montrer()
+
+    def montrer(self):
+        """
+        Affiche le tableau de bord au premier plan.
+
+        :return: pas de retour
+        """
+        for texte in self.textes():
+            texte.montrer()
+        self._visible = True
+
+    def cacher(self):
+        """
+        Cache le tableau de bord, par exemple pendant l'affichage du menu.
+
+        :return: pas de retour
+        """
+        for texte in self.textes():
+            texte.cacher()
+        self._visible = False
+
+
+class RenduGrille:
+    """
+    Dessine la grille directement sur le canevas Tk de la tortue.
+
+    Chaque case est un rectangle du canevas, créé une seule fois pour une taille de grille donnée. Redessiner une case
+    revient à changer la couleur de son rectangle, et seulement si son état a changé depuis le dernier dessin.
+    Tous les éléments de la grille portent l'étiquette "ETIQUETTE", ce qui permet de les cacher ou de les placer au
+    premier plan en une seule opération.
+    """
+    ETIQUETTE = "grille"
+
+    def __init__(self, ecran):
+        """
+        constructeur de la classe "RenduGrille"
+
+        :param ecran: écran de la tortue ("turtle.Screen()")
+        """
+        self._ecran = ecran
+        self._canevas = ecran.getcanvas()
+        self._geometrie = None  # Géométrie pour laquelle les éléments ont été créés
+        self._rectangles = []  # Rectangle de chaque case, indexé par "ligne * taille + colonne"
+        self._etats = []  # Dernier état dessiné de chaque case
+
+    def _point_canevas(self, x, y):
+        """
+        Convertit un point des coordonnées de la tortue en coordonnées du canevas.
+
+        :param x: coordonnée x
+        :param y: coordonnée y
+        :return: tuple (x, y) dans le canevas
+        """
+        return x * self._ecran.xscale, -y * self._ecran.yscale
+
+    def _creer_elements(self, cases, geometrie):
+        """
+        Crée les rectangles des cases et les graduations pour une nouvelle géométrie.
+
+        :param cases: cases de la grille, accédées de la manière suivante : cases[ligne][colonne]
+        :param geometrie: géométrie de la grille ("GeometrieGrille")
+        :return: pas de retour
+        """
+        self._canevas.delete(self.ETIQUETTE)
+        self._geometrie = geometrie
+        self._rectangles = []
+        self._etats = []
+        cote = geometrie.largeur_case
+        for ligne in cases:
+            for case in ligne:
+                x, y = geometrie.position_case(case.ligne, case.colonne)
+                self._rectangles.append(self._canevas.create_rectangle(
+                    self._point_canevas(x, y + cote), self._point_canevas(x + cote, y),
+                    fill=Tortue.couleur_case(case.etat), outline="black", tags=self.ETIQUETTE))
+                self._etats.append(case.etat)
+        self._creer_graduations(geometrie)
+
+    def _creer_graduations(self, geometrie):
+        """
+        Crée les graduations à côté de la grille.
+
+        :param geometrie: géométrie de la grille ("GeometrieGrille")
+        :return: pas de retour
+        """
+        x_0, y_0 = geometrie.position_case(0, 0)  # origine de la case supérieure gauche de la grille
+        cote_grille = geometrie.taille
+        decimales_max = decimales(cote_grille)  # Nombre de caractères pour écrire le nombre
+        cote_case = geometrie.largeur_case  # Taille en pixels de la case
+        taille_fonte = int(cote_case / 10.0 + 8)  # Taille de la fonte
+        fonte = ("Arial", taille_fonte, "bold")
+        for i in range(cote_grille):
+            x = x_0 + i * cote_case + cote_case / 2.0
+            y = y_0 + cote_case + decimales_max * taille_fonte / 2.0
+            self._canevas.create_text(self._point_canevas(x - 1, y), text=lettres_colonne(i),
+                                      anchor=TexteRetenu.ANCRES["center"], font=fonte, tags=self.ETIQUETTE)
+            x = x_0 - decimales_max * taille_fonte / 2.0
+            y = y_0 - (i - 1) * cote_case - cote_case / 2.0 - taille_fonte
+            self._canevas.create_text(self._point_canevas(x - 1, y), text=str(i + 1),
+                                      anchor=TexteRetenu.ANCRES["right"], font=fonte, tags=self.ETIQUETTE)
+
+    def dessiner_case(self, case):
+        """
+        Redessine une case si son état a changé.
+
+        :param case: case à dessiner
+        :return: pas de retour
+        """
+        if self._geometrie is None:  # La grille n'a pas encore été dessinée
+            return
+        indice = case.ligne * self._geometrie.taille + case.colonne
+        etat = case.etat
+        if etat != self._etats[indice]:
+            self._etats[indice] = etat
+            self._canevas.itemconfigure(self._rectangles[indice], fill=Tortue.couleur_case(etat))
+
+    def dessiner_grille(self, cases, geometrie):
+        """
+        Dessine toute la grille au premier plan, en ne créant les éléments du canevas que si la géométrie a changé.
+
+        :param cases: cases de la grille, accédées de la manière suivante : cases[ligne][colonne]
+        :param geometrie: géométrie de la grille ("GeometrieGrille")
+        :return: pas de retour
+        """
+        if geometrie is not self._geometrie:
+            self._creer_elements(cases, geometrie)
+        else:
+            for ligne in cases:
+                for case in ligne:
+                    self.dessiner_case(case)
+        self._canevas.itemconfigure(self.ETIQUETTE, state="normal")
+        self._canevas.tag_raise(self.ETIQUETTE)
+        self._ecran.update()
+
+    def cacher(self):
+        """
+        Cache la grille sans supprimer ses éléments du canevas.
+
+        :return: pas de retour
+        """
+        self._canevas.itemconfigure(self.ETIQUETTE, state="hidden")
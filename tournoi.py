@@ -0,0 +1,314 @@
+# coding: utf-8
+"""
+Module de tournoi entre stratégies de tir, sur les mêmes grilles pour toutes les stratégies.
+
+La grille de la partie numéro "i" d'une taille donnée ne dépend que de la graine du tournoi, de la taille et de "i" :
+toutes les stratégies jouent exactement les mêmes grilles, quels que soient le nombre de processus et la taille des
+lots. Chaque lot fait jouer toutes les stratégies sur chacune de ses grilles, ce qui permet de comparer les
+stratégies partie par partie (écart de tirs sur la même grille), une comparaison bien plus précise que celle des
+moyennes seules.
+
+Les résultats sont gardés sous forme d'histogrammes (nombre de parties par nombre de tirs) : la mémoire ne dépend pas
+du nombre de parties, et les centiles restent exacts.
+
+Une stratégie est désignée par son nom dans "simulation.STRATEGIES" ou par "module:Classe" pour une stratégie
+externe, dont le constructeur doit accepter (taille, tailles_bateaux, generateur) comme "AbstractStrategie".
+
+Exemple : python tournoi.py -s aleatoire chassecible densite -t 8 10 12 -n 100000 --json tournoi.json
+"""
+from __future__ import print_function
+
+import argparse
+import importlib
+import json
+import math
+import multiprocessing
+import random
+import time
+
+from grillebinaire import GrilleBinaire
+from simulation import STRATEGIES, jouer_partie
+import batailleNavale
+
+Z_95 = 1.959964  # Quantile de la loi normale pour un intervalle de confiance à 95 %
+
+
+class Statistiques:
+    """
+    Distribution d'un nombre entier par partie (nombre de tirs, ou écart de tirs entre deux stratégies).
+    """
+    __slots__ = ("histogramme", "nombre", "somme", "somme_carres")
+
+    def __init__(self):
+        """
+        constructeur de la classe "Statistiques"
+        """
+        self.histogramme = {}  # valeur -> nombre de parties
+        self.nombre = 0
+        self.somme = 0
+        self.somme_carres = 0
+
+    def ajouter(self, valeur):
+        """
+        Ajoute le résultat d'une partie.
+
+        :param valeur: nombre entier
+        :return: pas de retour
+        """
+        self.histogramme[valeur] = self.histogramme.get(valeur, 0) + 1
+        self.nombre += 1
+        self.somme += valeur
+        self.somme_carres += valeur * valeur
+
+    def fusionner(self, autres):
+        """
+        Ajoute les parties d'autres statistiques, par ex. celles d'un lot.
+
+        :param autres: "Statistiques"
+        :return: pas de retour
+        """
+        for valeur, nombre in autres.histogramme.items():
+            self.histogramme[valeur] = self.histogramme.get(valeur, 0) + nombre
+        self.nombre += autres.nombre
+        self.somme += autres.somme
+        self.somme_carres += autres.somme_carres
+
+    def moyenne(self):
+        """
+        :return: moyenne, "None" s'il n'y a aucune partie
+        """
+        if not self.nombre:
+            return None
+        return self.somme / float(self.nombre)
+
+    def ecart_type(self):
+        """
+        :return: écart-type de l'échantillon, "None" s'il y a moins de deux parties
+        """
+        if self.nombre < 2:
+            return None
+        variance = (self.somme_carres - self.somme * self.somme / float(self.nombre)) / (self.nombre - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def intervalle_confiance(self):
+        """
+        Calcule l'intervalle de confiance à 95 % de la moyenne (approximation normale, valable pour des centaines de
+        parties ou plus).
+
+        :return: demi-largeur de l'intervalle, "None" s'il y a moins de deux parties
+        """
+        ecart_type = self.ecart_type()
+        if ecart_type is None:
+            return None
+        return Z_95 * ecart_type / math.sqrt(self.nombre)
+
+    def centiles(self, rangs=(10, 50, 90, 99)):
+        """
+        Calcule des centiles à partir de l'histogramme, avec la même définition que "serveur.centiles".
+
+        :param rangs: centiles voulus, entre 0 et 100
+        :return: liste des centiles, dans l'ordre de "rangs", ou de "None" s'il n'y a aucune partie
+        """
+        if not self.nombre:
+            return [None] * len(rangs)
+        positions = [min(self.nombre - 1, int(self.nombre * rang / 100.0)) for rang in rangs]
+        resultats = [None] * len(rangs)
+        cumul = 0
+        for valeur in sorted(self.histogramme):
+            cumul += self.histogramme[valeur]
+            for i, position in enumerate(positions):
+                if resultats[i] is None and position < cumul:
+                    resultats[i] = valeur
+        return resultats
+
+    def en_dictionnaire(self):
+        """
+        :return: dictionnaire sérialisable en JSON, avec l'histogramme et les statistiques calculées
+        """
+        p10, p50, p90, p99 = self.centiles()
+        return {"parties": self.nombre, "moyenne": self.moyenne(), "ecart_type": self.ecart_type(),
+                "ic95": self.intervalle_confiance(), "min": min(self.histogramme) if self.histogramme else None,
+                "p10": p10, "p50": p50, "p90": p90, "p99": p99,
+                "max": max(self.histogramme) if self.histogramme else None,
+                "histogramme": {str(valeur): nombre for valeur, nombre in sorted(self.histogramme.items())}}
+
+
+def charger_strategie(nom):
+    """
+    Renvoie la classe d'une stratégie.
+
+    :param nom: nom dans "simulation.STRATEGIES" ou "module:Classe"
+    :return: classe de la stratégie
+    """
+    if nom in STRATEGIES:
+        return STRATEGIES[nom]
+    if ":" not in nom:
+        raise ValueError("Stratégie inconnue : {0}".format(nom))
+    nom_module, nom_classe = nom.split(":", 1)
+    return getattr(importlib.import_module(nom_module), nom_classe)
+
+
+def graine_partie(graine, taille, numero):
+    """
+    Calcule la graine du placement des bateaux d'une partie.
+
+    :param graine: graine du tournoi
+    :param taille: taille de la grille
+    :param numero: numéro de la partie pour cette taille
+    :return: graine de la partie
+    """
+    return "{0}:{1}:{2}".format(graine, taille, numero)
+
+
+def jouer_lot(parametres):
+    """
+    Fait jouer toutes les stratégies sur les grilles d'un lot. Cette fonction est exécutée dans les processus de
+    calcul.
+
+    :param parametres: tuple (noms des stratégies, taille de la grille, flotte, numéro de la première partie, nombre
+                       de parties, graine du tournoi)
+    :return: tuple (taille, liste des "Statistiques" du nombre de tirs de chaque stratégie, liste des "Statistiques"
+             de l'écart de tirs de chaque stratégie par rapport à la première)
+    """
+    noms, taille, flotte, premiere, nombre_parties, graine = parametres
+    classes = [charger_strategie(nom) for nom in noms]
+    bateaux = batailleNavale.creer_bateaux(flotte)
+    tailles_bateaux = [bateau.TAILLE for bateau in bateaux]
+    grille = GrilleBinaire(bateaux, taille)
+    tirs = [Statistiques() for nom in noms]
+    ecarts = [Statistiques() for nom in noms]
+    for numero in range(premiere, premiere + nombre_parties):
+        graine_grille = graine_partie(graine, taille, numero)
+        if not grille.placer_bateaux(random.Random(graine_grille)):
+            raise ValueError("Impossible de placer les bateaux sur une grille de taille {0}".format(taille))
+        positions = grille.positions_bateaux()
+        reference = None
+        for i, classe in enumerate(classes):
+            if i > 0:
+                grille.placer_bateaux_positions(positions)  # Remet la même grille à zéro
+            # Chaque stratégie reçoit un générateur initialisé de la même façon, indépendant de celui du placement
+            generateur = random.Random(graine_grille + ":strategie")
+            nombre_de_tirs = jouer_partie(grille, classe(taille, tailles_bateaux, generateur))
+            if reference is None:
+                reference = nombre_de_tirs
+            tirs[i].ajouter(nombre_de_tirs)
+            ecarts[i].ajouter(nombre_de_tirs - reference)
+    return taille, tirs, ecarts
+
+
+def tournoi(noms, tailles, nombre_parties, flotte=None, processus=None, taille_lot=500, graine=0):
+    """
+    Joue un tournoi et renvoie les résultats au fur et à mesure qu'ils sont calculés.
+
+    :param noms: noms des stratégies, la première sert de référence pour les écarts
+    :param tailles: tailles de grille
+    :param nombre_parties: nombre de parties par taille de grille
+    :param flotte: liste de tuples (type, taille, nombre), "batailleNavale.FLOTTE_DEFAUT" par défaut
+    :param processus: nombre de processus de calcul, par défaut le nombre de cœurs
+    :param taille_lot: nombre de grilles par lot envoyé à un processus
+    :param graine: graine du tournoi
+    :return: générateur des résultats de "jouer_lot"
+    """
+    lots = []
+    for taille in tailles:
+        for premiere in range(0, nombre_parties, taille_lot):
+            lots.append((list(noms), taille, flotte, premiere, min(taille_lot, nombre_parties - premiere), graine))
+    if processus is None:
+        processus = multiprocessing.cpu_count()
+
+    if processus <= 1:
+        for lot in lots:
+            yield jouer_lot(lot)
+    else:
+        pool = multiprocessing.Pool(processus)
+        try:
+            for resultat in pool.imap_unordered(jouer_lot, lots):
+                yield resultat
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+def rapport(noms, tailles, tirs, ecarts):
+    """
+    Met en forme les résultats d'un tournoi.
+
+    :param noms: noms des stratégies
+    :param tailles: tailles de grille
+    :param tirs: dictionnaire (taille, nom) -> "Statistiques" du nombre de tirs
+    :param ecarts: dictionnaire (taille, nom) -> "Statistiques" de l'écart de tirs par rapport à la première stratégie
+    :return: liste de lignes de texte
+    """
+    largeur = max(len(nom) for nom in noms)
+    lignes = []
+    for taille in tailles:
+        lignes.append("Grille {0}x{0}, {1} parties par stratégie".format(taille, tirs[(taille, noms[0])].nombre))
+        lignes.append("  {0:<{1}}  moyenne ± IC 95 %    écart-type  min  p10  p50  p90  p99  max  écart / {2}".format(
+            "stratégie", largeur, noms[0]))
+        for nom in noms:
+            statistiques = tirs[(taille, nom)]
+            p10, p50, p90, p99 = statistiques.centiles()
+            ecart = ecarts[(taille, nom)]
+            texte_ecart = "référence" if nom == noms[0] else "{0:+.2f} ± {1:.2f}".format(
+                ecart.moyenne(), ecart.intervalle_confiance() or 0.0)
+            lignes.append("  {0:<{1}}  {2:7.2f} ± {3:<6.2f}  {4:10.2f} {5:4d} {6:4d} {7:4d} {8:4d} {9:4d} {10:4d}  "
+                          "{11}".format(nom, largeur, statistiques.moyenne(), statistiques.intervalle_confiance() or 0.0,
+                                        statistiques.ecart_type() or 0.0, min(statistiques.histogramme), p10, p50,
+                                        p90, p99, max(statistiques.histogramme), texte_ecart))
+    return lignes
+
+
+def main():
+    """
+    Point d'entrée du tournoi en ligne de commande.
+
+    :return: pas de retour
+    """
+    parser = argparse.ArgumentParser(description="Tournoi entre stratégies de tir sur les mêmes grilles.")
+    parser.add_argument("-s", "--strategies", nargs="+", default=["aleatoire", "chassecible", "densite"],
+                        help="stratégies (noms : {0}, ou module:Classe), la première sert de référence".format(
+                            ", ".join(sorted(STRATEGIES))))
+    parser.add_argument("-t", "--tailles", type=int, nargs="+", default=[10], help="tailles de grille")
+    parser.add_argument("-n", "--parties", type=int, default=10000, help="nombre de parties par taille de grille")
+    parser.add_argument("-p", "--processus", type=int, default=None, help="nombre de processus (défaut : nombre de "
+                                                                           "cœurs)")
+    parser.add_argument("--lot", type=int, default=500, help="nombre de grilles par lot")
+    parser.add_argument("--graine", type=int, default=0, help="graine des grilles")
+    parser.add_argument("--flotte", default=None, help="fichier JSON décrivant la flotte (voir \"batailleNavale\")")
+    parser.add_argument("--json", default=None, help="fichier dans lequel écrire les résultats détaillés")
+    arguments = parser.parse_args()
+
+    try:
+        for nom in arguments.strategies:
+            charger_strategie(nom)
+        flotte = batailleNavale.charger_flotte(arguments.flotte) if arguments.flotte else None
+    except (ImportError, AttributeError, OSError, ValueError) as erreur:
+        parser.error(str(erreur))
+
+    noms = arguments.strategies
+    tirs = {(taille, nom): Statistiques() for taille in arguments.tailles for nom in noms}
+    ecarts = {(taille, nom): Statistiques() for taille in arguments.tailles for nom in noms}
+    total = arguments.parties * len(arguments.tailles)
+    nombre = 0
+    debut = time.time()
+    for taille, tirs_lot, ecarts_lot in tournoi(noms, arguments.tailles, arguments.parties, flotte,
+                                                arguments.processus, arguments.lot, arguments.graine):
+        for nom, statistiques, ecart in zip(noms, tirs_lot, ecarts_lot):
+            tirs[(taille, nom)].fusionner(statistiques)
+            ecarts[(taille, nom)].fusionner(ecart)
+        nombre += tirs_lot[0].nombre
+        ecoule = time.time() - debut
+        print("\r{0}/{1} grilles, {2:.0f} grilles/s".format(nombre, total, nombre / ecoule), end="")
+    print()
+    print("\n".join(rapport(noms, arguments.tailles, tirs, ecarts)))
+    if arguments.json:
+        with open(arguments.json, "w") as fichier:
+            json.dump({"graine": arguments.graine, "strategies": noms, "resultats": {
+                str(taille): {nom: dict(tirs[(taille, nom)].en_dictionnaire(),
+                                        ecart=ecarts[(taille, nom)].en_dictionnaire()) for nom in noms}
+                for taille in arguments.tailles}}, fichier, indent=2, ensure_ascii=False)
+            fichier.write("\n")
+
+
+if __name__ == "__main__":
+    main()